@@ -0,0 +1,142 @@
+"""
+动作执行计划
+条目加载或编辑时把动作字符串编译成计划：URL/复制绑定好处理函数，
+不含 shell 语法的命令预先拆成 argv 并缓存可执行文件路径，触发时直接 exec，不再经过 /bin/sh；
+命令名在 PATH 里找不到时（shell 内建命令、函数等）仍交给 /bin/sh。
+"""
+
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+
+from entry import ACTION_COPY, ACTION_NONE, ACTION_URL
+from launchers import copy_text, open_url
+
+# 同一动作同时运行的实例上限，None 表示不限制（条目可用 max_running 开启）
+MAX_RUNNING_PER_ACTION = None
+# 子进程超时（秒），None 表示不限制（条目可用 timeout 覆盖）
+DEFAULT_TIMEOUT = None
+
+# 出现这些字符时交给 shell：管道、重定向、变量、通配符、转义、多条命令等
+_SHELL_SYNTAX = re.compile(r'[|&;<>()$`\\*?\[\]{}~#!\n]')
+# 常见的 shell 内建命令，编译时就交给 shell（其余的在触发时查不到可执行文件也会交给 shell）
+_SHELL_WORDS = frozenset((
+    '.', ':', 'alias', 'bg', 'case', 'cd', 'exec', 'exit', 'export', 'fg', 'for',
+    'function', 'if', 'read', 'set', 'source', 'ulimit', 'umask', 'unset', 'until', 'while',
+))
+
+
+class _ExecutableCache:
+    """命令名 -> 可执行文件路径，PATH 变化时整体失效"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._path = None
+        self._found = {}
+
+    def resolve(self, name):
+        if '/' in name:
+            return name
+        path = os.environ.get('PATH', os.defpath)
+        with self._lock:
+            if path != self._path:
+                self._path = path
+                self._found = {}
+            exe = self._found.get(name)
+        if exe is None:
+            exe = shutil.which(name, path=path)
+            if exe is None:
+                raise FileNotFoundError(f"找不到命令: {name}")
+            with self._lock:
+                if path == self._path:
+                    self._found[name] = exe
+        return exe
+
+
+EXECUTABLES = _ExecutableCache()
+
+
+def _split(command):
+    """不需要 shell 的命令 -> argv，否则返回 None"""
+    if _SHELL_SYNTAX.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or argv[0] in _SHELL_WORDS or '=' in argv[0]:
+        return None
+    return argv
+
+
+def _option(extra, name, convert, default):
+    """条目的数值选项：可以是数字或数字字符串，必须为正，否则提示并使用默认值"""
+    value = extra.get(name)
+    if value is None:
+        return default
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        number = convert(value)
+        if not number > 0:
+            raise ValueError
+    except (TypeError, ValueError):
+        print(f"{name} 应为正数，已忽略: {value!r}")
+        return default
+    return number
+
+
+class ActionPlan:
+    """编译好的动作
+
+    launch() 在执行器的工作线程里调用：URL/复制直接调用处理函数并返回 None，
+    命令返回启动的 Popen。
+    """
+
+    __slots__ = ('kind', 'arg', 'argv', 'handler', 'timeout', 'max_running')
+
+    def __init__(self, kind, arg, extra=None):
+        self.kind = kind
+        self.arg = arg
+        self.argv = None
+        self.handler = None
+        if kind == ACTION_URL:
+            self.handler = open_url
+        elif kind == ACTION_COPY:
+            self.handler = copy_text
+        elif kind != ACTION_NONE:
+            self.argv = _split(arg)
+        extra = extra or {}
+        self.timeout = _option(extra, 'timeout', float, DEFAULT_TIMEOUT)
+        self.max_running = _option(extra, 'max_running', int, MAX_RUNNING_PER_ACTION)
+
+    @property
+    def direct(self):
+        """是否不经过 shell 直接执行"""
+        return self.argv is not None
+
+    def launch(self):
+        if self.handler is not None:
+            self.handler(self.arg)
+            return None
+        # 新会话：超时可以终止整个进程组，也不会收到本程序终端的信号
+        if self.argv is not None:
+            try:
+                exe = EXECUTABLES.resolve(self.argv[0])
+            except FileNotFoundError:
+                exe = None
+            if exe is not None:
+                return subprocess.Popen(self.argv, executable=exe,
+                                        start_new_session=True, stdin=subprocess.DEVNULL)
+        return subprocess.Popen(self.arg, shell=True, start_new_session=True,
+                                stdin=subprocess.DEVNULL)
+
+    def __repr__(self):
+        return f"ActionPlan({self.kind!r}, {self.argv or self.arg!r})"
+
+
+def compile_plan(hk):
+    return ActionPlan(hk.action_type, hk.action_arg, hk.extra)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+冲突检测基准：10 万个快捷键分布在 500 个窗口前缀上
+
+    python3 benchmarks/bench_conflicts.py [快捷键数] [窗口前缀数]
+
+测量：
+    rebuild - 建立冲突索引
+    check   - 保存时检查一个快捷键
+    scan    - 全表冲突扫描
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conflicts import ConflictIndex  # noqa: E402
+from entry import HotkeyEntry  # noqa: E402
+
+KEYS = string.ascii_lowercase + string.digits
+MODIFIER_SETS = ['ctrl', 'alt', 'ctrl+shift', 'shift+ctrl', 'control+alt', 'alt+shift', 'super']
+
+
+def make_hotkeys(count, prefixes, rng):
+    apps = ['Code', 'Firefox', 'Term', 'Slack']
+    # 部分窗口名是其他窗口名的前缀，制造覆盖冲突
+    windows = [''] + apps + [f"{rng.choice(apps)}{i:03d}" for i in range(prefixes - len(apps) - 1)]
+    return [HotkeyEntry(rng.choice(windows), f"{rng.choice(MODIFIER_SETS)}+{rng.choice(KEYS)}", f"binding {i}")
+            for i in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    prefixes = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(7)
+    hotkeys = make_hotkeys(count, prefixes, rng)
+
+    start = time.perf_counter()
+    index = ConflictIndex(hotkeys)
+    rebuild_ms = (time.perf_counter() - start) * 1000
+
+    probes = rng.sample(hotkeys, 1000)
+    start = time.perf_counter()
+    for hk in probes:
+        index.check(hk, hk)
+    check_us = (time.perf_counter() - start) / len(probes) * 1e6
+
+    start = time.perf_counter()
+    conflicts = index.scan()
+    scan_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{count} 个快捷键，{prefixes} 个窗口前缀，{len(conflicts)} 个冲突")
+    print(f"rebuild   {rebuild_ms:8.1f} ms")
+    print(f"check     {check_us:8.1f} us")
+    print(f"scan      {scan_ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
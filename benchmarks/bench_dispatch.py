@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+全局快捷键分发基准：10k 个快捷键分布在 500 个窗口前缀上
+
+    python3 benchmarks/bench_dispatch.py [快捷键数] [窗口前缀数]
+
+测量：
+    event       - 钩子回调处理一次按键（按下 + 松开），查当前窗口的动作表
+    trie walk   - 同一组合键沿前缀树逐字符查找（对照）
+    set_window  - 切换活动窗口时重新合并动作表
+    sync        - 从空表注册全部快捷键
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dispatch import ChordDispatcher  # noqa: E402
+from entry import HotkeyEntry  # noqa: E402
+
+KEYS = string.ascii_lowercase + string.digits
+SCAN_CODES = {key: [100 + i] for i, key in enumerate(KEYS)}
+MODIFIER_SETS = ['ctrl', 'alt', 'ctrl+shift', 'ctrl+alt', 'alt+shift', 'super']
+MODIFIER_SCAN_CODES = {'ctrl': 29, 'shift': 42, 'alt': 56, 'super': 125}
+
+
+class Event:
+    __slots__ = ('event_type', 'scan_code', 'name')
+
+    def __init__(self, event_type, scan_code, name):
+        self.event_type = event_type
+        self.scan_code = scan_code
+        self.name = name
+
+
+def make_bindings(count, prefixes, rng):
+    windows = [''] + [f"{rng.choice(['Code', 'Firefox', 'Term', 'Slack'])}{i:03d}" for i in range(prefixes - 1)]
+    return [HotkeyEntry(rng.choice(windows), f"{rng.choice(MODIFIER_SETS)}+{rng.choice(KEYS)}", f"binding {i}")
+            for i in range(count)], windows
+
+
+def per_call_ns(fn, rounds):
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter_ns() - start) / rounds
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    prefixes = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(7)
+    hotkeys, windows = make_bindings(count, prefixes, rng)
+
+    fired = []
+    dispatcher = ChordDispatcher(fired.append, resolve_key=SCAN_CODES.__getitem__)
+
+    start = time.perf_counter()
+    dispatcher.sync(hotkeys)
+    sync_ms = (time.perf_counter() - start) * 1000
+
+    # 当前窗口取某个前缀加后缀，按下该窗口存在的一个组合键
+    target = next(hk for hk in hotkeys if hk.window)
+    dispatcher.set_window(target.window + " - project")
+    mods = target.hotkey.split('+')[:-1]
+    key = target.hotkey.split('+')[-1]
+    for name in mods:
+        dispatcher._on_event(Event('down', MODIFIER_SCAN_CODES[name], name))
+    down = Event('down', SCAN_CODES[key][0], key)
+    up = Event('up', SCAN_CODES[key][0], key)
+    chord = (dispatcher._mask, SCAN_CODES[key][0])
+
+    def event():
+        dispatcher._on_event(down)
+        dispatcher._on_event(up)
+
+    rounds = 200_000
+    event_ns = per_call_ns(event, rounds)
+    assert fired and fired[-1] is dispatcher.lookup(chord)
+    fired.clear()
+    walk_ns = per_call_ns(lambda: dispatcher.lookup(chord), rounds)
+
+    names = [w + " - x" for w in rng.sample(windows, 200)]
+    start = time.perf_counter()
+    for name in names:
+        dispatcher.set_window(name)
+    switch_us = (time.perf_counter() - start) / len(names) * 1e6
+
+    print(f"{count} 个快捷键，{prefixes} 个窗口前缀")
+    print(f"event (down+up)   {event_ns:8.0f} ns")
+    print(f"trie walk         {walk_ns:8.0f} ns   (对照，窗口名 {len(dispatcher.window)} 字符)")
+    print(f"set_window        {switch_us:8.1f} us")
+    print(f"sync (全部注册)    {sync_ms:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Alt+R 模糊排序基准：5 万个随机快捷键，取前 50 个
+
+    python3 benchmarks/bench_search.py [快捷键数] [返回条数]
+
+测量每个关键字 rank() 的耗时（取多轮最小值），重点是很少命中或完全不命中的关键字，
+这类查询无法靠堆满提前结束；目标是 5 万条在 16 ms 内。
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entry import HotkeyEntry  # noqa: E402
+from search import SearchIndex  # noqa: E402
+
+KEYS = string.ascii_lowercase + string.digits
+MODIFIER_SETS = ['ctrl', 'alt', 'ctrl+shift', 'ctrl+alt', 'alt+shift', 'super']
+QUERIES = ['ctrl', 'open', 'qzx', 'zzzq', 'abcdefgh', 'open term', 'gt', 'x']
+ROUNDS = 5
+
+
+def random_word(rng):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+
+
+def make_hotkeys(count, rng):
+    windows = [''] + [random_word(rng).capitalize() for _ in range(300)]
+    return [HotkeyEntry(rng.choice(windows), f"{rng.choice(MODIFIER_SETS)}+{rng.choice(KEYS)}",
+                        ' '.join(random_word(rng) for _ in range(rng.randint(2, 5))))
+            for _ in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rng = random.Random(7)
+    hotkeys = make_hotkeys(count, rng)
+
+    start = time.perf_counter()
+    index = SearchIndex(hotkeys)
+    build_ms = (time.perf_counter() - start) * 1000
+    index.rank('warm', limit)   # 首次调用建立字段文本块
+
+    print(f"{count} 个快捷键，取前 {limit} 个，建索引 {build_ms:.0f} ms")
+    for query in QUERIES:
+        best = float('inf')
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            results = index.rank(query, limit)
+            best = min(best, time.perf_counter() - start)
+        print(f"{query!r:12} {best * 1000:8.2f} ms   {len(results)} 条")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+快照格式基准：JSON 与紧凑二进制快照的加载耗时和内存（RSS）
+
+    python3 benchmarks/bench_snapshot.py [条目数]
+
+每种情况在独立子进程里测量，避免互相影响：
+    open   - 打开快照，取前 50 条（启动时首屏）
+    touch  - 打开快照并访问全部条目（主程序启动后在后台建立索引，稳定后的内存以这一行为准）
+RSS 为加载前后常驻内存之差（读取 /proc/self/statm，仅限 Linux）
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import snapshot  # noqa: E402
+from entry import HotkeyEntry  # noqa: E402
+
+WINDOWS = ['Code', 'Firefox', 'Terminal', 'Chrome', 'Slack', 'Nautilus', 'Gimp', '']
+KEYS = ['ctrl', 'alt', 'shift', 'super']
+
+CHILD = r'''
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+import snapshot
+from entry import HotkeyEntry
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+base = rss()
+start = time.perf_counter()
+if {binary}:
+    hotkeys = snapshot.load({path!r})
+else:
+    with open({path!r}, 'r', encoding='utf-8') as f:
+        hotkeys = [HotkeyEntry.from_dict(hk) for hk in json.load(f)]
+first = hotkeys[:50]
+if {touch}:
+    for hk in hotkeys:
+        hk.description
+elapsed = time.perf_counter() - start
+print(elapsed * 1000, rss() - base)
+'''
+
+
+def make_hotkeys(count):
+    rng = random.Random(42)
+    hotkeys = []
+    for i in range(count):
+        mods = '+'.join(rng.sample(KEYS, rng.randint(1, 3)))
+        hotkeys.append({
+            'window': rng.choice(WINDOWS),
+            'hotkey': f"{mods}+{chr(97 + i % 26)}",
+            'description': f"快捷键说明 {i} " + ' '.join(rng.choice(['打开', '关闭', '切换', '复制', 'split', 'panel'])
+                                                 for _ in range(4)),
+            'action': rng.choice(['https://example.com/', 'cmd:xdotool key ', 'copy:']) + str(i),
+            'created': f"2024-01-01T00:00:{i % 60:02d}",
+        })
+    return hotkeys
+
+
+def measure(path, binary, touch):
+    code = CHILD.format(root=ROOT, path=path, binary=binary, touch=touch)
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    ms, rss = out.stdout.split()
+    return float(ms), int(rss)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    hotkeys = make_hotkeys(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'hotkeys.json')
+        bin_path = os.path.join(tmp, 'hotkeys.bin')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(hotkeys, f, ensure_ascii=False, indent=2)
+        with open(bin_path, 'wb') as f:
+            snapshot.dump([HotkeyEntry.from_dict(hk) for hk in hotkeys], f)
+
+        print(f"{count} 条快捷键  JSON {os.path.getsize(json_path) / 1e6:.1f} MB  "
+              f"二进制 {os.path.getsize(bin_path) / 1e6:.1f} MB")
+        print(f"{'case':<14}{'load':>10}{'RSS':>12}")
+        for label, path, binary in (('json', json_path, False), ('binary', bin_path, True)):
+            for touch in (False, True):
+                ms, rss = measure(path, binary, touch)
+                case = f"{label}/{'touch' if touch else 'open'}"
+                print(f"{case:<14}{ms:>8.1f}ms{rss / 1e6:>10.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+快捷键目录同步到 GitHub 仓库
+通过 Git Data API 直接生成 tree + commit 并移动分支，不依赖本地 git 工作目录；
+短时间内的多次增删改合并成一次提交，拉取时用 ETag 条件请求，远端没有变化时不下载内容。
+提交前比较远端文件的 blob sha 与上次同步时的 sha，远端在此期间被修改过就停止推送，
+报告冲突，由用户先拉取，不会覆盖别处的修改。
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+
+from github_client import GitHubError
+
+# 最后一次修改后等待这么久再提交（秒）
+COALESCE_DELAY = 5.0
+# 持续修改时最多等待这么久也要提交一次（秒）
+MAX_DELAY = 30.0
+
+
+class SyncConflict(Exception):
+    """远端文件在上次同步之后被修改过"""
+
+
+def dumps(entries):
+    """与 hotkeys.json 相同的格式"""
+    return json.dumps(entries, ensure_ascii=False, indent=2)
+
+
+def blob_sha(data):
+    """git 对象 sha，与远端的 blob sha 比较即可知道内容是否相同"""
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+
+class CatalogSync:
+    """把快捷键目录同步到 repo（"owner/name"）分支上的一个文件
+
+    snapshot() 返回当前快捷键的 dict 列表，在同步线程中调用；
+    report(message) 在同步线程中调用，调用方自行切回 Tk 线程。
+    changed() 可在任意线程调用，只登记一次修改，由同步线程合并后提交。
+    remote_sha 是上次同步时远端文件的 blob sha（调用方持久化，跨重启保留），
+    变化时在同步线程或调用 accept() 的线程中调用 on_synced(sha)。
+    """
+
+    def __init__(self, client, repo, snapshot, report, branch='main', path='hotkeys.json',
+                 delay=COALESCE_DELAY, max_delay=MAX_DELAY, remote_sha=None, on_synced=None):
+        self.client = client
+        self.repo = repo
+        self.snapshot = snapshot
+        self.report = report
+        self.branch = branch
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.remote_sha = remote_sha   # 上次同步时的远端文件 blob sha
+        self.on_synced = on_synced
+        self._pull_etag = None     # 已采用的远端内容的 ETag
+        self._pulled = None        # 最近一次拉取的 (ETag, sha)，采用后 ETag 才生效
+        self._ref = None           # (ETag, 提交 sha, tree sha)
+        self._file = None          # (tree sha, 该 tree 里文件的 blob sha)
+        self._io_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._first = None         # 本批第一次修改的时间
+        self._last = None          # 本批最后一次修改的时间
+        self._flush = False
+        self._closed = False
+        self._thread = None
+
+    def _api(self, suffix):
+        return f"/repos/{self.repo}{suffix}"
+
+    # ---- 合并提交 ----
+
+    def changed(self):
+        """登记一次修改"""
+        now = time.monotonic()
+        with self._cond:
+            if self._first is None:
+                self._first = now
+            self._last = now
+            self._ensure_thread()
+            self._cond.notify()
+
+    def flush(self):
+        """不再等待，立即提交已登记的修改（没有修改时也检查一次）"""
+        with self._cond:
+            if self._first is None:
+                self._first = self._last = time.monotonic()
+            self._flush = True
+            self._ensure_thread()
+            self._cond.notify()
+
+    def close(self, timeout=None):
+        """提交剩余的修改后结束同步线程，最多等待 timeout 秒"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None and timeout:
+            self._thread.join(timeout)
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='catalog-sync', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._first is None and not self._closed:
+                    self._cond.wait()
+                if self._first is None:
+                    return
+                while not (self._flush or self._closed):
+                    due = min(self._last + self.delay, self._first + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._first = self._last = None
+                self._flush = False
+            try:
+                sha = self.push(self.snapshot())
+            except SyncConflict as e:
+                self.report(f"同步暂停: {e}")
+            except Exception as e:
+                self.report(f"同步失败: {e}")
+            else:
+                self.report(f"已同步到 {self.repo}" if sha else "同步: 远端已是最新")
+
+    # ---- Git Data API ----
+
+    def _head(self):
+        """分支当前的 (提交 sha, tree sha)；分支没有变化时 304，直接用缓存"""
+        headers = {}
+        if self._ref:
+            headers['If-None-Match'] = self._ref[0]
+        resp = self.client.request('GET', self._api(f"/git/ref/heads/{self.branch}"),
+                                   expect=(200, 304), headers=headers)
+        if resp.status_code == 304:
+            return self._ref[1], self._ref[2]
+        commit_sha = resp.json()['object']['sha']
+        if self._ref and self._ref[1] == commit_sha:
+            tree_sha = self._ref[2]
+        else:
+            tree_sha = self.client.request(
+                'GET', self._api(f"/git/commits/{commit_sha}")).json()['tree']['sha']
+        self._ref = (resp.headers.get('ETag'), commit_sha, tree_sha)
+        return commit_sha, tree_sha
+
+    def _remote_file(self, tree_sha):
+        """tree 里目录文件的 blob sha，文件不存在时返回 None；同一个 tree 只查一次"""
+        if self._file and self._file[0] == tree_sha:
+            return self._file[1]
+        sha = tree_sha
+        for name in self.path.split('/'):
+            tree = self.client.request('GET', self._api(f"/git/trees/{sha}")).json()['tree']
+            sha = next((item['sha'] for item in tree if item['path'] == name), None)
+            if sha is None:
+                break
+        self._file = (tree_sha, sha)
+        return sha
+
+    def _synced(self, sha):
+        """记录远端文件的新 sha（需持有 _io_lock）"""
+        if sha != self.remote_sha:
+            self.remote_sha = sha
+            if self.on_synced:
+                self.on_synced(sha)
+
+    def accept(self, sha):
+        """pull() 拿到的内容已被本地采用，之后的推送以它为基础"""
+        with self._io_lock:
+            if self._pulled and self._pulled[1] == sha:
+                self._pull_etag = self._pulled[0]
+            self._synced(sha)
+
+    def push(self, entries, message=None):
+        """把 entries 作为一次提交推到分支上，内容与远端相同时返回 None，否则返回新提交 sha
+
+        远端文件与上次同步时不同（包括从未同步过而远端已有文件）时抛出 SyncConflict；
+        分支被移动（422）时基于新的分支头重新检查后再提交一次。
+        """
+        data = dumps(entries).encode('utf-8')
+        sha = blob_sha(data)
+        with self._io_lock:
+            if sha == self.remote_sha:
+                return None
+            message = message or f"Update {self.path} ({len(entries)} hotkeys)"
+            for attempt in range(2):
+                parent, base_tree = self._head()
+                current = self._remote_file(base_tree)
+                if current == sha:
+                    # 远端已经是这份内容
+                    self._synced(sha)
+                    return None
+                if current is not None and current != self.remote_sha:
+                    raise SyncConflict(f"远端的 {self.path} 已在别处修改，请先从 GitHub 拉取")
+                tree = self.client.request('POST', self._api("/git/trees"), expect=(201,), json={
+                    "base_tree": base_tree,
+                    "tree": [{"path": self.path, "mode": "100644", "type": "blob",
+                              "content": data.decode('utf-8')}],
+                }).json()['sha']
+                commit = self.client.request('POST', self._api("/git/commits"), expect=(201,), json={
+                    "message": message, "tree": tree, "parents": [parent],
+                }).json()['sha']
+                try:
+                    self.client.request('PATCH', self._api(f"/git/refs/heads/{self.branch}"),
+                                        json={"sha": commit, "force": False})
+                except GitHubError as e:
+                    # 分支在此期间被别人移动（不是快进），基于新的分支头重做一次
+                    if e.status != 422 or attempt:
+                        raise
+                    self._ref = None
+                    continue
+                self._ref = (None, commit, tree)
+                self._file = (tree, sha)
+                self._synced(sha)
+                return commit
+
+    def pull(self):
+        """读取远端目录，远端没有变化（或就是本机刚推送的内容）时返回 None，否则返回 (sha, dict 列表)
+
+        本地采用这份内容后调用 accept(sha)；不采用时远端仍算作未同步，推送会报告冲突。
+        """
+        with self._io_lock:
+            headers = {}
+            if self._pull_etag:
+                headers['If-None-Match'] = self._pull_etag
+            resp = self.client.request('GET', self._api(f"/contents/{self.path}"),
+                                       expect=(200, 304), headers=headers,
+                                       params={"ref": self.branch})
+            if resp.status_code == 304:
+                return None
+            info = resp.json()
+            if info['sha'] == self.remote_sha:
+                self._pull_etag = resp.headers.get('ETag')
+                return None
+            self._pulled = (resp.headers.get('ETag'), info['sha'])
+            content = info.get('content')
+            if not content:
+                # 超过 1MB 的文件 contents API 不返回内容，改读 blob
+                content = self.client.request(
+                    'GET', self._api(f"/git/blobs/{info['sha']}")).json()['content']
+            return info['sha'], json.loads(base64.b64decode(content))
@@ -0,0 +1,119 @@
+"""
+组合键解析
+"ctrl+shift+a" 之类的字符串解析为 (修饰键位掩码, 主键名)，修饰键写法和顺序不影响结果；
+主键名驻留为整数编号，组合键整体表示为一个整数 (编号 << MASK_BITS | 掩码)，
+匹配、冲突检查和全局注册都比较整数而不是字符串。
+"""
+
+import threading
+from functools import lru_cache
+
+MOD_CTRL = 1
+MOD_SHIFT = 2
+MOD_ALT = 4
+MOD_SUPER = 8
+# AltGr 单独占一位：在多数布局里它用来输入第三层字符，不能当作 Alt
+MOD_ALTGR = 16
+# 组合键整数里修饰键掩码占的位数
+MASK_BITS = 5
+MASK = (1 << MASK_BITS) - 1
+
+# 修饰键名（含常见别名）-> 位
+MODIFIERS = {
+    'ctrl': MOD_CTRL, 'control': MOD_CTRL,
+    'shift': MOD_SHIFT,
+    'alt': MOD_ALT, 'option': MOD_ALT,
+    'alt gr': MOD_ALTGR, 'altgr': MOD_ALTGR,
+    'super': MOD_SUPER, 'win': MOD_SUPER, 'windows': MOD_SUPER,
+    'cmd': MOD_SUPER, 'command': MOD_SUPER, 'meta': MOD_SUPER,
+}
+# 规范写法里修饰键的顺序
+MODIFIER_ORDER = ((MOD_CTRL, 'ctrl'), (MOD_SHIFT, 'shift'), (MOD_ALT, 'alt'), (MOD_ALTGR, 'alt gr'),
+                  (MOD_SUPER, 'super'))
+# 主键别名 -> 规范名（与 keyboard 库的规范名一致）
+KEY_ALIASES = {
+    'escape': 'esc', 'return': 'enter', 'del': 'delete', 'ins': 'insert',
+    'pgup': 'page up', 'pageup': 'page up', 'page_up': 'page up',
+    'pgdn': 'page down', 'pagedown': 'page down', 'page_down': 'page down',
+    'spacebar': 'space', 'bksp': 'backspace',
+}
+
+_lock = threading.Lock()
+_key_ids = {}       # 规范键名 -> 编号（从 1 开始）
+_key_names = ['']   # 编号 -> 规范键名
+
+
+def modifier_bit(name):
+    """修饰键名 -> 位，'left ctrl'/'right shift' 等左右键同样识别，不是修饰键返回 0"""
+    if not name:
+        return 0
+    name = name.lower()
+    if name.startswith(('left ', 'right ')):
+        name = name.split(' ', 1)[1]
+    return MODIFIERS.get(name, 0)
+
+
+def parse_chord(text):
+    """'Ctrl+Shift+A' -> (MOD_CTRL | MOD_SHIFT, 'a')，不是单个组合键时返回 None"""
+    parts = [part.strip().lower() for part in text.split('+')]
+    if not parts or not all(parts):
+        return None
+    mask = 0
+    for part in parts[:-1]:
+        bit = modifier_bit(part)
+        if not bit:
+            return None
+        mask |= bit
+    key = parts[-1]
+    if modifier_bit(key) or ',' in key:
+        return None
+    return mask, KEY_ALIASES.get(key, key)
+
+
+def format_chord(mask, key):
+    """规范写法，如 'ctrl+shift+a'"""
+    names = [name for bit, name in MODIFIER_ORDER if mask & bit]
+    names.append(key)
+    return '+'.join(names)
+
+
+def key_id(name):
+    """驻留主键名，返回编号"""
+    kid = _key_ids.get(name)
+    if kid is None:
+        with _lock:
+            kid = _key_ids.get(name)
+            if kid is None:
+                kid = _key_ids[name] = len(_key_names)
+                _key_names.append(name)
+    return kid
+
+
+def chord_mask(chord):
+    """组合键整数里的修饰键掩码"""
+    return chord & MASK
+
+
+def chord_key(chord):
+    """组合键整数里的主键名"""
+    return _key_names[chord >> MASK_BITS]
+
+
+@lru_cache(maxsize=None)
+def _canonical_text(canonical):
+    # 不同写法得到的规范写法共用同一个字符串对象
+    return canonical
+
+
+@lru_cache(maxsize=1 << 16)
+def intern_chord(text):
+    """组合键字符串 -> (组合键整数, 规范写法)，无法解析时返回 None
+
+    相同写法只解析一次；同一组合键的规范写法只保留一个字符串对象。
+    """
+    parsed = parse_chord(text)
+    if parsed is None:
+        return None
+    mask, key = parsed
+    return key_id(key) << MASK_BITS | mask, _canonical_text(format_chord(mask, key))
+
@@ -0,0 +1,10 @@
+"""
+配置文件路径
+"""
+
+import os
+
+CONFIG_FILE = os.path.expanduser("~/.config/hotkey_manager/data.json")
+HOTKEY_FILE = os.path.expanduser("~/.config/hotkey_manager/hotkeys.json")
+# 可选的紧凑二进制快照，存在时代替 hotkeys.json 作为存储（JSON 仍用于导入导出）
+HOTKEY_BIN_FILE = os.path.expanduser("~/.config/hotkey_manager/hotkeys.bin")
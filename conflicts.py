@@ -0,0 +1,126 @@
+"""
+快捷键冲突检测
+按组合键整数分组，组内按窗口前缀组织并保持有序：保存时只查同一组合键下的祖先前缀和以它开头的前缀，
+与目录大小无关；全表扫描时用前缀栈找出互相覆盖的窗口，10 万条在一秒内完成。
+"""
+
+from bisect import bisect_right, insort
+
+# 冲突类型
+DUPLICATE = 'duplicate'   # 同一窗口前缀下的相同组合键，先添加的生效
+SHADOW = 'shadow'         # 窗口前缀互为前缀，在更长前缀匹配的窗口里由它生效
+
+KIND_LABELS = {DUPLICATE: "重复", SHADOW: "覆盖"}
+
+
+def _chord(hk):
+    """分组键：组合键整数，无法解析的写法退回小写原文"""
+    return hk.chord if hk.chord is not None else hk.search_keys[0]
+
+
+def describe(kind, outer, inner):
+    """一条冲突的说明"""
+    if kind == DUPLICATE:
+        return f"与「{outer.description}」重复，先添加的生效"
+    scope = f"「{inner.window.strip()}」" if inner.window.strip() else "所有窗口"
+    return f"在{scope}中覆盖「{outer.description}」"
+
+
+class ConflictIndex:
+    """{组合键整数: ({小写窗口前缀: [条目, ...]}, 有序的窗口前缀列表)}
+
+    窗口前缀的匹配规则与分发器相同：前缀匹配、最长前缀优先，空前缀是全局快捷键。
+    调用方负责加锁（主程序在搜索索引的锁内与快捷键列表一起修改）。
+    """
+
+    def __init__(self, hotkeys=()):
+        self._chords = {}
+        self.rebuild(hotkeys)
+
+    def rebuild(self, hotkeys):
+        self._chords = {}
+        for hk in hotkeys:
+            self.add(hk)
+
+    def add(self, hk):
+        chord = _chord(hk)
+        group = self._chords.get(chord)
+        if group is None:
+            group = self._chords[chord] = ({}, [])
+        windows, names = group
+        window = hk.search_keys[2]
+        entries = windows.get(window)
+        if entries is None:
+            windows[window] = [hk]
+            insort(names, window)
+        else:
+            entries.append(hk)
+
+    def remove(self, hk):
+        chord = _chord(hk)
+        group = self._chords.get(chord)
+        if group is None:
+            return
+        windows, names = group
+        window = hk.search_keys[2]
+        entries = [other for other in windows.get(window, ()) if other is not hk]
+        if entries:
+            windows[window] = entries
+        elif window in windows:
+            del windows[window]
+            names.remove(window)
+            if not windows:
+                del self._chords[chord]
+
+    def check(self, hk, ignore=None):
+        """hk 保存后会与哪些条目冲突，返回 [(类型, 条目), ...]（ignore 是正在编辑的原条目）
+
+        祖先前缀逐个字典查找，以 hk 窗口开头的前缀在有序列表里二分定位，
+        开销只与窗口名长度和实际冲突数有关。
+        """
+        group = self._chords.get(_chord(hk))
+        if group is None:
+            return []
+        windows, names = group
+        window = hk.search_keys[2]
+        found = []
+        for end in range(len(window) + 1):
+            entries = windows.get(window[:end])
+            if entries:
+                kind = DUPLICATE if end == len(window) else SHADOW
+                found.extend((kind, other) for other in entries if other is not ignore)
+        for name in names[bisect_right(names, window):]:
+            if not name.startswith(window):
+                break
+            found.extend((SHADOW, other) for other in windows[name] if other is not ignore)
+        return found
+
+    def scan(self):
+        """全表冲突，返回 [(类型, 组合键规范写法, 外层条目, 内层条目), ...]
+
+        外层条目的窗口前缀较短（或相同而先添加），内层条目在它匹配的窗口里生效。
+        """
+        conflicts = []
+        for windows, names in self._chords.values():
+            chord = windows[names[0]][0].hotkey
+            if len(windows) == 1:
+                entries = windows[names[0]]
+                first = entries[0]
+                for hk in entries[1:]:
+                    conflicts.append((DUPLICATE, chord, first, hk))
+                continue
+            # 排序后以某个前缀开头的窗口紧跟在它后面，栈里始终是当前窗口的全部祖先前缀
+            stack = []
+            for window in names:
+                while stack and not window.startswith(stack[-1]):
+                    stack.pop()
+                entries = windows[window]
+                first = entries[0]
+                for hk in entries[1:]:
+                    conflicts.append((DUPLICATE, chord, first, hk))
+                for ancestor in stack:
+                    for outer in windows[ancestor]:
+                        for inner in entries:
+                            conflicts.append((SHADOW, chord, outer, inner))
+                stack.append(window)
+        return conflicts
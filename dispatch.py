@@ -0,0 +1,248 @@
+"""
+全局快捷键分发
+只安装一个键盘钩子，快捷键按 (窗口前缀, 组合键) 组织成前缀树；
+活动窗口变化时预先算好当前窗口的 {修饰键: {扫描码: 动作}}，按键时只做两次字典查找
+"""
+
+import threading
+from functools import partial
+
+from chords import MASK, MASK_BITS, chord_key, intern_chord, modifier_bit
+
+_NO_BINDINGS = {}
+
+
+def _default_resolve_key(name):
+    import keyboard
+    return keyboard.key_to_scan_codes(name)
+
+
+class ChordDispatcher:
+    """单钩子的组合键分发器
+
+    组合键在内部表示为 (修饰键位掩码, 扫描码)，与键盘布局和 Shift 状态无关。
+    分发表是按小写 window 字段组织的前缀树，每个节点保存 {组合键: (目标, ...)}；
+    沿当前窗口名下行，最长的匹配前缀优先，根节点是全局快捷键。
+    同一前缀下重复的组合键以先注册的为准，删除后由下一个接替。
+    系统快捷键（Alt+R 等）单独保存，优先于用户快捷键，增删用户快捷键时不会受影响。
+
+    前缀树只在切换窗口和增删快捷键时遍历，结果合并成当前窗口的动作表整体替换；
+    钩子线程按键时只查动作表，不分配对象，也不需要加锁；
+    增删快捷键（Tk 线程、后台导入）和切换窗口（监控线程）修改前缀树，在同一把锁内进行。
+    on_trigger(target) 和系统回调都在钩子线程中调用，调用方自行切回 Tk 线程。
+    """
+
+    def __init__(self, on_trigger, resolve_key=_default_resolve_key):
+        self.on_trigger = on_trigger
+        self.resolve_key = resolve_key   # 键名 -> 扫描码列表
+        self._scan_codes = {}            # 主键编号 -> 扫描码，每个主键只查一次
+        self.window = ''                 # 当前窗口名（小写）
+        self._system = {}                # 组合键 -> 回调
+        self._root = ({}, {})            # (子节点, {组合键: (目标, ...)})
+        self._bound = {}                 # id(目标) -> (目标, 组合键列表, 动作)
+        self._active = {}                # 当前窗口的 {修饰键掩码: {扫描码: 动作}}
+        self._lock = threading.RLock()   # 修改前缀树、_bound 和动作表
+        self._bits = {}                  # 键名 -> 修饰键位（0 表示不是修饰键）
+        self._mask = 0                   # 当前按下的修饰键
+        self._held = {}                  # 按下的修饰键扫描码 -> 位
+        self._down = set()               # 按下的非修饰键扫描码，过滤自动重复
+        self._hook = None
+
+    def start(self):
+        """安装键盘钩子"""
+        import keyboard
+        if self._hook is None:
+            self._hook = keyboard.hook(self._on_event)
+
+    def stop(self):
+        import keyboard
+        if self._hook is not None:
+            keyboard.unhook(self._hook)
+            self._hook = None
+
+    def chords(self, text):
+        """组合键字符串 -> 内部表示列表（一个键名可能对应多个扫描码），无法识别返回 []"""
+        interned = intern_chord(text)
+        return self._resolve(interned[0]) if interned else []
+
+    def _resolve(self, chord):
+        """组合键整数 -> [(修饰键掩码, 扫描码), ...]"""
+        kid = chord >> MASK_BITS
+        scan_codes = self._scan_codes.get(kid)
+        if scan_codes is None:
+            try:
+                scan_codes = tuple(self.resolve_key(chord_key(chord)))
+            except ValueError:
+                # 键盘布局里没有这个键，记住结果
+                scan_codes = ()
+            except Exception as e:
+                # 其他错误（如键盘库尚未就绪）不缓存，下次注册时重试
+                print(f"无法解析按键 {chord_key(chord)!r}: {e}")
+                return []
+            self._scan_codes[kid] = scan_codes
+        mask = chord & MASK
+        return [(mask, scan_code) for scan_code in scan_codes]
+
+    def add_system(self, text, callback):
+        """注册系统快捷键"""
+        with self._lock:
+            for chord in self.chords(text):
+                self._system[chord] = callback
+            self._rebuild()
+
+    def add(self, hk):
+        """注册一个快捷键，无法识别或注册出错时返回 False（出错的条目按未注册处理）"""
+        try:
+            with self._lock:
+                added = self._add(hk)
+                if added:
+                    self._rebuild()
+        except Exception as e:
+            print(f"快捷键 {hk.hotkey} 注册失败: {e}")
+            return False
+        return added
+
+    def remove(self, hk):
+        """注销一个快捷键，出错时只记录"""
+        try:
+            with self._lock:
+                if self._remove(hk):
+                    self._rebuild()
+        except Exception as e:
+            print(f"快捷键 {hk.hotkey} 注销失败: {e}")
+
+    def _add(self, hk):
+        return self._bind(self._root, self._bound, hk)
+
+    def _bind(self, root, bound, hk):
+        """把 hk 加入前缀树 root 和 bound，无法识别时返回 False"""
+        if hk.chord is None:
+            return False
+        chords = self._resolve(hk.chord)
+        if not chords:
+            return False
+        node = root
+        for ch in hk.search_keys[2]:
+            node = node[0].setdefault(ch, ({}, {}))
+        bindings = node[1]
+        for chord in chords:
+            bindings[chord] = bindings.get(chord, ()) + (hk,)
+        bound[id(hk)] = (hk, chords, partial(self.on_trigger, hk))
+        return True
+
+    def _remove(self, hk):
+        bound = self._bound.pop(id(hk), None)
+        if bound is None:
+            return False
+        window = hk.search_keys[2]
+        path = [self._root]
+        for ch in window:
+            path.append(path[-1][0][ch])
+        bindings = path[-1][1]
+        for chord in bound[1]:
+            rest = tuple(t for t in bindings[chord] if t is not hk)
+            if rest:
+                bindings[chord] = rest
+            else:
+                del bindings[chord]
+        # 清理空的叶子节点
+        for ch, node, parent in zip(reversed(window), reversed(path), reversed(path[:-1])):
+            if node[0] or node[1]:
+                break
+            del parent[0][ch]
+        return True
+
+    def sync(self, entries):
+        """与快捷键列表对齐：只注册新增的、注销已不存在的，返回无法识别的快捷键数
+
+        条目编辑时整体替换为新对象，按对象身份比较即可得到变化。
+        """
+        wanted = {id(hk): hk for hk in entries}
+        with self._lock:
+            for key in [key for key in self._bound if key not in wanted]:
+                self._remove(self._bound[key][0])
+            skipped = 0
+            for key, hk in wanted.items():
+                if key not in self._bound and not self._add(hk):
+                    skipped += 1
+            self._rebuild()
+        return skipped
+
+    def prepare(self, entries):
+        """不加锁地为 entries 建好一棵新的前缀树（导入等整体替换），返回 (分发状态, 无法识别数)
+
+        建树期间分发器照常工作，之后用 install() 在锁内一次换上。
+        """
+        root, bound = ({}, {}), {}
+        skipped = 0
+        for hk in entries:
+            if id(hk) not in bound and not self._bind(root, bound, hk):
+                skipped += 1
+        return (root, bound), skipped
+
+    def install(self, state):
+        """换上 prepare() 建好的前缀树并重新合并动作表"""
+        with self._lock:
+            self._root, self._bound = state
+            self._rebuild()
+
+    def set_window(self, name):
+        """活动窗口变化（监控线程调用）"""
+        with self._lock:
+            self.window = (name or '').lower()
+            self._rebuild()
+
+    def _rebuild(self):
+        """重新合并当前窗口的动作表"""
+        with self._lock:
+            node = self._root
+            merged = dict(node[1])
+            for ch in self.window:
+                node = node[0].get(ch)
+                if node is None:
+                    break
+                merged.update(node[1])     # 更长的前缀覆盖更短的
+            bound = self._bound
+            active = {}
+            for (mask, scan_code), targets in merged.items():
+                active.setdefault(mask, {})[scan_code] = bound[id(targets[0])][2]
+            for (mask, scan_code), callback in self._system.items():
+                active.setdefault(mask, {})[scan_code] = callback
+            self._active = active
+
+    def lookup(self, chord):
+        """当前窗口下 chord 对应的用户快捷键，没有返回 None（直接遍历前缀树，不走动作表）"""
+        node = self._root
+        targets = node[1].get(chord)
+        for ch in self.window:
+            node = node[0].get(ch)
+            if node is None:
+                break
+            targets = node[1].get(chord, targets)
+        return targets[0] if targets else None
+
+    def _on_event(self, event):
+        scan_code = event.scan_code
+        bit = self._bits.get(event.name)
+        if bit is None:
+            bit = self._bits[event.name] = modifier_bit(event.name)
+        if event.event_type == 'down':
+            if bit:
+                self._held[scan_code] = bit
+                self._mask |= bit
+                return
+            if scan_code in self._down:
+                return
+            self._down.add(scan_code)
+            action = self._active.get(self._mask, _NO_BINDINGS).get(scan_code)
+            if action is not None:
+                action()
+        else:
+            if bit:
+                self._held.pop(scan_code, None)
+                mask = 0
+                for held in self._held.values():
+                    mask |= held
+                self._mask = mask
+            else:
+                self._down.discard(scan_code)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Display 解析 - 处理本地/RDP 场景
+直接连接 X11 socket 探测候选 display（不创建 Tk 窗口、不调用 xdpyinfo），
+候选并行探测，成功的结果缓存到磁盘供下次启动优先使用。
+start.sh 通过 `python3 display.py` 调用，main.py 启动时调用 setup_display()。
+"""
+
+import glob
+import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+X11_SOCKET_DIR = '/tmp/.X11-unix'
+X11_TCP_PORT = 6000
+# 单个候选的连接超时（秒），候选并行探测，总耗时也不超过这个值
+PROBE_TIMEOUT = 0.3
+DISPLAY_CACHE = os.path.expanduser("~/.cache/hotkey_manager/display")
+
+
+def parse_display(name):
+    """':10.0' -> ('', 10)，'host:10' -> ('host', 10)，无法解析返回 None"""
+    host, sep, rest = name.rpartition(':')
+    if not sep:
+        return None
+    number = rest.split('.', 1)[0]
+    if not number.isdigit():
+        return None
+    return host, int(number)
+
+
+def probe(name, timeout=PROBE_TIMEOUT):
+    """能连上对应的 X server 即认为可用"""
+    parsed = parse_display(name)
+    if parsed is None:
+        return False
+    host, number = parsed
+    if host in ('', 'unix'):
+        path = os.path.join(X11_SOCKET_DIR, f'X{number}')
+        # 文件 socket 不存在时再试 Linux 的抽象命名空间（容器里常见）
+        targets = [(socket.AF_UNIX, path), (socket.AF_UNIX, '\0' + path)]
+    else:
+        targets = [(socket.AF_INET, (host, X11_TCP_PORT + number))]
+    for family, address in targets:
+        try:
+            with socket.socket(family, socket.SOCK_STREAM) as s:
+                s.settimeout(timeout)
+                s.connect(address)
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def load_cached():
+    """上次可用的 display"""
+    try:
+        with open(DISPLAY_CACHE, 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def save_cached(name):
+    """记录可用的 display（写临时文件再替换）"""
+    try:
+        os.makedirs(os.path.dirname(DISPLAY_CACHE), exist_ok=True)
+        tmp = f'{DISPLAY_CACHE}.{os.getpid()}'
+        with open(tmp, 'w') as f:
+            f.write(name)
+        os.replace(tmp, DISPLAY_CACHE)
+    except OSError:
+        pass
+
+
+def candidates():
+    """候选 display，按优先级：环境变量 > 缓存 > 本地 socket（最新的在前）"""
+    names = [os.environ.get('DISPLAY', ''), load_cached() or '']
+
+    sockets = glob.glob(os.path.join(X11_SOCKET_DIR, 'X*'))
+    sockets.sort(key=lambda path: os.stat(path).st_mtime if os.path.exists(path) else 0,
+                 reverse=True)
+    names.extend(f":{os.path.basename(path)[1:]}" for path in sockets)
+
+    seen = set()
+    result = []
+    for name in names:
+        if name and parse_display(name) and name not in seen:
+            seen.add(name)
+            result.append(name)
+    return result
+
+
+def resolve(timeout=PROBE_TIMEOUT):
+    """并行探测所有候选，返回优先级最高的可用 display，没有返回 None"""
+    names = candidates()
+    if not names:
+        return None
+    pool = ThreadPoolExecutor(max_workers=len(names))
+    try:
+        futures = [pool.submit(probe, name, timeout) for name in names]
+        for name, future in zip(names, futures):
+            if future.result():
+                return name
+        return None
+    finally:
+        # 高优先级候选可用时不等其余探测结束
+        pool.shutdown(wait=False)
+
+
+def setup_display():
+    """设置可用的 Display，返回是否有显示环境"""
+    display = resolve()
+    if display:
+        if os.environ.get('DISPLAY') != display:
+            print(f"🔧 自动配置 Display: {display}")
+        os.environ['DISPLAY'] = display
+        if load_cached() != display:
+            save_cached(display)
+        return True
+
+    # 纯 Wayland 会话（无 XWayland）
+    return bool(os.environ.get('WAYLAND_DISPLAY'))
+
+
+if __name__ == '__main__':
+    # start.sh 使用：输出可用的 display，找不到时退出码为 1
+    display = resolve()
+    if display:
+        save_cached(display)
+        print(display)
+    sys.exit(0 if display else 1)
@@ -0,0 +1,117 @@
+"""
+快捷键条目
+加载时从 dict 转换一次，规范化字段（规范组合键、小写搜索键、动作类型）在构造时算好，列表显示文本首次显示时生成并缓存，
+之后刷新列表、搜索、执行都直接读取，不再反复 get/lower/upper。
+"""
+
+from chords import intern_chord
+
+# 参与搜索的字段，search_keys 按此顺序排列
+SEARCH_FIELDS = ('hotkey', 'description', 'window')
+# 持久化的字段
+FIELDS = ('window', 'hotkey', 'description', 'action', 'created')
+_FIELD_SET = frozenset(FIELDS)
+
+# 动作类型
+ACTION_NONE = 'none'
+ACTION_URL = 'url'
+ACTION_CMD = 'cmd'
+ACTION_COPY = 'copy'
+ACTION_SHELL = 'shell'
+
+
+def parse_action(action):
+    """动作字符串 -> (类型, 参数)"""
+    if not action:
+        return ACTION_NONE, ''
+    if action.startswith('http'):
+        return ACTION_URL, action
+    if action.startswith('cmd:'):
+        return ACTION_CMD, action[4:]
+    if action.startswith('copy:'):
+        return ACTION_COPY, action[5:]
+    return ACTION_SHELL, action
+
+
+def _search_key(value):
+    """小写搜索键；与原值相同时复用原字符串，不多占内存"""
+    key = value.strip().lower()
+    if '\n' in key:
+        key = key.replace('\n', ' ')
+    return value if key == value else key
+
+
+class HotkeyEntry:
+    """一个快捷键
+
+    字段只在构造时赋值，编辑时整体替换为新条目，缓存字段因此总是有效。
+    能解析的 hotkey 在构造时改写为规范写法（'Shift+Control+A' -> 'ctrl+shift+a'），
+    chord 是对应的组合键整数（见 chords.py），无法解析时为 None。
+    label/row 在首次显示时生成（列表只渲染可见行），其余规范化字段构造时算好。
+    plan 是编译好的执行计划（见 actions.py），加载后在后台预编译，新建和编辑的条目首次访问时编译。
+    extra 保存文件里的其他键，保存时原样写回。
+    """
+
+    __slots__ = FIELDS + ('extra', 'chord', 'search_keys', 'action_type', 'action_arg', '_label', '_row', '_plan')
+
+    def __init__(self, window='', hotkey='', description='', action='', created='', extra=None):
+        interned = intern_chord(hotkey) if hotkey else None
+        if interned is None:
+            self.chord = None
+        else:
+            self.chord, hotkey = interned
+        self.window = window
+        self.hotkey = hotkey
+        self.description = description
+        self.action = action
+        self.created = created
+        self.extra = extra
+        self.search_keys = (_search_key(hotkey), _search_key(description), _search_key(window))
+        self.action_type, self.action_arg = parse_action(action)
+        self._label = None
+        self._row = None
+        self._plan = None
+
+    @property
+    def label(self):
+        """弹出框列表的显示文本"""
+        if self._label is None:
+            window = self.window.strip()
+            if window:
+                self._label = f"[{window}] {self.hotkey.upper()} - {self.description}"
+            else:
+                self._label = f"🌐 {self.hotkey.upper()} - {self.description}"
+        return self._label
+
+    @property
+    def row(self):
+        """主列表的列"""
+        if self._row is None:
+            self._row = (self.window, self.hotkey, self.description, self.action)
+        return self._row
+
+    @property
+    def plan(self):
+        """执行计划"""
+        if self._plan is None:
+            from actions import compile_plan
+            self._plan = compile_plan(self)
+        return self._plan
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        extra = None
+        if len(data) != len(FIELDS) or not _FIELD_SET.issuperset(data):
+            extra = {k: v for k, v in data.items() if k not in _FIELD_SET} or None
+        return cls(get('window') or '', get('hotkey') or '', get('description') or '',
+                   get('action') or '', get('created') or '', extra)
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"HotkeyEntry({self.window!r}, {self.hotkey!r}, {self.description!r})"
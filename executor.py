@@ -0,0 +1,140 @@
+"""
+快捷键动作执行器
+动作在有界线程池里启动，Tk 线程和键盘线程只负责提交；
+每个子进程由一个等待线程阻塞 wait（不轮询），设置了超时的由定时器终止进程组，不会留下僵尸进程。
+"""
+
+import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from entry import ACTION_NONE
+
+# 启动动作的工作线程数
+MAX_WORKERS = 4
+# 排队等待启动的动作上限，超过时丢弃新的触发
+MAX_PENDING = 32
+# 超时后先 SIGTERM，再等这么久仍未退出则 SIGKILL
+KILL_GRACE = 2.0
+
+
+class _Child:
+    __slots__ = ('hk', 'proc', 'exited', 'killed')
+
+    def __init__(self, hk, proc):
+        self.hk = hk
+        self.proc = proc
+        self.exited = threading.Event()
+        self.killed = False
+
+
+class ActionExecutor:
+    """有界、异步的动作执行器
+
+    report(message) 在工作线程、等待线程或定时器线程中调用，调用方自行切回 Tk 线程。
+    """
+
+    def __init__(self, report, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.report = report
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='action')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = {}        # 动作字符串 -> 排队中和运行中的实例数
+        self._children = []
+        self._closed = False
+
+    def submit(self, hk):
+        """提交一个快捷键的动作，被限流丢弃时返回 False"""
+        if hk.action_type == ACTION_NONE:
+            return False
+        plan = hk.plan
+        with self._lock:
+            if self._closed:
+                return False
+            if self._pending >= self.max_pending:
+                busy = True
+            else:
+                # 只有设置了 max_running 的动作限制实例数（GUI 程序可以开任意多个）
+                busy = (plan.max_running is not None
+                        and self._running.get(hk.action, 0) >= plan.max_running)
+            if not busy:
+                self._pending += 1
+                self._running[hk.action] = self._running.get(hk.action, 0) + 1
+        if busy:
+            self.report(f"忙碌，已忽略: {hk.description}")
+            return False
+        self._pool.submit(self._start, hk, plan)
+        return True
+
+    def _start(self, hk, plan):
+        """在工作线程中启动动作"""
+        proc = None
+        try:
+            proc = plan.launch()
+            self.report(f"执行: {hk.description}")
+        except Exception as e:
+            self.report(f"执行失败: {hk.description}: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+                if proc is None:
+                    self._release(hk)
+                else:
+                    child = _Child(hk, proc)
+                    self._children.append(child)
+            if proc is not None:
+                threading.Thread(target=self._wait, args=(child, plan.timeout),
+                                 name='action-wait', daemon=True).start()
+
+    def _release(self, hk):
+        """实例结束（需持有锁）"""
+        count = self._running.get(hk.action, 0) - 1
+        if count > 0:
+            self._running[hk.action] = count
+        else:
+            self._running.pop(hk.action, None)
+
+    def _wait(self, child, timeout):
+        """等待线程：阻塞到子进程退出后回收，超时由定时器终止"""
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, self._terminate, (child,))
+            timer.daemon = True
+            timer.start()
+        code = child.proc.wait()
+        child.exited.set()
+        if timer is not None:
+            timer.cancel()
+        if child.killed:
+            self.report(f"超时已终止: {child.hk.description}")
+        elif code != 0:
+            self.report(f"{child.hk.description} 退出码 {code}")
+        with self._lock:
+            self._children.remove(child)
+            self._release(child.hk)
+
+    def _terminate(self, child):
+        """超时（定时器线程）：先 SIGTERM 整个进程组，宽限期内没有退出再 SIGKILL"""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            if child.exited.is_set():
+                return
+            child.killed = True
+            try:
+                os.killpg(child.proc.pid, sig)
+            except OSError:
+                return
+            if child.exited.wait(KILL_GRACE):
+                return
+
+    def running(self):
+        """运行中的子进程数"""
+        with self._lock:
+            return len(self._children)
+
+    def shutdown(self):
+        """停止接受新动作；已启动的程序继续运行，等待线程随进程退出"""
+        with self._lock:
+            self._closed = True
+        self._pool.shutdown(wait=False)
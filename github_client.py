@@ -0,0 +1,188 @@
+"""
+GitHub API 客户端和后台任务线程
+复用一个 requests.Session（连接池），所有请求都有超时，
+幂等请求在连接错误和 429/5xx 时按指数退避重试；git 命令和网络请求都在后台线程执行。
+"""
+
+import queue
+import subprocess
+import threading
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = "https://api.github.com"
+# (连接, 读取) 超时（秒）
+TIMEOUT = (5, 30)
+# 重试次数和退避基数：0.5s, 1s, 2s ...
+RETRIES = 3
+BACKOFF = 0.5
+# git 命令超时（秒）
+GIT_TIMEOUT = 120
+
+
+class GitHubError(Exception):
+    """API 返回错误"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class GitHubClient:
+    """GitHub REST API 客户端
+
+    base_url 可指向本地的模拟服务器。
+    """
+
+    def __init__(self, token, base_url=API_URL, timeout=TIMEOUT, retries=RETRIES):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json",
+        })
+        # POST 不是幂等的，不自动重试
+        retry = Retry(total=retries, backoff_factor=BACKOFF,
+                      status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset(('GET', 'HEAD', 'PUT', 'PATCH', 'DELETE')),
+                      respect_retry_after_header=True, raise_on_status=False)
+        adapter = HTTPAdapter(max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, expect=(200,), **kwargs):
+        """发送请求，状态码不在 expect 中时抛出 GitHubError，返回 Response"""
+        kwargs.setdefault('timeout', self.timeout)
+        resp = self.session.request(method, self.base_url + path, **kwargs)
+        if resp.status_code not in expect:
+            try:
+                message = resp.json().get('message')
+            except ValueError:
+                message = None
+            raise GitHubError(message or f"HTTP {resp.status_code}", resp.status_code)
+        return resp
+
+    def user(self):
+        """当前 Token 对应的用户"""
+        try:
+            return self.request('GET', '/user').json()
+        except GitHubError as e:
+            if e.status == 401:
+                raise GitHubError("Token 无效", e.status)
+            raise
+
+    def create_repo(self, name, auto_init=True):
+        return self.request('POST', '/user/repos', expect=(201,),
+                            json={"name": name, "auto_init": auto_init}).json()
+
+    def close(self):
+        self.session.close()
+
+
+def run_git(args, cwd=None, timeout=GIT_TIMEOUT):
+    """执行 git 命令，失败时抛出 RuntimeError，返回 CompletedProcess"""
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True,
+                            timeout=timeout, stdin=subprocess.DEVNULL)
+    if result.returncode != 0:
+        raise RuntimeError((result.stderr or result.stdout).strip() or f"git {args[0]} 失败")
+    return result
+
+
+def has_staged_changes(cwd=None, timeout=GIT_TIMEOUT):
+    """暂存区与 HEAD 是否有差异（不依赖 git 输出的语言）"""
+    result = subprocess.run(["git", "diff", "--cached", "--quiet"], cwd=cwd, capture_output=True,
+                            text=True, timeout=timeout, stdin=subprocess.DEVNULL)
+    if result.returncode not in (0, 1):
+        raise RuntimeError(result.stderr.strip() or "git diff 失败")
+    return result.returncode == 1
+
+
+def commit_all(message, cwd=None):
+    """暂存全部更改并提交，没有更改时返回 False；其他失败（钩子、身份未配置等）抛出 RuntimeError"""
+    run_git(["add", "."], cwd=cwd)
+    if not has_staged_changes(cwd):
+        return False
+    run_git(["commit", "-m", message], cwd=cwd)
+    return True
+
+
+def create_and_push(client, name, cwd=None, report=lambda message: None):
+    """创建仓库，把 cwd 的当前内容提交并推送到当前分支，返回仓库网页地址"""
+    report("正在验证 Token...")
+    username = client.user().get('login')
+    report("正在创建仓库...")
+    repo = client.create_repo(name)
+    html_url = repo.get('html_url') or f"https://github.com/{username}/{name}"
+    remote = repo.get('clone_url') or f"https://github.com/{username}/{name}.git"
+
+    report("仓库创建成功，正在提交...")
+    try:
+        run_git(["remote", "add", "origin", remote], cwd=cwd)
+    except RuntimeError:
+        run_git(["remote", "set-url", "origin", remote], cwd=cwd)
+    # 没有新更改时直接推送已有提交
+    commit_all(f"Initial commit - {datetime.now().isoformat()}", cwd=cwd)
+    report("正在推送...")
+    run_git(["push", "-u", "origin", "HEAD"], cwd=cwd)
+    return html_url
+
+
+class Worker:
+    """单线程的后台任务队列
+
+    submit(job, on_done) 把任务排队，job(report) 在后台线程执行；
+    进度 report(message) 和完成回调 on_done(result, error) 都经 post 切回 Tk 线程，
+    进度交给构造时传入的 on_report。
+    """
+
+    def __init__(self, post, on_report):
+        self.post = post
+        self.on_report = on_report
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, job, on_done=None):
+        with self._lock:
+            self._pending += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='github', daemon=True)
+                self._thread.start()
+        self._queue.put((job, on_done))
+
+    def _post(self, fn):
+        try:
+            self.post(fn)
+        except Exception:
+            pass    # 界面已关闭，丢弃
+
+    def _report(self, message):
+        self._post(lambda: self.on_report(message))
+
+    def _run(self):
+        while True:
+            job, on_done = self._queue.get()
+            if job is None:
+                return
+            result = error = None
+            try:
+                result = job(self._report)
+            except Exception as e:
+                error = e
+            with self._lock:
+                self._pending -= 1
+            if on_done:
+                self._post(lambda cb=on_done, r=result, e=error: cb(r, e))
+
+    def stop(self):
+        """处理完已排队的任务后退出线程"""
+        self._queue.put((None, None))
@@ -0,0 +1,215 @@
+"""
+GitHub 集成对话框
+只在打开对话框时导入，requests 不进入启动路径；
+网络请求和 git 命令都在后台线程执行，进度显示在状态栏，界面和 Alt+R 弹出框不会卡住
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox, simpledialog
+
+import transfer
+from github_client import API_URL, GitHubClient, Worker, commit_all, create_and_push, run_git
+
+
+class GitHubDialog(tk.Toplevel):
+    """base_url 可指向本地模拟服务器，repo_dir 是执行 git 命令的目录（默认当前目录）；
+    传入 manager 时显示快捷键目录同步（见 catalog_sync.py）"""
+
+    def __init__(self, parent, token, on_save_token=None, base_url=API_URL, repo_dir=None,
+                 manager=None):
+        super().__init__(parent)
+        self.on_save_token = on_save_token
+        self.manager = manager
+        self.base_url = base_url
+        self.repo_dir = repo_dir
+        self._client = None
+        self._client_token = None
+        self.worker = Worker(post=lambda fn: parent.after(0, fn), on_report=self.set_status)
+        self.title("GitHub 集成")
+        self.geometry("500x520")
+
+        ttk.Label(self, text="GitHub Token:").pack(anchor=tk.W, padx=10, pady=5)
+        self.token_var = tk.StringVar(value=token)
+        ttk.Entry(self, textvariable=self.token_var, width=50, show="*").pack(fill=tk.X, padx=10)
+        ttk.Label(self, text="Token 可在 GitHub Settings > Developer settings > Personal access tokens 创建",
+                 wraplength=450, foreground="gray").pack(padx=10)
+
+        ttk.Button(self, text="保存 Token", command=self.save_token).pack(pady=10)
+
+        ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=20)
+
+        ttk.Button(self, text="📦 创建仓库并提交", command=self.create_repo_and_commit).pack(pady=10)
+        ttk.Button(self, text="📤 提交当前更改", command=self.commit_changes).pack(pady=5)
+        ttk.Button(self, text="📋 打开 GitHub", command=self.open_github).pack(pady=5)
+
+        if manager is not None:
+            ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
+            ttk.Label(self, text="快捷键同步仓库 (owner/repo):").pack(anchor=tk.W, padx=10)
+            self.sync_repo_var = tk.StringVar(value=manager.load_config().get('sync_repo', ''))
+            ttk.Entry(self, textvariable=self.sync_repo_var, width=50).pack(fill=tk.X, padx=10)
+            sync_bar = ttk.Frame(self)
+            sync_bar.pack(pady=5)
+            ttk.Button(sync_bar, text="☁️ 立即同步", command=self.sync_now).pack(side=tk.LEFT, padx=5)
+            ttk.Button(sync_bar, text="⬇️ 从 GitHub 拉取", command=self.pull_catalog).pack(side=tk.LEFT, padx=5)
+
+        self.status_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.status_var, foreground="blue").pack(pady=10)
+
+    def destroy(self):
+        # 已排队的任务在后台做完，之后关闭连接池
+        client = self._client
+        self.worker.submit(lambda report: client and client.close())
+        self.worker.stop()
+        super().destroy()
+
+    def set_status(self, message):
+        """后台任务的进度（Tk 线程）"""
+        if self.winfo_exists():
+            self.status_var.set(message)
+
+    def client(self, token):
+        """按 Token 复用同一个客户端（同一个连接池）"""
+        if self._client is None or self._client_token != token:
+            if self._client is not None:
+                old = self._client
+                self.worker.submit(lambda report: old.close())
+            self._client = GitHubClient(token, self.base_url)
+            self._client_token = token
+        return self._client
+
+    def run(self, job, on_success):
+        """在后台执行 job(report)，完成后在 Tk 线程回调或显示错误"""
+        if self.worker.busy:
+            self.status_var.set("上一个操作尚未完成，请稍候")
+            return
+
+        def done(result, error):
+            if not self.winfo_exists():
+                return
+            if error is not None:
+                self.status_var.set(f"❌ {error}")
+                messagebox.showerror("错误", str(error), parent=self)
+            else:
+                on_success(result)
+
+        self.worker.submit(job, done)
+
+    def save_token(self):
+        token = self.token_var.get().strip()
+        if token:
+            if self.on_save_token:
+                self.on_save_token(token)
+            messagebox.showinfo("成功", "Token 已保存")
+        else:
+            messagebox.showwarning("提示", "请输入 Token")
+
+    def create_repo_and_commit(self):
+        """创建仓库并提交"""
+        token = self.token_var.get().strip()
+        if not token:
+            messagebox.showwarning("提示", "请先设置 GitHub Token")
+            return
+
+        repo_name = simpledialog.askstring("创建仓库", "输入仓库名称:", parent=self)
+        if not repo_name:
+            return
+
+        client = self.client(token)
+        repo_dir = self.repo_dir
+
+        def job(report):
+            return create_and_push(client, repo_name, repo_dir, report)
+
+        def success(html_url):
+            self.status_var.set(f"✅ 已创建并提交到 {html_url}")
+            messagebox.showinfo("成功", f"仓库已创建并提交:\n{html_url}", parent=self)
+
+        self.run(job, success)
+
+    def commit_changes(self):
+        """提交更改"""
+        message = simpledialog.askstring("提交", "输入提交信息:", parent=self)
+        if not message:
+            return
+        repo_dir = self.repo_dir
+
+        def job(report):
+            report("正在提交...")
+            if not commit_all(message, cwd=repo_dir):
+                return "没有更改需要提交"
+            report("已提交到本地仓库，正在推送...")
+            run_git(["push"], cwd=repo_dir)
+            return None
+
+        def success(nothing):
+            if nothing:
+                self.status_var.set("")
+                messagebox.showwarning("提示", nothing, parent=self)
+            else:
+                self.status_var.set("已推送到远程仓库")
+                messagebox.showinfo("成功", "已提交并推送", parent=self)
+
+        self.run(job, success)
+
+    def catalog_sync(self):
+        """保存同步仓库设置，返回管理器的同步器（未配置时提示并返回 None）"""
+        repo = self.sync_repo_var.get().strip()
+        config = self.manager.load_config()
+        if repo != config.get('sync_repo', ''):
+            self.manager.save_config(sync_repo=repo)
+            self.manager.reset_catalog_sync()
+        sync = self.manager.get_catalog_sync()
+        if sync is None:
+            messagebox.showwarning("提示", "请先保存 GitHub Token 并填写同步仓库", parent=self)
+        return sync
+
+    def sync_now(self):
+        """立即把当前快捷键提交到同步仓库（结果显示在主窗口状态栏）"""
+        sync = self.catalog_sync()
+        if sync:
+            self.status_var.set(f"正在同步到 {sync.repo}...")
+            sync.flush()
+
+    def pull_catalog(self):
+        """从同步仓库拉取快捷键，替换本地列表"""
+        sync = self.catalog_sync()
+        if not sync:
+            return
+
+        def job(report):
+            report(f"正在从 {sync.repo} 拉取...")
+            pulled = sync.pull()
+            if pulled is None:
+                return None
+            sha, records = pulled
+            return sha, transfer.parse_entries(records)
+
+        def success(pulled):
+            if pulled is None:
+                self.status_var.set("远端没有新的更改")
+                return
+            sha, result = pulled
+            self.status_var.set("")
+            text = f"用远端的 {len(result.entries)} 个快捷键替换本地列表？"
+            if result.skipped:
+                text += f"\n\n跳过 {result.skipped} 条无效记录：\n" + "\n".join(result.errors)
+            if messagebox.askyesno("确认", text, parent=self):
+                self.run(lambda report: apply(report, sha, result.entries), applied)
+
+        def apply(report, sha, entries):
+            # 和导入一样在后台整体替换
+            report("正在应用...")
+            self.manager.replace_hotkeys(entries)
+            # 之后的推送以拉取的内容为基础
+            sync.accept(sha)
+            return len(entries)
+
+        def applied(count):
+            self.status_var.set(f"已拉取 {count} 个快捷键")
+
+        self.run(job, success)
+
+    def open_github(self):
+        """打开 GitHub"""
+        from launchers import open_url
+        open_url("https://github.com")
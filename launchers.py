@@ -0,0 +1,143 @@
+"""
+常驻的剪贴板和浏览器启动器
+copy: 动作由本进程直接持有 X 的 CLIPBOARD 选区（通过 Xlib 应答粘贴请求），不再每次启动 xclip/xsel；
+URL 动作复用解析好的浏览器控制器。两者都在首次使用时建立，之后一直复用。
+"""
+
+import os
+import select
+import threading
+
+_lock = threading.Lock()
+_clipboard = None
+_browser = None
+
+
+class ClipboardOwner:
+    """持有 CLIPBOARD 选区的后台线程
+
+    copy() 可在任意线程调用，只把文本交给监控线程，由它取得选区所有权；
+    其他程序粘贴时由它按 TARGETS/UTF8_STRING/STRING 应答。
+    别的程序复制后本进程失去所有权，文本随之丢弃。
+    本进程退出后剪贴板内容不再可用（与 Tk 自身的剪贴板一致）。
+    """
+
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+        self._text = None
+        self._queued = None
+        self._queue_lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = None
+
+    def start(self):
+        """连接 X server 并启动线程，失败时抛出异常"""
+        from Xlib import X, display
+
+        self._display = display.Display(self.display_name)
+        d = self._display
+        screen = d.screen()
+        self._window = screen.root.create_window(0, 0, 1, 1, 0, screen.root_depth,
+                                                 event_mask=X.PropertyChangeMask)
+        self._clipboard = d.intern_atom('CLIPBOARD')
+        self._targets = d.intern_atom('TARGETS')
+        self._utf8 = d.intern_atom('UTF8_STRING')
+        self._text_atom = d.intern_atom('TEXT')
+        d.flush()
+        self._thread = threading.Thread(target=self._run, name='clipboard', daemon=True)
+        self._thread.start()
+
+    def copy(self, text):
+        with self._queue_lock:
+            self._queued = text
+        os.write(self._wake_w, b'x')
+
+    def _run(self):
+        from Xlib import X
+
+        d = self._display
+        while True:
+            while d.pending_events():
+                event = d.next_event()
+                if event.type == X.SelectionRequest:
+                    self._answer(event)
+                elif event.type == X.SelectionClear and event.atom == self._clipboard:
+                    self._text = None
+            readable, _, _ = select.select([d, self._wake_r], [], [])
+            if self._wake_r in readable:
+                os.read(self._wake_r, 64)
+                with self._queue_lock:
+                    text, self._queued = self._queued, None
+                if text is not None:
+                    self._text = text
+                    self._window.set_selection_owner(self._clipboard, X.CurrentTime)
+                    d.flush()
+
+    def _answer(self, request):
+        """应答一次粘贴请求"""
+        from Xlib import X, Xatom, error
+        from Xlib.protocol import event
+
+        prop = request.property or request.target
+        target = request.target
+        onerror = error.CatchError()
+        if self._text is None or request.selection != self._clipboard:
+            prop = X.NONE
+        elif target == self._targets:
+            request.requestor.change_property(
+                prop, Xatom.ATOM, 32,
+                [self._targets, self._utf8, self._text_atom, Xatom.STRING], onerror=onerror)
+        elif target in (self._utf8, self._text_atom):
+            request.requestor.change_property(prop, self._utf8, 8, self._text.encode('utf-8'),
+                                              onerror=onerror)
+        elif target == Xatom.STRING:
+            request.requestor.change_property(prop, Xatom.STRING, 8,
+                                              self._text.encode('latin-1', 'replace'),
+                                              onerror=onerror)
+        else:
+            prop = X.NONE
+        notify = event.SelectionNotify(time=request.time, requestor=request.requestor,
+                                       selection=request.selection, target=target,
+                                       property=prop)
+        request.requestor.send_event(notify, onerror=onerror)
+        self._display.flush()
+
+
+def _pyperclip_copy(text):
+    import pyperclip
+    pyperclip.copy(text)
+
+
+def copy_text(text):
+    """复制到剪贴板；没有 X 时退回 pyperclip"""
+    global _clipboard
+    owner = _clipboard
+    if owner is None:
+        with _lock:
+            if _clipboard is None:
+                owner = ClipboardOwner()
+                try:
+                    owner.start()
+                except Exception as e:
+                    print(f"剪贴板常驻失败，改用 pyperclip: {e}")
+                    owner = False
+                _clipboard = owner
+            owner = _clipboard
+    if owner:
+        owner.copy(text)
+    else:
+        _pyperclip_copy(text)
+
+
+def open_url(url):
+    """用首次解析出的浏览器控制器打开 URL"""
+    global _browser
+    browser = _browser
+    if browser is None:
+        import webbrowser
+        with _lock:
+            if _browser is None:
+                _browser = webbrowser.get()
+            browser = _browser
+    if not browser.open(url):
+        raise RuntimeError(f"无法打开: {url}")
@@ -10,30 +10,13 @@ Hotkey Manager - Ubuntu 快捷键管理工具
 
 import os
 import sys
+import time
+
+# 进程启动时刻，启动阶段计时从这里算起
+STARTED_AT = time.perf_counter()
 
 # Display 兼容层 - 处理本地/RDP 场景
-def setup_display():
-    """设置可用的 Display，处理各种场景"""
-    # 检查是否有可用的 display
-    if os.environ.get('DISPLAY'):
-        return True
-    
-    # 尝试查找 X11 socket（RDP 转发场景）
-    import glob
-    x11_sockets = glob.glob('/tmp/.X11-unix/X*')
-    if x11_sockets:
-        # 取最新的 socket
-        socket = sorted(x11_sockets)[-1]
-        display_num = socket.split('X')[-1]
-        os.environ['DISPLAY'] = f":{display_num}"
-        print(f"🔧 自动配置 RDP Display: {os.environ['DISPLAY']}")
-        return True
-    
-    # 尝试 WAYLAND
-    if os.environ.get('WAYLAND_DISPLAY'):
-        return True
-    
-    return False
+from display import setup_display
 
 # 启动时自动配置
 if not setup_display():
@@ -71,35 +54,50 @@ StartupNotify=true
     except Exception as e:
         print(f"无法创建快捷方式: {e}")
 
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox
+import argparse
 import json
 import os
-import subprocess
-import keyboard
-import pyperclip
-import requests
 from datetime import datetime
 import threading
 import sys
+import time
+
+from search import DebouncedSearch, SearchIndex, SearchSession
+from virtual_list import VirtualListbox, VirtualTreeview
+from window_monitor import ActiveWindowMonitor
+from tracing import TRACER, StartupTimer
+from config import CONFIG_FILE, HOTKEY_FILE, HOTKEY_BIN_FILE
+from storage import HotkeyStore, write_atomic
+from entry import HotkeyEntry, ACTION_URL, ACTION_CMD, ACTION_COPY
+from dispatch import ChordDispatcher
+from executor import ActionExecutor
+from conflicts import ConflictIndex, KIND_LABELS
 
-# 配置文件路径
-CONFIG_FILE = os.path.expanduser("~/.config/hotkey_manager/data.json")
-HOTKEY_FILE = os.path.expanduser("~/.config/hotkey_manager/hotkeys.json")
+# 弹出框最多显示的匹配数（按模糊匹配得分取前 N 个）
+POPUP_LIMIT = 50
+# 弹出框尺寸
+POPUP_WIDTH = 500
+POPUP_HEIGHT = 400
+# 保存时冲突提示最多列出的条数
+CONFLICT_PREVIEW = 8
 
 
 class HotkeySearchPopup(tk.Toplevel):
     """uTools 风格的快捷键搜索弹出框"""
     
-    def __init__(self, parent, hotkeys, current_window, on_execute):
+    def __init__(self, parent, hotkeys, index, current_window, on_execute):
         super().__init__(parent)
         
         self.hotkeys = hotkeys
+        self.index = index
         self.current_window = current_window
         self.on_execute = on_execute
+        self.searcher = DebouncedSearch(self.rank, self.show_results,
+                                        post=lambda fn: self.after(0, fn))
         
         # 窗口属性
         self.title("🔍 快捷键搜索")
-        self.geometry("500x400")
         self.attributes('-topmost', True)
         self.configure(bg='#2d2d2d')
         self.overrideredirect(True)  # 无边框
@@ -109,23 +107,27 @@ class HotkeySearchPopup(tk.Toplevel):
         
         self.setup_ui()
         self.bind_shortcuts()
-        
-        self.search_entry.focus_set()
         self.center_window()
+        
+        # 常驻复用：创建后先隐藏，Alt+R 时由 show() 重置并显示
+        self.withdraw()
+    
+    def show(self, hotkeys, current_window):
+        """重置搜索状态并显示"""
+        self.hotkeys = hotkeys
+        self.current_window = current_window
+        self.search_var.set('')  # 触发 on_search，取当前窗口的缓存过滤结果
+        self.deiconify()
+        self.lift()
+        self.search_entry.focus_force()
     
     def filter_by_window(self, hotkeys, current_window):
         """根据当前窗口过滤"""
         if not current_window or current_window == "Unknown":
             return hotkeys
         
-        result = []
-        for hk in hotkeys:
-            window = hk.get('window', '').strip()
-            if not window:  # 全局快捷键
-                result.append(hk)
-            elif current_window.lower().startswith(window.lower()):
-                result.append(hk)
-        return result
+        # 全局快捷键 + 窗口前缀匹配，由索引里的前缀树直接给出
+        return self.index.for_window(current_window)
     
     def setup_ui(self):
         """设置 UI"""
@@ -156,6 +158,7 @@ class HotkeySearchPopup(tk.Toplevel):
                                   selectbackground='#0078d7', selectforeground='white')
         self.listbox.pack(fill=tk.BOTH, expand=True)
         self.listbox.bind('<<ListboxSelect>>', self.on_select)
+        self.view = VirtualListbox(self.listbox, render=self.format_item)
         
         # 状态栏
         self.status = tk.Label(main, text=f"窗口: {self.current_window} | 共 {len(self.filtered)} 个",
@@ -164,104 +167,134 @@ class HotkeySearchPopup(tk.Toplevel):
         
         self.refresh_list()
     
+    def format_item(self, hk):
+        """列表项显示文本"""
+        return hk.label
+    
     def refresh_list(self):
-        """刷新列表"""
-        self.listbox.delete(0, tk.END)
-        for hk in self.filtered:
-            window = hk.get('window', '').strip()
-            hotkey = hk.get('hotkey', '').upper()
-            desc = hk.get('description', '')
-            text = f"[{window or '全局'}] {hotkey} - {desc}" if window else f"🌐 {hotkey} - {desc}"
-            self.listbox.insert(tk.END, text)
-        
-        if self.filtered:
-            self.listbox.selection_set(0)
+        """刷新列表（只物化可见行）"""
+        with TRACER.span('popup.refresh_list'):
+            self.view.set_items(self.filtered)
+            self.status.config(text=f"窗口: {self.current_window} | 共 {len(self.filtered)} 个")
+            if self.filtered:
+                self.view.select(0)
+        TRACER.since('keystroke.popup', 'popup.keystroke→list', clear=True)
+    
+    def bind_shortcuts(self):
+        """绑定快捷键"""
+        self.bind('<Alt-r>', lambda e: None)  # 阻止默认
+        self.bind('<Control-f>', lambda e: self.search_entry.focus_set())
     
     def on_search(self, *args):
         """搜索"""
         keyword = self.search_var.get().lower()
         if not keyword:
-            self.filtered = [h for h in self.hotkeys 
-                            if not h.get('window') or self.current_window.startswith(h.get('window', ''))]
+            self.searcher.cancel()
+            self.filtered = self.filter_by_window(self.hotkeys, self.current_window)
+            self.refresh_list()
         else:
-            self.filtered = [h for h in self.hotkeys 
-                            if (keyword in hk.get('hotkey', '').lower() or
-                                keyword in hk.get('description', '').lower()
-                                for hk in [h])]
-            # 简化搜索逻辑
-            self.filtered = []
-            for hk in self.hotkeys:
-                if (keyword in hk.get('hotkey', '').lower() or
-                    keyword in hk.get('description', '').lower()):
-                    self.filtered.append(hk)
-        
+            TRACER.mark('keystroke.popup')
+            self.searcher.submit(keyword)
+    
+    def rank(self, keyword):
+        """模糊排序（后台线程）"""
+        with TRACER.span('popup.rank'):
+            return self.index.rank(keyword, POPUP_LIMIT)
+    
+    def show_results(self, results):
+        """显示后台搜索结果"""
+        self.filtered = results
         self.refresh_list()
     
+    def flush_search(self):
+        """回车时输入可能还在防抖窗口内，直接同步搜索一次"""
+        if self.searcher.pending:
+            self.searcher.cancel()
+            self.show_results(self.rank(self.search_var.get()))
+    
     def move_down(self, e):
-        cur = self.listbox.curselection()
-        if cur and cur[0] < len(self.filtered) - 1:
-            self.listbox.selection_clear(cur)
-            self.listbox.selection_set(cur[0] + 1)
-            self.listbox.see(cur[0] + 1)
+        cur = self.view.selected_index()
+        if cur is not None and cur < len(self.filtered) - 1:
+            self.view.select(cur + 1)
         return 'break'
     
     def move_up(self, e):
-        cur = self.listbox.curselection()
-        if cur and cur[0] > 0:
-            self.listbox.selection_clear(cur)
-            self.listbox.selection_set(cur[0] - 1)
-            self.listbox.see(cur[0] - 1)
+        cur = self.view.selected_index()
+        if cur is not None and cur > 0:
+            self.view.select(cur - 1)
         return 'break'
     
     def select_current(self, e):
-        cur = self.listbox.curselection()
-        if cur:
-            self.execute_item(cur[0])
+        self.flush_search()
+        self.execute_item(self.view.selected_index())
         return 'break'
     
     def on_select(self, e):
-        self.after(50, lambda: self.execute_item(self.listbox.curselection()[0]) if self.listbox.curselection() else None)
+        self.after(50, lambda: self.execute_item(self.view.selected_index()))
     
     def execute_item(self, index):
-        if 0 <= index < len(self.filtered):
+        if index is not None and 0 <= index < len(self.filtered):
             self.on_execute(self.filtered[index])
             self.close()
     
     def center_window(self):
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() - self.winfo_width()) // 2
-        y = (self.winfo_screenheight() - self.winfo_height()) // 2
-        self.geometry(f'+{x}+{y}')
+        x = (self.winfo_screenwidth() - POPUP_WIDTH) // 2
+        y = (self.winfo_screenheight() - POPUP_HEIGHT) // 2
+        self.geometry(f'{POPUP_WIDTH}x{POPUP_HEIGHT}+{x}+{y}')
     
     def close(self, e=None):
-        self.destroy()
+        self.searcher.cancel()
+        self.withdraw()
 
 
 class HotkeyManager:
-    def __init__(self, root):
+    def __init__(self, root, startup=None, binary_store=False):
         self.root = root
         self.root.title("🔥 Hotkey Manager")
         self.root.geometry("900x600")
+        self.startup = startup or StartupTimer()
+        
+        # 先注册全局快捷键：回调只往 Tk 队列投递，mainloop 启动前按下也不会丢
+        self.popup_requested_at = None
+        self.executor = ActionExecutor(self.report_status)
+        self.catalog_sync = None
+        self.dispatcher = ChordDispatcher(self.on_user_hotkey)
+        self.setup_hotkeys()
+        self.startup.phase('hotkeys')
         
         # 数据
+        if binary_store:
+            # 二进制快照按需解码，首屏更快；build_indexes 之后全部条目都已解码。首次使用时从 hotkeys.json 迁移
+            self.store = HotkeyStore(HOTKEY_BIN_FILE, legacy_path=HOTKEY_FILE)
+        else:
+            self.store = HotkeyStore(HOTKEY_FILE)
         self.hotkeys = self.load_hotkeys()
-        self.github_token = self.load_github_token()
+        self.startup.phase('load')
+        # 索引和快捷键分发表在后台线程建立；增删改在索引锁内同时修改列表和索引，建立期间会等待
+        self.search_index = SearchIndex()
+        self.search_session = SearchSession(self.search_index)
+        self.conflicts = ConflictIndex()
+        self.replace_lock = threading.Lock()   # 导入、拉取的整体替换依次进行
+        threading.Thread(target=self.build_indexes, daemon=True).start()
         
         # 当前活动窗口
         self.current_window = "Unknown"
+        self.window_monitor = None
         self.window_monitor_thread = None
         self.running = True
         
         # UI
         self.setup_ui()
-        self.setup_hotkeys()
-        self.start_window_monitor()
+        self.startup.phase('ui')
         
-        # 弹出搜索窗口
-        self.popup = None
+        # 弹出搜索窗口：启动时建好并隐藏，Alt+R 只需重置并显示
+        self.popup = self.create_popup()
+        self.popup.bind('<Map>', self.on_popup_mapped)
+        self.popup.search_entry.bind('<FocusIn>', self.on_popup_focus, add='+')
+        self.startup.phase('popup')
         
-        # 注册全局快捷键
-        self.register_global_hotkeys()
+        self.start_window_monitor()
+        self.startup.phase('monitor')
     
     def setup_ui(self):
         """设置主界面"""
@@ -284,6 +317,8 @@ class HotkeyManager:
         self.search_frame = ttk.Frame(self.root)
         self.search_var = tk.StringVar()
         self.search_var.trace("w", self.filter_hotkeys)
+        self.searcher = DebouncedSearch(self.search_filtered, self.refresh_list,
+                                        post=lambda fn: self.root.after(0, fn))
         search_entry = ttk.Entry(self.search_frame, textvariable=self.search_var, width=50)
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
         ttk.Button(self.search_frame, text="清除", command=self.clear_search).pack(side=tk.RIGHT, padx=10)
@@ -304,8 +339,9 @@ class HotkeyManager:
         self.tree.column("description", width=300)
         self.tree.column("action", width=200)
         
-        scrollbar = ttk.Scrollbar(self.root, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # 虚拟化：Treeview 里只保留可见窗口附近的行，滚动条按完整数据换算
+        scrollbar = ttk.Scrollbar(self.root, orient=tk.VERTICAL)
+        self.tree_view = VirtualTreeview(self.tree, scrollbar, render=self.tree_values)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
@@ -322,91 +358,116 @@ class HotkeyManager:
         self.refresh_list()
     
     def setup_hotkeys(self):
-        """注册系统级快捷键"""
-        keyboard.add_hotkey('alt+r', self.show_search_popup)
-        keyboard.add_hotkey('ctrl+alt+s', self.save_hotkeys)
+        """注册系统级快捷键并安装键盘钩子"""
+        with TRACER.span('setup_hotkeys'):
+            try:
+                self.dispatcher.add_system('alt+r', self.request_search_popup)
+                self.dispatcher.add_system('ctrl+alt+s', lambda: self.root.after(0, self.save_hotkeys))
+                self.dispatcher.start()
+            except Exception as e:
+                print(f"全局快捷键注册失败: {e}")
+    
+    def build_indexes(self):
+        """建立搜索索引和快捷键分发表（后台线程）
+
+        各个索引都持有 HotkeyEntry，二进制快照的全部条目在这里解码。
+        """
+        with self.search_index.lock:
+            if self.store.migrated:
+                # 加载时已改写为规范组合键写法，压缩一次写回文件
+                self.store.compact(self.hotkeys)
+                print(f"已将 {self.store.migrated} 个快捷键改写为规范写法")
+                self.store.migrated = 0
+            self.search_index.rebuild(self.hotkeys)
+            self.conflicts.rebuild(self.hotkeys)
+            self.register_global_hotkeys()
+            hotkeys = list(self.hotkeys)
+        # 预编译执行计划，触发时不再解析动作字符串
+        for hk in hotkeys:
+            hk.plan
+    
+    def on_user_hotkey(self, hk):
+        """用户快捷键触发（在 keyboard 线程），直接提交给执行器"""
+        self.executor.submit(hk)
     
     def start_window_monitor(self):
-        """启动窗口监控"""
-        def monitor():
-            import Xlib
-            from Xlib import X, display
-            
-            d = display.Display()
-            root = d.screen().root
-            
-            while self.running:
-                try:
-                    active_window = root.get_property(
-                        d.intern_atom('_NET_ACTIVE_WINDOW'),
-                        Xlib.X.AnyPropertyType,
-                        0, 1024
-                    ).value[0]
-                    
-                    window = d.create_resource_object('window', active_window)
-                    window.map()
-                    
-                    window_name = window.get_wm_name()
-                    if window_name:
-                        self.current_window = window_name.split()[0] if ' ' in window_name else window_name
-                        
-                except:
-                    pass
-                    
-                self.root.after(0, self.update_window_label)
-                import time
-                time.sleep(1)
-        
-        self.window_monitor_thread = threading.Thread(target=monitor, daemon=True)
-        self.window_monitor_thread.start()
+        """启动窗口监控（订阅 X 事件，活动窗口变化时才更新）"""
+        def on_change(name):
+            # 监控线程：先更新标签，索引还在后台建立时预热会等待索引锁
+            self.current_window = name
+            self.root.after(0, self.update_window_label)
+            self.dispatcher.set_window(name)
+            # 预热当前窗口的快捷键列表，Alt+R 打开时直接取缓存
+            self.search_index.for_window(name)
+        
+        self.window_monitor = ActiveWindowMonitor(on_change)
+        try:
+            self.window_monitor_thread = self.window_monitor.start()
+        except Exception as e:
+            self.window_monitor = None
+            print(f"窗口监控启动失败: {e}")
     
     def update_window_label(self):
         """更新当前窗口标签"""
         self.window_label.config(text=f"当前窗口: {self.current_window}")
     
     def load_hotkeys(self):
-        """加载快捷键数据"""
-        if os.path.exists(HOTKEY_FILE):
-            try:
-                with open(HOTKEY_FILE, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
-        return []
+        """加载快捷键数据（快照 + 日志回放）"""
+        return self.store.load()
     
     def save_hotkeys(self):
-        """保存快捷键数据"""
-        os.makedirs(os.path.dirname(HOTKEY_FILE), exist_ok=True)
-        with open(HOTKEY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.hotkeys, f, ensure_ascii=False, indent=2)
+        """保存快捷键数据（压缩成完整快照）"""
+        with self.search_index.lock:
+            self.store.compact(self.hotkeys)
+        self.show_saved()
+        self.catalog_changed()
+    
+    def show_saved(self):
         self.status_var.set(f"已保存 {len(self.hotkeys)} 个快捷键 | {datetime.now().strftime('%H:%M:%S')}")
     
+    def tree_values(self, hk):
+        """列表行的显示内容"""
+        return hk.row
+    
     def refresh_list(self, filtered_list=None):
-        """刷新列表"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        items = filtered_list if filtered_list else self.hotkeys
-        for hk in items:
-            self.tree.insert("", tk.END, values=(
-                hk.get('window', ''),
-                hk.get('hotkey', ''),
-                hk.get('description', ''),
-                hk.get('action', '')
-            ))
+        """刷新列表（只物化可见行，并与已有行做差异更新）"""
+        with TRACER.span('main.refresh_list'):
+            if filtered_list is None:
+                self.tree_view.set_items(self.hotkeys, keep_position=True)
+            else:
+                self.tree_view.set_items(filtered_list)
+        TRACER.since('keystroke.main', 'main.keystroke→list', clear=True)
+    
+    def selected_hotkey_index(self):
+        """当前选中的快捷键在 self.hotkeys 中的下标"""
+        hk = self.tree_view.selected_item()
+        if hk is None:
+            return None
+        return self.index_of(hk)
+    
+    def index_of(self, hk):
+        """hk（按对象身份）在 self.hotkeys 中的下标，已不在列表中时返回 None"""
+        for i, item in enumerate(self.hotkeys):
+            if item is hk:
+                return i
+        return None
     
     def filter_hotkeys(self, *args):
         """搜索过滤"""
         keyword = self.search_var.get().lower()
         if not keyword:
+            self.searcher.cancel()
             self.refresh_list()
             return
         
-        filtered = [hk for hk in self.hotkeys 
-                   if keyword in hk.get('hotkey', '').lower() 
-                   or keyword in hk.get('description', '').lower()
-                   or keyword in hk.get('window', '').lower()]
-        self.refresh_list(filtered)
+        # 防抖后在后台线程搜索，只有最新结果会回到 Tk 线程刷新列表
+        TRACER.mark('keystroke.main')
+        self.searcher.submit(keyword)
+    
+    def search_filtered(self, keyword):
+        """子串搜索（后台线程）"""
+        with TRACER.span('main.search'):
+            return self.search_session.search(keyword)
     
     def clear_search(self):
         """清除搜索"""
@@ -423,99 +484,155 @@ class HotkeyManager:
     
     def add_hotkey(self):
         """添加快捷键"""
-        dialog = AddHotkeyDialog(self.root, self.current_window)
+        dialog = AddHotkeyDialog(self.root, self.current_window, self.check_conflicts)
+        self.root.wait_window(dialog)
         if dialog.result:
-            self.hotkeys.append(dialog.result)
-            self.save_hotkeys()
+            with self.search_index.lock:
+                # 先落盘，之后索引或全局注册出错也不会丢失这次修改
+                self.hotkeys.append(dialog.result)
+                self.store.append(dialog.result, self.hotkeys)
+                self.search_index.append(dialog.result)
+                self.conflicts.add(dialog.result)
+                self.dispatcher.add(dialog.result)
+            self.show_saved()
+            self.catalog_changed()
             self.refresh_list()
-            self.register_global_hotkeys()
     
     def edit_hotkey(self):
         """编辑快捷键"""
-        selected = self.tree.selection()
-        if not selected:
+        idx = self.selected_hotkey_index()
+        if idx is None:
             messagebox.showwarning("提示", "请选择一个快捷键")
             return
         
-        idx = self.tree.index(selected[0])
         old_hk = self.hotkeys[idx]
         
-        dialog = EditHotkeyDialog(self.root, old_hk)
+        dialog = EditHotkeyDialog(self.root, old_hk, self.check_conflicts)
+        self.root.wait_window(dialog)
         if dialog.result:
-            self.hotkeys[idx] = dialog.result
-            self.save_hotkeys()
+            with self.search_index.lock:
+                # 对话框打开期间列表可能被导入或拉取整体替换，按对象重新定位
+                idx = self.index_of(old_hk)
+                if idx is not None:
+                    self.hotkeys[idx] = dialog.result
+                    self.store.update(idx, dialog.result, self.hotkeys)
+                    self.search_index.update(idx, dialog.result)
+                    self.conflicts.remove(old_hk)
+                    self.conflicts.add(dialog.result)
+                    self.dispatcher.remove(old_hk)
+                    self.dispatcher.add(dialog.result)
+            if idx is None:
+                messagebox.showwarning("提示", "该快捷键已被导入或同步替换，修改未保存")
+                self.refresh_list()
+                return
+            self.show_saved()
+            self.catalog_changed()
             self.refresh_list()
-            self.register_global_hotkeys()
     
     def delete_hotkey(self):
         """删除快捷键"""
-        selected = self.tree.selection()
-        if not selected:
+        idx = self.selected_hotkey_index()
+        if idx is None:
             messagebox.showwarning("提示", "请选择一个快捷键")
             return
         
+        selected = self.hotkeys[idx]
         if messagebox.askyesno("确认", "确定删除选中的快捷键吗？"):
-            idx = self.tree.index(selected[0])
-            self.hotkeys.pop(idx)
-            self.save_hotkeys()
+            with self.search_index.lock:
+                # 确认期间列表可能被导入或拉取整体替换，按对象重新定位
+                idx = self.index_of(selected)
+                if idx is not None:
+                    removed = self.hotkeys.pop(idx)
+                    self.store.remove(idx, self.hotkeys)
+                    self.search_index.remove(idx)
+                    self.conflicts.remove(removed)
+                    self.dispatcher.remove(removed)
+            if idx is None:
+                messagebox.showwarning("提示", "该快捷键已被导入或同步替换，未删除")
+                self.refresh_list()
+                return
+            self.show_saved()
+            self.catalog_changed()
             self.refresh_list()
-            self.register_global_hotkeys()
+    
+    def check_conflicts(self, hk, ignore=None):
+        """保存前检查 hk 与已有快捷键的冲突（ignore 是正在编辑的原条目）"""
+        with self.search_index.lock:
+            return self.conflicts.check(hk, ignore)
+    
+    def scan_conflicts(self):
+        """全表冲突扫描"""
+        with self.search_index.lock:
+            return self.conflicts.scan()
     
     def execute_hotkey(self, event):
-        """执行快捷键动作"""
-        selected = self.tree.selection()
-        if not selected:
+        """执行选中快捷键的动作"""
+        idx = self.selected_hotkey_index()
+        if idx is None:
             return
         
-        idx = self.tree.index(selected[0])
-        hk = self.hotkeys[idx]
-        
-        action = hk.get('action', '')
-        if action:
-            try:
-                if action.startswith('http'):
-                    import webbrowser
-                    webbrowser.open(action)
-                elif action.startswith('cmd:'):
-                    subprocess.Popen(action[4:])
-                elif action.startswith('copy:'):
-                    pyperclip.copy(action[5:])
-                else:
-                    subprocess.Popen(action, shell=True)
-                    
-                self.status_var.set(f"执行: {hk.get('description', '')}")
-            except Exception as e:
-                messagebox.showerror("错误", f"执行失败: {e}")
+        self.run_action(self.hotkeys[idx])
     
+    def run_action(self, hk):
+        """执行快捷键动作（交给执行器，在后台线程启动）"""
+        self.executor.submit(hk)
     
-    def show_search_popup(self):
-        """显示快捷键搜索弹出框"""
-        if self.popup and self.popup.winfo_exists():
-            self.popup.lift()
-            return
-        
-        self.popup = HotkeySearchPopup(
+    def report_status(self, message):
+        """执行器回报状态（任意线程），切回 Tk 线程更新状态栏"""
+        self.root.after(0, self.status_var.set, message)
+    
+    
+    def create_popup(self):
+        """创建常驻的搜索弹出框"""
+        return HotkeySearchPopup(
             self.root,
             self.hotkeys,
+            self.search_index,
             self.current_window,
-            self.execute_hotkey
+            self.run_action
         )
+    
+    def request_search_popup(self):
+        """Alt+R 回调（在 keyboard 线程），记录触发时刻后切回 Tk 线程"""
+        self.popup_requested_at = time.perf_counter()
+        self.root.after(0, self.show_search_popup)
+    
+    def show_search_popup(self):
+        """显示快捷键搜索弹出框"""
+        if self.popup_requested_at is not None:
+            TRACER.record('alt+r→tk', (time.perf_counter() - self.popup_requested_at) * 1000)
+        with TRACER.span('show_search_popup'):
+            if self.popup.winfo_viewable():
+                self.popup.lift()
+                self.popup.search_entry.focus_force()
+                return
+            
+            self.popup.show(self.hotkeys, self.current_window)
+    
+    def on_popup_mapped(self, event):
+        """弹出框映射到屏幕，记录 Alt+R 到可见的耗时"""
+        if event.widget is not self.popup or self.popup_requested_at is None:
+            return
+        elapsed = (time.perf_counter() - self.popup_requested_at) * 1000
+        TRACER.record('alt+r→mapped', elapsed)
+        self.status_var.set(f"Alt+R 弹出耗时 {elapsed:.1f} ms")
+    
+    def on_popup_focus(self, event):
+        """搜索框获得焦点，记录 Alt+R 到可输入的耗时"""
+        if self.popup_requested_at is None:
+            return
+        TRACER.record('alt+r→focus', (time.perf_counter() - self.popup_requested_at) * 1000)
+        self.popup_requested_at = None
 
     def register_global_hotkeys(self):
-        """注册全局快捷键"""
-        # 先清除所有已注册的
-        keyboard.unhook_all()
-        
-        # 重新注册系统级快捷键
-        self.setup_hotkeys()
-        
-        # 为每个快捷键注册（如果需要）
-        for i, hk in enumerate(self.hotkeys):
-            try:
-                # 这里可以添加特定快捷键的全局注册
-                pass
-            except:
-                pass
+        """让全局分发表与快捷键列表一致，只增删有变化的快捷键（钩子和系统快捷键保持不变）"""
+        try:
+            skipped = self.dispatcher.sync(self.hotkeys)
+        except Exception as e:
+            print(f"快捷键注册失败: {e}")
+            return
+        if skipped:
+            print(f"{skipped} 个快捷键无法识别，未注册为全局快捷键")
     
     def toggle_window(self):
         """显示/隐藏窗口"""
@@ -526,38 +643,134 @@ class HotkeyManager:
             self.root.withdraw()
     
     def github_menu(self):
-        """GitHub 菜单"""
-        GitHubDialog(self.root, self.github_token)
+        """GitHub 菜单（首次打开时才导入 requests）"""
+        from github_dialog import GitHubDialog
+        GitHubDialog(self.root, self.load_github_token(), self.save_github_token, manager=self)
     
-    def load_github_token(self):
-        """加载 GitHub Token"""
+    def load_config(self):
+        """加载配置（GitHub Token、同步仓库）"""
         if os.path.exists(CONFIG_FILE):
             try:
                 with open(CONFIG_FILE, 'r') as f:
-                    data = json.load(f)
-                    return data.get('github_token', '')
+                    return json.load(f)
             except:
                 pass
-        return ''
+        return {}
+    
+    def save_config(self, **updates):
+        """合并写入配置"""
+        data = self.load_config()
+        data.update(updates)
+        write_atomic(CONFIG_FILE, lambda f: json.dump(data, f))
+    
+    def load_github_token(self):
+        """加载 GitHub Token"""
+        return self.load_config().get('github_token', '')
     
     def save_github_token(self, token):
         """保存 GitHub Token"""
-        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump({'github_token': token}, f)
-        self.github_token = token
+        self.save_config(github_token=token)
+        self.reset_catalog_sync()
+    
+    def get_catalog_sync(self):
+        """目录同步器；没有配置 Token 和同步仓库时返回 None（首次使用时才导入 requests）"""
+        if self.catalog_sync is None:
+            config = self.load_config()
+            token, repo = config.get('github_token'), config.get('sync_repo')
+            if not (token and repo):
+                self.catalog_sync = False
+            else:
+                from catalog_sync import CatalogSync
+                from github_client import GitHubClient
+                branch = config.get('sync_branch') or 'main'
+                # 上次同步时远端文件的 sha，仓库或分支变了就作废
+                base = config.get('sync_base') or {}
+                remote_sha = None
+                if base.get('repo') == repo and base.get('branch') == branch:
+                    remote_sha = base.get('sha')
+
+                def on_synced(sha):
+                    state = {'repo': repo, 'branch': branch, 'sha': sha}
+                    self.root.after(0, lambda: self.save_config(sync_base=state))
+
+                self.catalog_sync = CatalogSync(GitHubClient(token), repo, self.catalog_snapshot,
+                                                self.report_status, branch=branch,
+                                                remote_sha=remote_sha, on_synced=on_synced)
+        return self.catalog_sync or None
+    
+    def reset_catalog_sync(self):
+        """配置变化后重建同步器（未提交的修改先提交）"""
+        if self.catalog_sync:
+            self.catalog_sync.close()
+        self.catalog_sync = None
+    
+    def catalog_snapshot(self):
+        """当前快捷键的 dict 列表（同步线程调用）"""
+        with self.search_index.lock:
+            return [hk.to_dict() for hk in self.hotkeys]
+    
+    def catalog_changed(self):
+        """登记一次目录修改，配置了同步仓库时合并成一次提交推送"""
+        sync = self.get_catalog_sync()
+        if sync:
+            sync.changed()
+    
+    def replace_hotkeys(self, entries, merge=False):
+        """整体替换，或按 (窗口, 快捷键) 合并快捷键列表（导入、从 GitHub 拉取）
+
+        在后台线程调用：新的搜索索引、冲突索引和分发前缀树都在锁外建好，
+        索引锁内只交换引用，Alt+R 和增删改不必等待整个重建；快照随后在锁外写出。
+        合并期间列表被修改时基于新列表重新合并。界面刷新切回 Tk 线程。
+        返回 (新增数, 更新数)。
+        """
+        from transfer import merge_entries
+        with self.replace_lock:
+            while True:
+                with self.search_index.lock:
+                    base = list(self.hotkeys) if merge else None
+                    version = self.search_index.version
+                if merge:
+                    hotkeys, added, updated = merge_entries(base, entries)
+                else:
+                    hotkeys, added, updated = list(entries), len(entries), 0
+                index = SearchIndex(hotkeys)
+                conflicts = ConflictIndex(hotkeys)
+                bindings, skipped = self.dispatcher.prepare(hotkeys)
+                with self.search_index.lock:
+                    if merge and self.search_index.version != version:
+                        continue
+                    self.hotkeys = hotkeys
+                    self.search_index.replace(index)
+                    self.conflicts = conflicts
+                    self.dispatcher.install(bindings)
+                    self.store.begin_compact()
+                    frozen = list(hotkeys)
+                break
+            if skipped:
+                print(f"{skipped} 个快捷键无法识别，未注册为全局快捷键")
+            self.store.finish_compact(frozen)
+        self.root.after(0, self.on_hotkeys_replaced)
+        return added, updated
+    
+    def on_hotkeys_replaced(self):
+        self.show_saved()
+        self.refresh_list()
+        self.catalog_changed()
     
     def settings(self):
         """设置"""
+        from settings_dialog import SettingsDialog
         SettingsDialog(self.root, self)
 
 
 class AddHotkeyDialog(tk.Toplevel):
-    def __init__(self, parent, current_window):
+    def __init__(self, parent, current_window, check=None):
         super().__init__(parent)
         self.title("添加快捷键")
         self.geometry("500x400")
         self.result = None
+        self.check = check          # check(条目, ignore) -> [(冲突类型, 已有条目), ...]
+        self.original = None        # 编辑时的原条目，冲突检查时忽略
         
         # 当前窗口信息
         ttk.Label(self, text=f"当前窗口: {current_window}", foreground="blue").pack(anchor=tk.W, padx=10, pady=2)
@@ -605,7 +818,7 @@ class AddHotkeyDialog(tk.Toplevel):
     
     def save(self):
         window = self.window_var.get().strip()
-        hotkey = self.hotkey_var.get().strip().lower()
+        hotkey = self.hotkey_var.get().strip().lower()   # 构造条目时再改写为规范写法
         description = self.desc_var.get().strip()
         action_type = self.action_var.get()
         content = self.content_var.get().strip()
@@ -625,217 +838,85 @@ class AddHotkeyDialog(tk.Toplevel):
         else:
             action = content
         
-        self.result = {
-            'window': window,
-            'hotkey': hotkey,
-            'description': description,
-            'action': action,
-            'created': datetime.now().isoformat()
-        }
+        result = HotkeyEntry(window, hotkey, description, action, datetime.now().isoformat())
+        if not self.confirm_conflicts(result):
+            return
+        self.result = result
         self.destroy()
+    
+    def confirm_conflicts(self, hk):
+        """有冲突时列出并确认是否仍然保存"""
+        found = self.check(hk, self.original) if self.check else []
+        if not found:
+            return True
+        lines = [f"[{KIND_LABELS[kind]}] [{other.window.strip() or '全局'}] {other.hotkey} - {other.description}"
+                 for kind, other in found[:CONFLICT_PREVIEW]]
+        if len(found) > CONFLICT_PREVIEW:
+            lines.append(f"... 共 {len(found)} 个")
+        return messagebox.askyesno(
+            "快捷键冲突", "与以下快捷键冲突：\n\n" + "\n".join(lines) + "\n\n仍然保存？", parent=self)
 
 
 class EditHotkeyDialog(AddHotkeyDialog):
-    def __init__(self, parent, hotkey):
-        super().__init__(parent, hotkey.get('window', ''))
+    def __init__(self, parent, hotkey, check=None):
+        super().__init__(parent, hotkey.window, check)
         self.title("编辑快捷键")
+        self.original = hotkey
         
         # 填充现有数据
-        self.hotkey_var.set(hotkey.get('hotkey', ''))
-        self.desc_var.set(hotkey.get('description', ''))
-        action = hotkey.get('action', '')
+        self.hotkey_var.set(hotkey.hotkey)
+        self.desc_var.set(hotkey.description)
         
-        if action.startswith('http'):
+        if hotkey.action_type == ACTION_URL:
             self.action_var.set("打开URL")
-            self.content_var.set(action)
-        elif action.startswith('cmd:'):
+        elif hotkey.action_type == ACTION_CMD:
             self.action_var.set("执行命令")
-            self.content_var.set(action[4:])
-        elif action.startswith('copy:'):
+        elif hotkey.action_type == ACTION_COPY:
             self.action_var.set("复制文本")
-            self.content_var.set(action[5:])
-        else:
-            self.content_var.set(action)
-
-
-class GitHubDialog(tk.Toplevel):
-    def __init__(self, parent, token):
-        super().__init__(parent)
-        self.title("GitHub 集成")
-        self.geometry("500x400")
-        
-        ttk.Label(self, text="GitHub Token:").pack(anchor=tk.W, padx=10, pady=5)
-        self.token_var = tk.StringVar(value=token)
-        ttk.Entry(self, textvariable=self.token_var, width=50, show="*").pack(fill=tk.X, padx=10)
-        ttk.Label(self, text="Token 可在 GitHub Settings > Developer settings > Personal access tokens 创建",
-                 wraplength=450, foreground="gray").pack(padx=10)
-        
-        ttk.Button(self, text="保存 Token", command=self.save_token).pack(pady=10)
-        
-        ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=20)
-        
-        ttk.Button(self, text="📦 创建仓库并提交", command=self.create_repo_and_commit).pack(pady=10)
-        ttk.Button(self, text="📤 提交当前更改", command=self.commit_changes).pack(pady=5)
-        ttk.Button(self, text="📋 打开 GitHub", command=self.open_github).pack(pady=5)
-        
-        self.status_var = tk.StringVar()
-        ttk.Label(self, textvariable=self.status_var, foreground="blue").pack(pady=10)
-    
-    def save_token(self):
-        token = self.token_var.get().strip()
-        if token:
-            # 获取当前窗口的父窗口的父窗口（HotkeyManager 实例）
-            parent = self.master.master if hasattr(self.master, 'master') else self.master
-            while hasattr(parent, 'master'):
-                if isinstance(parent, HotkeyManager):
-                    parent.save_github_token(token)
-                    break
-                parent = parent.master
-            messagebox.showinfo("成功", "Token 已保存")
-        else:
-            messagebox.showwarning("提示", "请输入 Token")
-    
-    def create_repo_and_commit(self):
-        """创建仓库并提交"""
-        token = self.token_var.get().strip()
-        if not token:
-            messagebox.showwarning("提示", "请先设置 GitHub Token")
-            return
-        
-        repo_name = simpledialog.askstring("创建仓库", "输入仓库名称:", parent=self)
-        if not repo_name:
-            return
-        
-        self.status_var.set("正在创建仓库...")
-        self.update()
-        
-        try:
-            # 创建仓库
-            headers = {
-                "Authorization": f"token {token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            # 检查用户
-            resp = requests.get("https://api.github.com/user", headers=headers)
-            if resp.status_code != 200:
-                messagebox.showerror("错误", "Token 无效")
-                return
-            
-            username = resp.json().get('login')
-            
-            # 创建仓库
-            data = {"name": repo_name, "auto_init": True}
-            resp = requests.post("https://api.github.com/user/repos", 
-                               headers=headers, json=data)
-            
-            if resp.status_code == 201:
-                self.status_var.set("仓库创建成功，正在提交...")
-                
-                # 获取当前目录的 Git 仓库
-                subprocess.run(["git", "remote", "add", "origin", 
-                              f"https://github.com/{username}/{repo_name}.git"], 
-                              capture_output=True)
-                subprocess.run(["git", "add", "."], capture_output=True)
-                subprocess.run(["git", "commit", "-m", f"Initial commit - {datetime.now().isoformat()}"], 
-                              capture_output=True)
-                subprocess.run(["git", "push", "-u", "origin", "master"], 
-                              capture_output=True)
-                
-                self.status_var.set(f"✅ 已创建并提交到 https://github.com/{username}/{repo_name}")
-                messagebox.showinfo("成功", f"仓库已创建并提交:\nhttps://github.com/{username}/{repo_name}")
-            else:
-                messagebox.showerror("错误", resp.json().get('message', '创建失败'))
-                
-        except Exception as e:
-            messagebox.showerror("错误", str(e))
-    
-    def commit_changes(self):
-        """提交更改"""
-        message = simpledialog.askstring("提交", "输入提交信息:", parent=self)
-        if message:
-            subprocess.run(["git", "add", "."], capture_output=True)
-            result = subprocess.run(["git", "commit", "-m", message], 
-                                   capture_output=True, text=True)
-            if result.returncode == 0:
-                self.status_var.set("已提交到本地仓库")
-                subprocess.run(["git", "push"], capture_output=True)
-                self.status_var.set("已推送到远程仓库")
-                messagebox.showinfo("成功", "已提交并推送")
-            else:
-                messagebox.showwarning("提示", result.stderr or "没有更改需要提交")
-    
-    def open_github(self):
-        """打开 GitHub"""
-        import webbrowser
-        webbrowser.open("https://github.com")
-
+        self.content_var.set(hotkey.action_arg)
 
-class SettingsDialog(tk.Toplevel):
-    def __init__(self, parent, manager):
-        super().__init__(parent)
-        self.title("设置")
-        self.geometry("400x300")
-        self.manager = manager
-        
-        ttk.Label(self, text="全局快捷键:").pack(anchor=tk.W, padx=10, pady=10)
-        ttk.Label(self, text="显示/隐藏主窗口: Ctrl+Alt+H", foreground="blue").pack(anchor=tk.W, padx=20)
-        ttk.Label(self, text="保存快捷键: Ctrl+Alt+S", foreground="blue").pack(anchor=tk.W, padx=20)
-        
-        ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=20)
-        
-        ttk.Button(self, text="📁 打开配置目录", command=self.open_config_dir).pack(pady=10)
-        ttk.Button(self, text="💾 导出快捷键", command=self.export_hotkeys).pack(pady=5)
-        ttk.Button(self, text="📥 导入快捷键", command=self.import_hotkeys).pack(pady=5)
-        
-        ttk.Label(self, text="数据文件:", foreground="gray").pack(pady=5)
-        ttk.Label(self, text=HOTKEY_FILE, foreground="gray").pack(padx=10)
-    
-    def open_config_dir(self):
-        """打开配置目录"""
-        subprocess.Popen(["xdg-open", os.path.dirname(HOTKEY_FILE)])
-    
-    def export_hotkeys(self):
-        """导出快捷键"""
-        filepath = tk.filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
-            initialfile="hotkeys_backup.json"
-        )
-        if filepath:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.manager.hotkeys, f, ensure_ascii=False, indent=2)
-            messagebox.showinfo("成功", f"已导出到 {filepath}")
-    
-    def import_hotkeys(self):
-        """导入快捷键"""
-        filepath = tk.filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json")]
-        )
-        if filepath:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            if messagebox.askyesno("确认", f"导入 {len(data)} 个快捷键？"):
-                self.manager.hotkeys = data
-                self.manager.save_hotkeys()
-                self.manager.refresh_list()
-                messagebox.showinfo("成功", "已导入")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Hotkey Manager - Ubuntu 快捷键管理工具")
+    parser.add_argument('--trace', action='store_true',
+                        help='记录各阶段延迟，退出时输出 p50/p95/p99')
+    parser.add_argument('--compact-store', action='store_true',
+                        help='使用紧凑二进制快照（hotkeys.bin）存储，很大的快捷键目录启动更快'
+                             '（建立索引后内存与 JSON 相当）；'
+                             '该文件存在时自动启用')
+    args = parser.parse_args()
+    TRACER.enabled = args.trace
+    startup = StartupTimer(STARTED_AT)
+    startup.phase('imports')
+    
     root = tk.Tk()
     
     # 设置样式
     style = ttk.Style()
     style.theme_use('clam')
+    startup.phase('tk')
     
-    app = HotkeyManager(root)
+    binary_store = args.compact_store or os.path.exists(HOTKEY_BIN_FILE)
+    app = HotkeyManager(root, startup, binary_store)
+    startup.record(TRACER)
+    print(startup.report())
+    app.status_var.set(f"就绪 | Alt+R 搜索快捷键 | 启动 {startup.total:.0f} ms")
     
     # 窗口关闭时清理
     def on_closing():
         app.running = False
-        app.save_hotkeys()
+        if app.window_monitor:
+            app.window_monitor.stop()
+        if app.store.pending:
+            app.save_hotkeys()
+        app.store.close()
+        app.executor.shutdown()
+        if app.catalog_sync:
+            app.catalog_sync.close(timeout=10)
         root.destroy()
+        if args.trace:
+            print(TRACER.report())
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
     root.mainloop()
@@ -845,103 +926,6 @@ if __name__ == "__main__":
     main()
 
 
-# ============================================================
-# Display 兼容层（处理本地/RDP 场景）
-# ============================================================
-
-def setup_display():
-    """设置可用的 Display"""
-    import os
-    
-    # 1. 尝试从环境变量读取
-    displays = []
-    
-    # 检查常见的环境变量
-    display_vars = ['DISPLAY', 'WAYLAND_DISPLAY']
-    
-    for var in display_vars:
-        val = os.environ.get(var, '')
-        if val:
-            displays.append((var, val))
-    
-    # 2. 如果 RDP 转发，可能在 /tmp/.X11-unix/ 有 socket
-    import glob
-    x11_sockets = glob.glob('/tmp/.X11-unix/X*')
-    if x11_sockets:
-        for socket in x11_sockets:
-            display_num = socket.split('X')[-1]
-            displays.append(('X11-unix', f":{display_num}"))
-    
-    # 3. 尝试 XDG_SESSION_TYPE
-    session_type = os.environ.get('XDG_SESSION_TYPE', '')
-    displays.append(('XDG', session_type))
-    
-    return displays
-
-
-def get_best_display():
-    """获取最佳可用的 Display"""
-    import os
-    
-    # 方案1：本地桌面环境
-    if os.environ.get('DISPLAY'):
-        try:
-            # 尝试创建一个简单的 tk 窗口测试
-            test_root = tk.Tk()
-            test_root.withdraw()  # 隐藏
-            test_root.destroy()
-            return os.environ['DISPLAY']
-        except:
-            pass
-    
-    # 方案2：WAYLAND
-    if os.environ.get('WAYLAND_DISPLAY'):
-        try:
-            test_root = tk.Tk()
-            test_root.withdraw()
-            test_root.destroy()
-            return os.environ['WAYLAND_DISPLAY']
-        except:
-            pass
-    
-    # 方案3：RDP 转发（通常在 /tmp/.X11-unix/）
-    import glob
-    x11_sockets = glob.glob('/tmp/.X11-unix/X*')
-    if x11_sockets:
-        # 取最新的 socket
-        socket = sorted(x11_sockets)[-1]
-        display_num = socket.split('X')[-1]
-        os.environ['DISPLAY'] = f":{display_num}"
-        return f":{display_num}"
-    
-    # 方案4：使用 xdpyinfo 探测
-    import subprocess
-    try:
-        result = subprocess.run(['xdpyinfo'], capture_output=True, timeout=5)
-        if result.returncode == 0:
-            for line in result.stdout.decode().split('\n'):
-                if 'display name' in line.lower():
-                    display = line.split(':')[-1].strip()
-                    os.environ['DISPLAY'] = display
-                    return display
-    except:
-        pass
-    
-    # 方案5：返回默认 :0
-    return ':0'
-
-
-# 在程序启动时调用
-if __name__ == '__main__':
-    # 如果没有 display，尝试获取
-    import os
-    if not os.environ.get('DISPLAY'):
-        print("未检测到显示环境，尝试自动配置...")
-        display = get_best_display()
-        print(f"使用 Display: {display}")
-        os.environ['DISPLAY'] = display
-
-
 # ============================================================
 # 快捷键搜索弹出框（uTools 风格）
 # ============================================================
@@ -949,17 +933,20 @@ if __name__ == '__main__':
 class HotkeyPopup(tk.Toplevel):
     """uTools 风格的快捷键搜索弹出框"""
     
-    def __init__(self, parent, hotkeys, current_window, on_select):
+    def __init__(self, parent, hotkeys, index, current_window, on_select):
         super().__init__(parent)
         
         self.hotkeys = hotkeys
+        self.index = index
         self.current_window = current_window
-        self.on_select = on_select
+        # on_select 同名方法是列表选择事件，回调另存一个名字
+        self.on_execute = on_select
+        self.searcher = DebouncedSearch(self.rank, self.show_results,
+                                        post=lambda fn: self.after(0, fn))
         self.selected_index = 0
         
         # 设置窗口属性
         self.title("🔍 快捷键搜索")
-        self.geometry("500x400")
         self.attributes('-topmost', True)
         self.configure(bg='#2d2d2d')
         
@@ -972,25 +959,30 @@ class HotkeyPopup(tk.Toplevel):
         self.setup_ui()
         self.bind_shortcuts()
         
-        # 聚焦搜索框
-        self.search_entry.focus_set()
-        
         # 窗口居中
         self.center_window()
+        
+        # 常驻复用：创建后先隐藏，Alt+R 时由 show() 重置并显示
+        self.withdraw()
+    
+    def show(self, hotkeys, current_window):
+        """重置搜索状态并显示"""
+        self.hotkeys = hotkeys
+        self.current_window = current_window
+        self.search_var.set('')  # 触发 on_search，取当前窗口的缓存过滤结果
+        self.deiconify()
+        self.lift()
+        
+        # 聚焦搜索框
+        self.search_entry.focus_force()
     
     def filter_by_window(self, hotkeys, current_window):
         """根据当前窗口过滤快捷键"""
         if not current_window or current_window == "Unknown":
             return hotkeys
         
-        result = []
-        for hk in hotkeys:
-            window = hk.get('window', '').strip()
-            if not window:  # 全局快捷键
-                result.append(hk)
-            elif current_window.lower().startswith(window.lower()):
-                result.append(hk)
-        return result
+        # 全局快捷键 + 窗口前缀匹配，由索引里的前缀树直接给出
+        return self.index.for_window(current_window)
     
     def setup_ui(self):
         """设置 UI"""
@@ -1024,6 +1016,7 @@ class HotkeyPopup(tk.Toplevel):
         self.listbox.pack(fill=tk.BOTH, expand=True)
         self.listbox.bind('<<ListboxSelect>>', self.on_select)
         self.listbox.bind('<Double-1>', self.on_double_click)
+        self.view = VirtualListbox(self.listbox, render=self.format_item)
         
         # 状态栏
         self.status_label = tk.Label(main_frame, text=f"当前: {self.current_window} | 共 {len(self.filtered_hotkeys)} 个",
@@ -1043,93 +1036,91 @@ class HotkeyPopup(tk.Toplevel):
         keyword = self.search_var.get().lower()
         
         if not keyword:
-            self.filtered_hotkeys = [h for h in self.hotkeys 
-                                     if not h.get('window') or h.get('window').strip() == ''
-                                     or self.current_window.startswith(h.get('window', ''))]
+            self.searcher.cancel()
+            self.filtered_hotkeys = self.filter_by_window(self.hotkeys, self.current_window)
+            self.refresh_list()
         else:
-            self.filtered_hotkeys = []
-            for hk in self.hotkeys:
-                if (keyword in hk.get('hotkey', '').lower() or
-                    keyword in hk.get('description', '').lower() or
-                    keyword in hk.get('window', '').lower()):
-                    self.filtered_hotkeys.append(hk)
-        
+            # 防抖后在后台线程搜索，结果经 after 回到 Tk 线程
+            TRACER.mark('keystroke.popup')
+            self.searcher.submit(keyword)
+    
+    def rank(self, keyword):
+        """模糊排序（后台线程）"""
+        with TRACER.span('popup.rank'):
+            return self.index.rank(keyword, POPUP_LIMIT)
+    
+    def show_results(self, results):
+        """显示后台搜索结果"""
+        self.filtered_hotkeys = results
         self.refresh_list()
     
+    def flush_search(self):
+        """回车时输入可能还在防抖窗口内，直接同步搜索一次"""
+        if self.searcher.pending:
+            self.searcher.cancel()
+            self.show_results(self.rank(self.search_var.get()))
+    
+    def format_item(self, hk):
+        """列表项显示文本"""
+        return hk.label
+    
     def refresh_list(self):
-        """刷新列表"""
-        self.listbox.delete(0, tk.END)
-        
-        for hk in self.filtered_hotkeys:
-            window = hk.get('window', '').strip()
-            hotkey = hk.get('hotkey', '').upper()
-            desc = hk.get('description', '')
+        """刷新列表（只物化可见行）"""
+        with TRACER.span('popup.refresh_list'):
+            self.view.set_items(self.filtered_hotkeys)
             
-            if window:
-                text = f"[{window}] {hotkey} - {desc}"
-            else:
-                text = f"🌐 {hotkey} - {desc}"
+            self.status_label.config(text=f"当前: {self.current_window} | 匹配: {len(self.filtered_hotkeys)} 个")
             
-            self.listbox.insert(tk.END, text)
-        
-        self.status_label.config(text=f"当前: {self.current_window} | 匹配: {len(self.filtered_hotkeys)} 个")
-        
-        if self.filtered_hotkeys:
-            self.listbox.selection_set(0)
+            if self.filtered_hotkeys:
+                self.view.select(0)
+        TRACER.since('keystroke.popup', 'popup.keystroke→list', clear=True)
     
     def move_down(self, event):
         """向下移动"""
-        current = self.listbox.curselection()
-        if current and current[0] < len(self.filtered_hotkeys) - 1:
-            self.listbox.selection_clear(current)
-            self.listbox.selection_set(current[0] + 1)
-            self.listbox.see(current[0] + 1)
+        current = self.view.selected_index()
+        if current is not None and current < len(self.filtered_hotkeys) - 1:
+            self.view.select(current + 1)
         return 'break'
     
     def move_up(self, event):
         """向上移动"""
-        current = self.listbox.curselection()
-        if current and current[0] > 0:
-            self.listbox.selection_clear(current)
-            self.listbox.selection_set(current[0] - 1)
-            self.listbox.see(current[0] - 1)
+        current = self.view.selected_index()
+        if current is not None and current > 0:
+            self.view.select(current - 1)
         return 'break'
     
     def select_current(self, event):
         """选择当前项"""
-        current = self.listbox.curselection()
-        if current:
-            self.execute_selected(current[0])
+        self.flush_search()
+        self.execute_selected(self.view.selected_index())
         return 'break'
     
     def on_select(self, event):
         """选择事件"""
         # 延迟执行，避免点击时立即触发
-        self.after(100, lambda: self.execute_selected(self.listbox.curselection()[0]) if self.listbox.curselection() else None)
+        self.after(100, lambda: self.execute_selected(self.view.selected_index()))
     
     def on_double_click(self, event):
         """双击选择"""
-        current = self.listbox.curselection()
-        if current:
-            self.execute_selected(current[0])
+        self.execute_selected(self.view.selected_index())
     
     def execute_selected(self, index):
         """执行选中的快捷键"""
-        if 0 <= index < len(self.filtered_hotkeys):
+        if index is not None and 0 <= index < len(self.filtered_hotkeys):
             hk = self.filtered_hotkeys[index]
-            self.on_select(hk)
+            self.on_execute(hk)
             self.close()
     
     def center_window(self):
-        """窗口居中"""
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() - self.winfo_width()) // 2
-        y = (self.winfo_screenheight() - self.winfo_height()) // 2
-        self.geometry(f'+{x}+{y}')
+        """窗口居中（尺寸固定，不需要先 update_idletasks）"""
+        x = (self.winfo_screenwidth() - POPUP_WIDTH) // 2
+        y = (self.winfo_screenheight() - POPUP_HEIGHT) // 2
+        self.geometry(f'{POPUP_WIDTH}x{POPUP_HEIGHT}+{x}+{y}')
     
     def close(self, event=None):
-        """关闭"""
-        self.destroy()
+        """关闭（隐藏，下次 Alt+R 复用）"""
+        self.searcher.cancel()
+        self.withdraw()
 
 
 class HotkeyManagerWithPopup(HotkeyManager):
@@ -1137,57 +1128,26 @@ class HotkeyManagerWithPopup(HotkeyManager):
     
     def __init__(self, root):
         super().__init__(root)
-        self.popup = None
         self.setup_global_hotkey()
     
     def setup_global_hotkey(self):
         """设置全局 Alt+R 快捷键"""
-        import keyboard
-        
-        def show_popup():
-            if self.popup and self.popup.winfo_exists():
-                self.popup.lift()
-                self.popup.focus_force()
-            else:
-                self.show_search_popup()
-        
-        # 尝试注册 Alt+R
-        try:
-            keyboard.add_hotkey('alt+r', show_popup)
-            self.status_var.set("💡 按 Alt+R 搜索快捷键")
-        except:
-            self.status_var.set("⚠️  Alt+R 注册失败，需要 root 权限")
+        # Alt+R 已在 setup_hotkeys 中注册，这里只提示
+        self.status_var.set("💡 按 Alt+R 搜索快捷键")
     
-    def show_search_popup(self):
-        """显示搜索弹出框"""
-        if self.popup and self.popup.winfo_exists():
-            return
-        
-        self.popup = HotkeyPopup(
+    def create_popup(self):
+        """创建常驻的搜索弹出框"""
+        return HotkeyPopup(
             self.root,
             self.hotkeys,
+            self.search_index,
             self.current_window,
             self.execute_hotkey_from_popup
         )
     
     def execute_hotkey_from_popup(self, hk):
         """从弹出框执行快捷键"""
-        action = hk.get('action', '')
-        if action:
-            try:
-                if action.startswith('http'):
-                    import webbrowser
-                    webbrowser.open(action)
-                elif action.startswith('cmd:'):
-                    subprocess.Popen(action[4:], shell=True)
-                elif action.startswith('copy:'):
-                    pyperclip.copy(action[5:])
-                else:
-                    subprocess.Popen(action, shell=True)
-                    
-                self.status_var.set(f"执行: {hk.get('description', '')}")
-            except Exception as e:
-                print(f"执行失败: {e}")
+        self.executor.submit(hk)
 
 
 # 替换 main 函数中使用 HotkeyManager 为 HotkeyManagerWithPopup
@@ -0,0 +1,501 @@
+"""
+快捷键搜索引擎
+字段小写化只在建索引时做一次，三元组（trigram）倒排表加速子串查询，
+模糊排序先用三元组倒排表和字符签名筛掉不可能匹配的行，再按字段拼接成整块文本交给正则引擎批量扫描
+"""
+
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache, reduce
+from itertools import accumulate, compress
+from operator import or_
+
+from entry import SEARCH_FIELDS
+
+# 倒排表的 n-gram 长度，更短的关键字直接扫描预处理好的小写字段
+NGRAM = 3
+# 模糊排序的子串等级：最短的三元组倒排表不超过全部的这个比例时，只扫描倒排表求出的候选行
+RANK_POSTING_RATIO = 0.05
+# 模糊排序的首字母/子序列等级：按字符签名筛选后剩下的行不超过这个比例时，只扫描这些行
+RANK_SUBSET_RATIO = 0.5
+# 输入防抖窗口（毫秒），窗口内的连续按键合并为一次查询
+DEBOUNCE_MS = 60
+
+
+def _word_start(c):
+    """匹配位于词首的字符 c"""
+    # 先匹配字面量再回看，正则引擎才能用字面量前缀快速跳过无关位置
+    return f'{c}(?<![a-z0-9]{c})'
+
+
+# 模糊匹配等级（越大越靠前）：词首子串 > 任意子串 > 首字母 > 子序列
+_TIERS = (
+    (3, lambda chars: _word_start(chars[0]) + ''.join(chars[1:])),
+    (2, lambda chars: ''.join(chars)),
+    (1, lambda chars: '[^\n]*?'.join(map(_word_start, chars))),
+    # 用排除下一个字符的字符类代替惰性匹配，减少行内回溯
+    (0, lambda chars: chars[0] + ''.join(f'[^\n{c}]*{c}' for c in chars[1:])),
+)
+
+
+def _char_bit(c):
+    """字符在签名中的位：小写字母各占一位，其余字符按编码散列到剩下的 6 位"""
+    o = ord(c)
+    if 97 <= o <= 122:
+        return 1 << (o - 97)
+    return 1 << (26 + o % 6)
+
+
+class _CharBits(dict):
+    """字符 -> 签名位，首次遇到的字符才计算"""
+
+    def __missing__(self, c):
+        bit = self[c] = _char_bit(c)
+        return bit
+
+
+_CHAR_BITS = _CharBits()
+# bytes.translate 用的表：0 -> 1，其余 -> 0
+_ZERO_FLAGS = bytes([1] + [0] * 255)
+
+
+@lru_cache(maxsize=1 << 16)
+def _signature(text):
+    """32 位字符签名：某行的签名不包含关键字的签名时，这一行不可能匹配
+
+    快捷键和窗口名大量重复，按字符串缓存。
+    """
+    return reduce(or_, map(_CHAR_BITS.__getitem__, set(text)), 0)
+
+
+def _line_starts(lines):
+    """'\n'.join(lines) 中各行的起始偏移（多一项结尾）"""
+    starts = [0]
+    starts.extend(accumulate(map((1).__add__, map(len, lines))))
+    return starts
+
+
+def _grams(text):
+    """生成 text 的所有 n-gram"""
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class WindowTrie:
+    """按小写 window 字段组织的前缀树
+
+    每个节点保存 window 恰好等于该路径的 doc_id，根节点即 window 为空的全局快捷键；
+    沿当前窗口名逐字符下行即可收集所有 window 是其前缀的快捷键，代价为 O(前缀长度 + 匹配数)。
+    """
+
+    def __init__(self):
+        self._root = ({}, set())  # (子节点, doc_id 集合)
+
+    def add(self, window, doc_id):
+        node = self._root
+        for ch in window:
+            node = node[0].setdefault(ch, ({}, set()))
+        node[1].add(doc_id)
+
+    def discard(self, window, doc_id):
+        path = [self._root]
+        for ch in window:
+            node = path[-1][0].get(ch)
+            if node is None:
+                return
+            path.append(node)
+        path[-1][1].discard(doc_id)
+        # 清理空的叶子节点
+        for ch, node, parent in zip(reversed(window), reversed(path), reversed(path[:-1])):
+            if node[0] or node[1]:
+                break
+            del parent[0][ch]
+
+    def match(self, name):
+        """返回 window 为空或是 name 前缀的 doc_id"""
+        node = self._root
+        result = set(node[1])
+        for ch in name:
+            node = node[0].get(ch)
+            if node is None:
+                break
+            result |= node[1]
+        return result
+
+
+class SearchIndex:
+    """快捷键搜索索引，与 hotkeys 列表按位置一一对应
+
+    文档 id 按追加顺序递增，编辑时沿用原 id，因此按 id 排序即为列表顺序。
+    """
+
+    def __init__(self, hotkeys=()):
+        self.lock = threading.RLock()   # 搜索可能在后台线程进行
+        self.version = 0      # 每次变更递增，供搜索会话判断缓存是否失效
+        self.rebuild(hotkeys)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def rebuild(self, hotkeys):
+        """全量重建索引（导入等整体替换场景）"""
+        with self.lock:
+            self._docs = {}       # doc_id -> 快捷键
+            self._fields = {}     # doc_id -> 小写字段元组
+            self._postings = {}   # trigram -> {doc_id}
+            self._signatures = {}  # doc_id -> 各字段的字符签名
+            self._ids = []        # 列表位置 -> doc_id
+            self._next_id = 0
+            self._blobs = None    # 模糊排序用的整块文本，变更后按需重建
+            self._windows = WindowTrie()
+            self._window_cache = None
+            for hk in hotkeys:
+                self.append(hk)
+            self.version += 1
+
+    def replace(self, other):
+        """换成在锁外建好的索引 other 的内容（导入等整体替换），锁内只交换引用"""
+        state = {name: value for name, value in vars(other).items() if name not in ('lock', 'version')}
+        with self.lock:
+            vars(self).update(state)
+            self.version += 1
+
+    def append(self, hk):
+        """对应 hotkeys.append"""
+        with self.lock:
+            doc_id = self._next_id
+            self._next_id += 1
+            self._ids.append(doc_id)
+            self._insert(doc_id, hk)
+            self.version += 1
+
+    def update(self, idx, hk):
+        """对应 hotkeys[idx] = hk"""
+        with self.lock:
+            doc_id = self._ids[idx]
+            self._discard(doc_id)
+            self._insert(doc_id, hk)
+            self.version += 1
+
+    def remove(self, idx):
+        """对应 hotkeys.pop(idx)"""
+        with self.lock:
+            self._discard(self._ids.pop(idx))
+            self.version += 1
+
+    def _insert(self, doc_id, hk):
+        fields = hk.search_keys
+        self._docs[doc_id] = hk
+        self._fields[doc_id] = fields
+        self._signatures[doc_id] = tuple(map(_signature, fields))
+        self._windows.add(fields[2], doc_id)
+        postings = self._postings
+        # 字段间用 \0 分隔，跨字段的 n-gram 不会被任何关键字命中
+        for gram in _grams('\0'.join(fields)):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {doc_id}
+            else:
+                posting.add(doc_id)
+
+    def _discard(self, doc_id):
+        fields = self._fields.pop(doc_id)
+        del self._signatures[doc_id]
+        del self._docs[doc_id]
+        self._windows.discard(fields[2], doc_id)
+        for gram in _grams('\0'.join(fields)):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(doc_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def _candidates(self, keyword, max_size=None):
+        """用倒排表求候选集，关键字过短（或最短的倒排表超过 max_size）时返回 None 表示需要全量扫描"""
+        grams = _grams(keyword)
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(g, ()) for g in grams), key=len)
+        if max_size is not None and len(postings[0]) > max_size:
+            return None
+        if not postings[0]:
+            return set()
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def search_ids(self, keyword, fields=SEARCH_FIELDS, pool=None):
+        """返回匹配的 doc_id 列表（升序）
+
+        pool 为上一轮的有序结果时只在其中筛选，代价与 pool 大小成正比。
+        """
+        with self.lock:
+            keyword = keyword.lower()
+            cols = [SEARCH_FIELDS.index(name) for name in fields]
+            all_fields = self._fields
+            if pool is not None:
+                return [doc_id for doc_id in pool
+                        if any(keyword in all_fields[doc_id][c] for c in cols)]
+            candidates = self._candidates(keyword)
+            if candidates is None:
+                candidates = all_fields.keys()
+            matched = [doc_id for doc_id in candidates
+                       if any(keyword in all_fields[doc_id][c] for c in cols)]
+            matched.sort()
+            return matched
+
+    def entries(self, ids):
+        """doc_id 列表转换为快捷键列表"""
+        with self.lock:
+            docs = self._docs
+            return [docs[doc_id] for doc_id in ids]
+
+    def search(self, keyword, fields=SEARCH_FIELDS):
+        """返回任一字段包含 keyword 的快捷键，保持列表顺序"""
+        return self.entries(self.search_ids(keyword, fields))
+
+    def for_window(self, window):
+        """当前窗口可用的快捷键：全局快捷键 + window 是当前窗口名前缀的快捷键
+
+        结果按 (窗口, 版本) 缓存，窗口监控切换窗口时即可预热；返回的列表不要修改。
+        """
+        with self.lock:
+            key = (window.lower(), self.version)
+            if self._window_cache is None or self._window_cache[0] != key:
+                ids = sorted(self._windows.match(key[0]))
+                self._window_cache = (key, self.entries(ids))
+            return self._window_cache[1]
+
+    def _field_blobs(self):
+        """每个字段一块文本（每行一个快捷键）、各行起始偏移、各行文本，
+        以及把各行 32 位签名依次拼成的一个大整数；
+        另附每行最低位为 1 的大整数（用于把掩码复制到每一行）和行号列表
+        """
+        if self._blobs is None or self._blobs[0] != self.version:
+            ids = self._ids
+            blobs = []
+            for col in range(len(SEARCH_FIELDS)):
+                lines = [self._fields[doc_id][col] for doc_id in ids]
+                signatures = array('I', [self._signatures[doc_id][col] for doc_id in ids])
+                blobs.append(('\n'.join(lines), _line_starts(lines), lines,
+                              int.from_bytes(signatures.tobytes(), 'little')))
+            ones = int.from_bytes(array('I', [1]).tobytes() * len(ids), 'little')
+            self._blobs = (self.version, blobs, ones, list(range(len(ids))))
+        return self._blobs[1:]
+
+    def _signature_rows(self, col, need):
+        """某个字段里签名包含 need 的行号（即列表位置），剩下的行太多时返回 None
+
+        所有行的签名拼在一个大整数里，一次与运算即可逐行比较，筛选全部在 C 层面完成。
+        """
+        blobs, ones, positions = self._field_blobs()
+        packed = blobs[col][3]
+        mask = need * ones
+        missing = (packed & mask) ^ mask
+        # 把每行 4 字节折叠到最低字节：为 0 说明这一行不缺任何字符
+        missing |= missing >> 16
+        missing |= missing >> 8
+        flags = missing.to_bytes(len(positions) * 4, 'little')[::4].translate(_ZERO_FLAGS)
+        if flags.count(1) > len(positions) * RANK_SUBSET_RATIO:
+            return None
+        return list(compress(positions, flags))
+
+    def _field_view(self, col, rows):
+        """(文本块, 起始偏移, 行号 -> 列表位置)：rows 为 None 时是完整文本块（第三项也为 None），
+        否则只拼接这些行
+        """
+        blob, starts, lines, _ = self._field_blobs()[0][col]
+        if rows is None:
+            return blob, starts, None
+        subset = list(map(lines.__getitem__, rows))
+        return '\n'.join(subset), _line_starts(subset), rows
+
+    def rank(self, keyword, limit):
+        """模糊匹配并返回得分最高的 limit 个快捷键
+
+        扫描前先筛掉不可能匹配的行：子串等级要求关键字的全部三元组都出现，倒排表足够稀疏时只扫描候选行；
+        首字母/子序列等级要求全部字符出现在同一字段里，按字符签名筛选。
+        很少命中或不命中的关键字因此只扫描很小的文本块。
+        按 (等级, 字段) 从高到低逐块扫描，每次扫描都是一次 C 层面的正则遍历；
+        结果只保留在大小为 limit 的最小堆里，堆满后后续扫描无法胜出时提前结束。
+        得分相同按列表顺序。
+        """
+        with self.lock:
+            raw = [c for c in keyword.lower() if not c.isspace()]
+            if not raw or limit <= 0:
+                return []
+            chars = [re.escape(c) for c in raw]
+            need = _signature(''.join(raw))
+            heap = []
+            seen = set()
+            # 子串等级的候选行（None 表示扫描全部）
+            substring_rows = None
+            candidates = self._candidates(''.join(raw), len(self._ids) * RANK_POSTING_RATIO)
+            if candidates is not None:
+                ids = self._ids
+                substring_rows = sorted(bisect_left(ids, doc_id) for doc_id in candidates)
+            views = {}   # (是否模糊等级, 字段) -> 筛选后的文本块，首次扫描时生成
+            field_weights = range(len(SEARCH_FIELDS) - 1, -1, -1)
+            for tier, build in _TIERS:
+                if tier < 2 and len(chars) == 1:
+                    # 单个字符的首字母/子序列匹配与子串匹配等价
+                    break
+                pattern = re.compile(build(chars))
+                for col, weight in enumerate(field_weights):
+                    best = (tier, weight, -len(chars), 0)
+                    if len(heap) == limit and best <= heap[0][:4]:
+                        return self._ranked(heap)
+                    view = views.get((tier < 2, col))
+                    if view is None:
+                        rows = substring_rows if tier >= 2 else self._signature_rows(col, need)
+                        view = views[tier < 2, col] = self._field_view(col, rows)
+                    blob, starts, rows = view
+                    for m in pattern.finditer(blob):
+                        pos = bisect_right(starts, m.start()) - 1
+                        if rows is not None:
+                            pos = rows[pos]
+                        if pos in seen:
+                            continue
+                        item = (tier, weight, m.start() - m.end(), -pos, pos)
+                        if len(heap) < limit:
+                            heapq.heappush(heap, item)
+                        elif item > heap[0]:
+                            heapq.heapreplace(heap, item)
+                        elif tier >= 2:
+                            # 子串等级跨度恒定，后面的行只会更靠后
+                            break
+                        else:
+                            continue
+                        seen.add(pos)
+            return self._ranked(heap)
+
+    def _ranked(self, heap):
+        ids = self._ids
+        return self.entries(ids[item[-1]] for item in sorted(heap, reverse=True))
+
+
+class SearchSession:
+    """一次输入过程的搜索会话
+
+    新关键字包含上一轮关键字时（"ct" -> "ctr" -> "ctrl"），结果必然是上一轮的子集，
+    只需在上一轮结果中继续筛选；退格或索引有变更时回退到完整索引。
+    """
+
+    def __init__(self, index, fields=SEARCH_FIELDS):
+        self.index = index
+        self.fields = fields
+        self.reset()
+
+    def reset(self):
+        """丢弃缓存的结果集"""
+        self._keyword = None
+        self._ids = None
+        self._version = None
+
+    def search(self, keyword):
+        """搜索并缓存本轮结果"""
+        keyword = keyword.lower()
+        with self.index.lock:
+            pool = None
+            if (self._ids is not None and self._version == self.index.version
+                    and self._keyword in keyword):
+                pool = self._ids
+            ids = self.index.search_ids(keyword, self.fields, pool)
+            self._keyword, self._ids, self._version = keyword, ids, self.index.version
+            return self.index.entries(ids)
+
+
+class DebouncedSearch:
+    """输入防抖 + 后台线程查询
+
+    submit() 在 Tk 线程调用，debounce_ms 内的连续输入合并为一次查询，
+    查询在后台线程执行；期间有更新的输入时旧结果直接作废，
+    只有最新一次的结果通过 post（通常是 root.after）回到 Tk 线程交给 on_result。
+    """
+
+    def __init__(self, search, on_result, post, debounce_ms=DEBOUNCE_MS):
+        self.search = search
+        self.on_result = on_result
+        self.post = post
+        self.debounce = debounce_ms / 1000
+        self._cond = threading.Condition()
+        self._generation = 0      # 每次输入/取消递增，用于判断结果是否过期
+        self._delivered = 0       # 最近一次交付（或取消）时的 generation
+        self._query = None        # 等待执行的查询
+        self._deadline = 0
+        self._closed = False
+        self._thread = None
+
+    def submit(self, query):
+        """提交新的查询，之前未完成的查询作废"""
+        with self._cond:
+            self._generation += 1
+            self._query = query
+            self._deadline = time.monotonic() + self.debounce
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def cancel(self):
+        """作废所有未完成的查询"""
+        with self._cond:
+            self._generation += 1
+            self._delivered = self._generation
+            self._query = None
+            self._cond.notify()
+
+    @property
+    def pending(self):
+        """最新的输入是否还没有交付结果"""
+        return self._delivered != self._generation
+
+    def close(self):
+        """停止后台线程"""
+        with self._cond:
+            self._closed = True
+            self._generation += 1
+            self._query = None
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._query is None:
+                        self._cond.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                query, generation = self._query, self._generation
+                self._query = None
+
+            try:
+                result = self.search(query)
+            except Exception as e:
+                print(f"搜索失败: {e}")
+                continue
+
+            if generation != self._generation:
+                continue
+            try:
+                self.post(lambda: self._deliver(generation, result))
+            except Exception:
+                # 目标窗口已销毁
+                pass
+
+    def _deliver(self, generation, result):
+        """在 Tk 线程上交付结果，再检查一次是否已被更新的输入取代"""
+        if generation == self._generation:
+            self._delivered = generation
+            self.on_result(result)
@@ -0,0 +1,214 @@
+"""
+设置对话框
+只在打开对话框时导入
+"""
+
+import os
+import subprocess
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+import transfer
+from conflicts import KIND_LABELS, describe
+from tracing import TRACER
+from virtual_list import VirtualTreeview
+
+FILE_TYPES = [("JSON files", "*.json"), ("NDJSON files", "*.ndjson *.jsonl"), ("All files", "*")]
+
+
+class SettingsDialog(tk.Toplevel):
+    def __init__(self, parent, manager):
+        super().__init__(parent)
+        self.title("设置")
+        self.geometry("520x640")
+        self.manager = manager
+        self.busy = False
+        
+        ttk.Label(self, text="全局快捷键:").pack(anchor=tk.W, padx=10, pady=10)
+        ttk.Label(self, text="显示/隐藏主窗口: Ctrl+Alt+H", foreground="blue").pack(anchor=tk.W, padx=20)
+        ttk.Label(self, text="保存快捷键: Ctrl+Alt+S", foreground="blue").pack(anchor=tk.W, padx=20)
+        
+        ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=20)
+        
+        ttk.Button(self, text="📁 打开配置目录", command=self.open_config_dir).pack(pady=10)
+        ttk.Button(self, text="💾 导出快捷键", command=self.export_hotkeys).pack(pady=5)
+        ttk.Button(self, text="📥 导入快捷键", command=self.import_hotkeys).pack(pady=5)
+        self.merge_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self, text="导入时合并（相同窗口 + 快捷键的条目被覆盖），否则整体替换",
+                        variable=self.merge_var).pack(pady=2)
+        self.progress = ttk.Progressbar(self, mode='determinate', maximum=100)
+        self.progress.pack(fill=tk.X, padx=10, pady=5)
+        self.progress_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.progress_var, foreground="gray").pack()
+        ttk.Button(self, text="⚠️ 检查快捷键冲突", command=self.show_conflicts).pack(pady=5)
+        
+        ttk.Label(self, text="数据文件:", foreground="gray").pack(pady=5)
+        ttk.Label(self, text=manager.store.path, foreground="gray").pack(padx=10)
+        
+        # 调试：延迟统计
+        ttk.Separator(self, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
+        trace_bar = ttk.Frame(self)
+        trace_bar.pack(fill=tk.X, padx=10)
+        self.trace_var = tk.BooleanVar(value=TRACER.enabled)
+        ttk.Checkbutton(trace_bar, text="记录延迟 (p50/p95/p99)", variable=self.trace_var,
+                        command=self.toggle_trace).pack(side=tk.LEFT)
+        ttk.Button(trace_bar, text="清空", command=self.clear_trace).pack(side=tk.RIGHT)
+        ttk.Button(trace_bar, text="刷新", command=self.refresh_trace).pack(side=tk.RIGHT, padx=5)
+        self.trace_text = tk.Text(self, height=9, font=('Courier', 9), state=tk.DISABLED)
+        self.trace_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.refresh_trace()
+    
+    def toggle_trace(self):
+        """启用/停用延迟追踪"""
+        TRACER.enabled = self.trace_var.get()
+        self.refresh_trace()
+    
+    def clear_trace(self):
+        """清空延迟样本"""
+        TRACER.clear()
+        self.refresh_trace()
+    
+    def refresh_trace(self):
+        """刷新延迟统计表"""
+        text = TRACER.report() if TRACER.enabled else "未启用（勾选上方选项或以 --trace 启动）"
+        self.trace_text.config(state=tk.NORMAL)
+        self.trace_text.delete('1.0', tk.END)
+        self.trace_text.insert('1.0', text)
+        self.trace_text.config(state=tk.DISABLED)
+    
+    def open_config_dir(self):
+        """打开配置目录"""
+        subprocess.Popen(["xdg-open", os.path.dirname(self.manager.store.path)])
+    
+    def show_conflicts(self):
+        """全表扫描冲突并列出"""
+        ConflictDialog(self, self.manager.scan_conflicts())
+    
+    def post(self, fn, *args):
+        """从后台线程切回 Tk 线程（对话框已关闭时丢弃）"""
+        def run():
+            if self.winfo_exists():
+                fn(*args)
+        self.manager.root.after(0, run)
+    
+    def progress_reporter(self, total, text):
+        """返回后台线程用的进度回调，百分比变化时才刷新进度条"""
+        last = [-1]
+        def report(done):
+            percent = min(100, done * 100 // total) if total else 100
+            if percent != last[0]:
+                last[0] = percent
+                self.post(self.show_progress, percent, f"{text} {percent}%")
+        return report
+    
+    def show_progress(self, percent, text):
+        self.progress['value'] = percent
+        self.progress_var.set(text)
+    
+    def start(self, target, *args):
+        """在后台线程执行导入导出，同一时间只允许一个"""
+        if self.busy:
+            messagebox.showwarning("提示", "上一个导入/导出尚未完成", parent=self)
+            return
+        self.busy = True
+        threading.Thread(target=target, args=args, daemon=True).start()
+    
+    def finish(self, message=None, error=None):
+        self.busy = False
+        if error is not None:
+            self.show_progress(0, "")
+            messagebox.showerror("错误", str(error), parent=self)
+        elif message:
+            self.show_progress(100, message)
+            messagebox.showinfo("成功", message, parent=self)
+    
+    def export_hotkeys(self):
+        """导出快捷键（后台分批写出）"""
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=FILE_TYPES,
+            initialfile="hotkeys_backup.json"
+        )
+        if filepath:
+            with self.manager.search_index.lock:
+                entries = list(self.manager.hotkeys)
+            self.start(self.export_worker, filepath, entries)
+    
+    def export_worker(self, filepath, entries):
+        try:
+            transfer.write_entries(filepath, entries, self.progress_reporter(len(entries), "正在导出"))
+        except Exception as e:
+            self.post(self.finish, None, e)
+        else:
+            self.post(self.finish, f"已导出 {len(entries)} 个快捷键到 {filepath}")
+    
+    def import_hotkeys(self):
+        """导入快捷键（后台逐条解析，确认后合并或替换）"""
+        filepath = filedialog.askopenfilename(filetypes=FILE_TYPES)
+        if filepath:
+            self.start(self.import_worker, filepath)
+    
+    def import_worker(self, filepath):
+        try:
+            size = os.path.getsize(filepath)
+            result = transfer.read_entries(filepath, self.progress_reporter(size, "正在读取"))
+        except Exception as e:
+            self.post(self.finish, None, e)
+        else:
+            self.post(self.confirm_import, result)
+    
+    def confirm_import(self, result):
+        """解析完成，确认后在后台应用"""
+        merge = self.merge_var.get()
+        text = f"{'合并' if merge else '导入（替换现有列表）'} {len(result.entries)} 个快捷键？"
+        if result.skipped:
+            text += f"\n\n跳过 {result.skipped} 条无效记录：\n" + "\n".join(result.errors)
+        if not messagebox.askyesno("确认", text, parent=self):
+            self.finish()
+            self.show_progress(0, "已取消")
+            return
+        self.show_progress(100, "正在应用...")
+        threading.Thread(target=self.apply_worker, args=(result.entries, merge), daemon=True).start()
+    
+    def apply_worker(self, entries, merge):
+        try:
+            added, updated = self.manager.replace_hotkeys(entries, merge)
+        except Exception as e:
+            self.post(self.finish, None, e)
+        else:
+            if merge:
+                self.post(self.finish, f"已合并：新增 {added} 个，更新 {updated} 个")
+            else:
+                self.post(self.finish, f"已导入 {added} 个快捷键")
+
+
+class ConflictDialog(tk.Toplevel):
+    """冲突列表（虚拟化，冲突再多也只物化可见行）"""
+    
+    def __init__(self, parent, conflicts):
+        super().__init__(parent)
+        self.title(f"快捷键冲突（{len(conflicts)}）")
+        self.geometry("760x420")
+        
+        if not conflicts:
+            ttk.Label(self, text="✅ 没有发现冲突").pack(pady=40)
+            return
+        
+        columns = ("kind", "chord", "window", "description", "detail")
+        tree = ttk.Treeview(self, columns=columns, show="headings")
+        for column, text, width in (("kind", "类型", 60), ("chord", "组合键", 120),
+                                    ("window", "窗口", 120), ("description", "说明", 180),
+                                    ("detail", "冲突", 260)):
+            tree.heading(column, text=text)
+            tree.column(column, width=width)
+        scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL)
+        self.view = VirtualTreeview(tree, scrollbar, render=self.row)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(10, 0), pady=10)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y, pady=10)
+        self.view.set_items(conflicts)
+    
+    def row(self, conflict):
+        kind, chord, outer, inner = conflict
+        return (KIND_LABELS[kind], chord, inner.window.strip() or "全局", inner.description,
+                describe(kind, outer, inner))
@@ -0,0 +1,210 @@
+"""
+紧凑二进制快照
+字符串表（去重）+ 定长记录数组，文件用 mmap 打开，条目在首次访问时才解码。
+打开十万级的大目录只校验头部、偏移表和记录表（不解码字符串），首屏不必等全部条目解码；导入导出仍然使用 JSON。
+主程序随后在后台建立搜索索引、冲突索引和全局注册，这些都以 HotkeyEntry 为单位，
+会解码全部条目，之后的常驻内存与 JSON 快照大致相当（见 benchmarks/bench_snapshot.py 的 touch 一行），
+省下的是启动延迟而不是内存。
+
+文件布局（小端）：
+    头部     magic, 版本, 条目数, 字符串数
+    偏移表   (字符串数 + 1) 个 u32，第 i 个字符串为 data[off[i]:off[i+1] - 1]
+    记录     条目数 × len(RECORD_FIELDS) 个 u32 字符串编号
+    data     UTF-8 字符串数据，每个字符串后跟一个 \0，顺序遍历时可一次解码整张表
+"""
+
+import json
+import mmap
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import MutableSequence
+
+from entry import FIELDS, HotkeyEntry
+
+MAGIC = b'HKS1'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIII')
+# 每条记录的字段，extra 保存其余键的 JSON（没有则为空串）
+RECORD_FIELDS = FIELDS + ('extra',)
+# 顺序遍历时每次解码的条目数
+_CHUNK = 1024
+
+
+def _u32_view(buf, offset, count):
+    """buf[offset:] 开始的 count 个小端 u32"""
+    view = memoryview(buf)[offset:offset + count * 4]
+    if sys.byteorder == 'little':
+        return view.cast('I')
+    values = array('I', view)
+    values.byteswap()
+    return values
+
+
+def dump(hotkeys, f):
+    """把 HotkeyEntry 列表写成二进制快照（f 以二进制模式打开）"""
+    strings = {'': 0}
+    records = array('I')
+    for hk in hotkeys:
+        values = [hk.window, hk.hotkey, hk.description, hk.action, hk.created,
+                  json.dumps(hk.extra, ensure_ascii=False) if hk.extra else '']
+        for value in values:
+            sid = strings.get(value)
+            if sid is None:
+                sid = strings[value] = len(strings)
+            records.append(sid)
+
+    if any('\0' in s for s in strings):
+        raise ValueError("快捷键字段不能包含 \\0")
+    encoded = [s.encode('utf-8') + b'\0' for s in strings]   # dict 保持插入顺序，即编号顺序
+    offsets = array('I', [0])
+    total = 0
+    for data in encoded:
+        total += len(data)
+        offsets.append(total)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+        records.byteswap()
+
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(records) // len(RECORD_FIELDS), len(encoded)))
+    f.write(offsets.tobytes())
+    f.write(records.tobytes())
+    for data in encoded:
+        f.write(data)
+
+
+class CompactCatalog(MutableSequence):
+    """mmap 打开的快照，行为与快捷键列表一致
+
+    条目首次访问时才解码成 HotkeyEntry 并缓存，之后同一位置总是返回同一个对象
+    （列表控件和索引都按对象身份识别条目）。
+    增删改只改内存中的位置表，持久化仍由日志和压缩负责。
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mm)
+        if size < HEADER.size:
+            raise ValueError(f"快照文件不完整: {path}")
+        magic, version, count, nstrings = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"不支持的快照格式: {path}")
+        offset = HEADER.size
+        if size < offset + (nstrings + 1 + count * len(RECORD_FIELDS)) * 4:
+            raise ValueError(f"快照文件不完整: {path}")
+        self._offsets = _u32_view(self._mm, offset, nstrings + 1)
+        offset += (nstrings + 1) * 4
+        self._records = _u32_view(self._mm, offset, count * len(RECORD_FIELDS))
+        offset += count * len(RECORD_FIELDS) * 4
+        self._data = offset
+        self._check(path, size - offset, nstrings)
+        self._strings = {}                    # 字符串编号 -> str，重复的窗口名等只解码一次
+        self._table = None                    # 整张字符串表，大范围遍历时一次解码
+        self._rows = array('I', range(count))  # 位置 -> 记录号
+        self._items = [None] * count          # 位置 -> 已解码的条目
+        self._lock = threading.Lock()         # 索引在后台线程遍历，解码需要互斥
+
+    def _check(self, path, data_size, nstrings):
+        """偏移表从 0 开始、单调不减且不超出 data，记录里的字符串编号都存在
+
+        打开时不解码任何字符串；十万条约 30 ms（已排序的列表 sorted 是线性的）。
+        """
+        offsets = self._offsets.tolist()
+        if (offsets[0] != 0 or offsets[-1] > data_size or offsets != sorted(offsets)
+                or max(self._records, default=0) >= nstrings):
+            raise ValueError(f"快照文件已损坏: {path}")
+
+    def _string(self, sid):
+        if self._table is not None:
+            return self._table[sid]
+        s = self._strings.get(sid)
+        if s is None:
+            start = self._data + self._offsets[sid]
+            end = self._data + self._offsets[sid + 1] - 1
+            s = self._strings[sid] = self._mm[start:end].decode('utf-8', 'replace')
+        return s
+
+    def _load_table(self):
+        """解码整张字符串表（一次 C 层面的 decode + split）
+
+        data 里的 \0 比字符串数少（文件损坏）时不用整表，继续按偏移逐个解码。
+        """
+        table = self._mm[self._data:].decode('utf-8', 'replace').split('\0')
+        if len(table) >= len(self._offsets) - 1:
+            self._table = table
+            self._strings = None
+
+    def _decode(self, row):
+        width = len(RECORD_FIELDS)
+        lookup = self._table.__getitem__ if self._table is not None else self._string
+        values = list(map(lookup, self._records[row * width:(row + 1) * width]))
+        extra = values.pop()
+        try:
+            extra = json.loads(extra) if extra else None
+        except ValueError:
+            # 损坏的 extra 只丢掉这一项，不影响后台遍历
+            extra = None
+        return HotkeyEntry(*values, extra=extra)
+
+    def _get(self, index):
+        item = self._items[index]
+        if item is None:
+            with self._lock:
+                item = self._items[index]
+                if item is None:
+                    item = self._items[index] = self._decode(self._rows[index])
+        return item
+
+    def _fill(self, start, end):
+        """一次解码 [start, end) 中尚未解码的条目"""
+        items = self._items
+        rows = self._rows
+        with self._lock:
+            if self._table is None and end - start >= _CHUNK:
+                self._load_table()
+            for i in range(start, min(end, len(items))):
+                if items[i] is None:
+                    items[i] = self._decode(rows[i])
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        i = 0
+        while i < len(self._items):
+            if self._items[i] is None:
+                self._fill(i, i + _CHUNK)
+            yield self._items[i]
+            i += 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._items))
+            if step == 1:
+                self._fill(start, stop)
+                return self._items[start:stop]
+            return [self._get(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self._items)
+        if not 0 <= index < len(self._items):
+            raise IndexError(index)
+        return self._get(index)
+
+    def __setitem__(self, index, hk):
+        self._items[index] = hk
+
+    def __delitem__(self, index):
+        del self._items[index]
+        del self._rows[index]
+
+    def insert(self, index, hk):
+        # 新条目已经是对象，记录号不会再被读取
+        self._items.insert(index, hk)
+        self._rows.insert(index, 0)
+
+
+def load(path):
+    """打开二进制快照"""
+    return CompactCatalog(path)
@@ -6,29 +6,16 @@ set -e
 
 echo "🔥 启动 Hotkey Manager..."
 
-# 方法1：检查本地 X11 socket
-if [ -z "$DISPLAY" ]; then
-    X11_SOCKETS=$(ls -1 /tmp/.X11-unix/X* 2>/dev/null | head -1)
-    if [ -n "$X11_SOCKETS" ]; then
-        DISPLAY_NUM=$(basename "$X11_SOCKETS" | sed 's/X//')
-        export DISPLAY=":$DISPLAY_NUM"
-        echo "🔧 检测到 X11 socket，使用 Display: $DISPLAY"
-    fi
-fi
-
-# 方法2：检查 WAYLAND
-if [ -z "$DISPLAY" ] && [ -n "$WAYLAND_DISPLAY" ]; then
-    export DISPLAY="$WAYLAND_DISPLAY"
-    echo "🔧 检测到 Wayland，使用 Display: $DISPLAY"
-fi
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
-# 方法3：尝试使用 xdpyinfo 探测
-if [ -z "$DISPLAY" ] && command -v xdpyinfo &> /dev/null; then
-    DETECTED_DISPLAY=$(xdpyinfo 2>/dev/null | grep "display name" | head -1 | awk '{print $NF}')
-    if [ -n "$DETECTED_DISPLAY" ]; then
-        export DISPLAY="$DETECTED_DISPLAY"
-        echo "🔧 通过 xdpyinfo 检测到 Display: $DISPLAY"
+# 由 display.py 统一探测：直接连接 X11 socket，候选并行探测，结果缓存在 ~/.cache/hotkey_manager/display
+if DETECTED_DISPLAY=$(python3 "$SCRIPT_DIR/display.py"); then
+    if [ "$DETECTED_DISPLAY" != "$DISPLAY" ]; then
+        echo "🔧 检测到 Display: $DETECTED_DISPLAY"
     fi
+    export DISPLAY="$DETECTED_DISPLAY"
+elif [ -z "$WAYLAND_DISPLAY" ]; then
+    unset DISPLAY
 fi
 
 # 最终检查
@@ -39,4 +26,4 @@ else
 fi
 
 # 启动应用
-exec python3 main.py "$@"
+exec python3 "$SCRIPT_DIR/main.py" "$@"
@@ -0,0 +1,290 @@
+"""
+快捷键持久化
+快照 + 追加写日志：单次增删改只向日志追加一行，定期把当前列表压缩成新快照。
+快照先写临时文件再 rename 替换，任何时刻崩溃都不会留下截断的快捷键文件。
+"""
+
+import json
+import os
+import struct
+import threading
+
+import snapshot
+from entry import HotkeyEntry
+from transfer import check_fields, write_json
+
+# 日志累计到这么多条时压缩成快照
+COMPACT_EVERY = 200
+
+
+def _snapshot_id(path):
+    """快照文件的身份（inode、大小、修改时间），替换快照后必然变化"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def write_atomic(path, write, binary=False):
+    """write(f) 写入临时文件，fsync 后原子替换 path"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f'{path}.tmp'
+    with (open(tmp, 'wb') if binary else open(tmp, 'w', encoding='utf-8')) as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    # rename 本身也要落盘
+    dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _entry(data):
+    """日志或快照里的一条 dict -> HotkeyEntry，结构不对时抛出 ValueError"""
+    reason = check_fields(data)
+    if reason:
+        raise ValueError(reason)
+    return HotkeyEntry.from_dict(data)
+
+
+def _apply(hotkeys, record):
+    """应用一条日志记录，记录无效时抛出异常"""
+    op = record.get('op')
+    if op == 'append':
+        hotkeys.append(_entry(record['hk']))
+        return
+    idx = record.get('idx')
+    if type(idx) is not int or not 0 <= idx < len(hotkeys):
+        raise IndexError(f"下标 {idx!r} 超出范围（共 {len(hotkeys)} 条）")
+    if op == 'update':
+        hotkeys[idx] = _entry(record['hk'])
+    elif op == 'remove':
+        hotkeys.pop(idx)
+    else:
+        raise ValueError(f"未知操作 {op!r}")
+
+
+class HotkeyStore:
+    """快捷键文件的读写，内存中是 HotkeyEntry 列表，文件里是 dict
+
+    path 是快照：.bin 结尾时为二进制快照（见 snapshot.py），否则为 JSON
+    （格式与原来的 hotkeys.json 相同）；旁边的 .journal 是变更日志。
+    日志首行记录它所基于的快照身份，快照被替换后旧日志自动作废，
+    因此"写完快照、清空日志"之间崩溃也不会重复回放。
+    快照不存在时从 legacy_path（JSON）读取，下次压缩即完成迁移。
+
+    日志追加和压缩在同一把锁内排序；导入等整体替换用 begin_compact()/finish_compact()
+    在后台写快照，期间的变更先缓存，快照写完后再写入新日志。
+    """
+
+    def __init__(self, path, legacy_path=None, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.binary = path.endswith('.bin')
+        self.journal_path = path + '.journal'
+        self.compact_every = compact_every
+        self.pending = 0          # 日志里尚未压缩的变更数
+        self.migrated = 0         # 加载时改写为规范组合键写法的条目数，非 0 时应压缩一次写回
+        self._journal = None
+        self._lock = threading.RLock()
+        self._deferred = None     # 后台压缩期间的日志记录（基于正在写出的列表）
+
+    def load(self):
+        """读取快照并回放日志"""
+        hotkeys = None
+        if os.path.exists(self.path):
+            hotkeys = self._read_snapshot(self.path, self.binary)
+            if hotkeys is None and self.binary:
+                return self._recover()
+        elif self.legacy_path and os.path.exists(self.legacy_path):
+            hotkeys = self._read_snapshot(self.legacy_path, False)
+        if hotkeys is None:
+            hotkeys = []
+        self.pending, invalid = self._replay(hotkeys)
+        if invalid:
+            # 无效记录不能留在日志里（后续追加的下标会与它错开），压缩成新快照
+            print(f"变更日志中有 {invalid} 条无效记录，已跳过并重写快照")
+            self.compact(hotkeys)
+        return hotkeys
+
+    def _recover(self):
+        """二进制快照损坏（如写到一半的文件）：快照和日志改名保留，从 JSON 重新建立快照
+
+        日志基于损坏的快照，不能回放到别的列表上，只一起保留。
+        """
+        bad = self.path + '.bad'
+        os.replace(self.path, bad)
+        if os.path.exists(self.journal_path):
+            os.replace(self.journal_path, bad + '.journal')
+        hotkeys = None
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            hotkeys = self._read_snapshot(self.legacy_path, False)
+            print(f"{self.path} 已损坏，已改名为 {bad}，改从 {self.legacy_path} 读取")
+        else:
+            print(f"{self.path} 已损坏，已改名为 {bad}")
+        if hotkeys is None:
+            hotkeys = []
+        self.compact(hotkeys)
+        return hotkeys
+
+    def _read_snapshot(self, path, binary):
+        try:
+            if binary:
+                # 二进制快照按需解码，不在启动时逐条检查，旧写法在下次压缩时改写
+                return snapshot.load(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError, struct.error):
+            return None
+        if not isinstance(data, list):
+            print(f"{path} 不是快捷键列表，已忽略")
+            return None
+        # 手工编辑过的文件可能有结构不对的条目，逐条跳过，不影响启动。
+        # 有效的日志只会基于本程序写出的快照，跳过条目不会让日志下标错位
+        hotkeys = []
+        migrated = 0
+        for pos, item in enumerate(data):
+            try:
+                hk = _entry(item)
+            except ValueError as e:
+                print(f"{path} 第 {pos + 1} 个条目无效，已跳过: {e}")
+                continue
+            hotkeys.append(hk)
+            if hk.chord is not None and hk.hotkey != item.get('hotkey'):
+                migrated += 1
+        self.migrated = migrated
+        return hotkeys
+
+    def _replay(self, hotkeys):
+        """把日志应用到 hotkeys 上，返回 (应用的条数, 跳过的无效记录数)
+
+        下标越界、字段缺失等无效记录（例如压缩中途被截断后残留的日志）逐条跳过，不影响启动。
+        """
+        try:
+            f = open(self.journal_path, 'r', encoding='utf-8')
+        except OSError:
+            return 0, 0
+        count = invalid = 0
+        with f:
+            header = f.readline()
+            try:
+                if json.loads(header).get('snapshot') != _snapshot_id(self.path):
+                    return 0, 0
+            except (ValueError, AttributeError):
+                return 0, 0
+            for lineno, line in enumerate(f, 2):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 最后一行可能只写了一半
+                    break
+                try:
+                    _apply(hotkeys, record)
+                except (LookupError, TypeError, AttributeError, ValueError) as e:
+                    print(f"变更日志第 {lineno} 行无效，已跳过: {e}")
+                    invalid += 1
+                    continue
+                count += 1
+        return count, invalid
+
+    def _write(self, record):
+        """向日志追加一条并落盘；后台压缩期间先缓存"""
+        with self._lock:
+            if self._deferred is not None:
+                self._deferred.append(record)
+                return
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self.pending += 1
+
+    def _open_journal(self):
+        header = {'snapshot': _snapshot_id(self.path)}
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                valid = json.loads(f.readline()).get('snapshot') == header['snapshot']
+        except (OSError, ValueError, AttributeError):
+            valid = False
+        if not valid:
+            write_atomic(self.journal_path,
+                         lambda f: f.write(json.dumps(header) + '\n'))
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+    def append(self, hk, hotkeys):
+        self._write({'op': 'append', 'hk': hk.to_dict()})
+        self._maybe_compact(hotkeys)
+
+    def update(self, idx, hk, hotkeys):
+        self._write({'op': 'update', 'idx': idx, 'hk': hk.to_dict()})
+        self._maybe_compact(hotkeys)
+
+    def remove(self, idx, hotkeys):
+        self._write({'op': 'remove', 'idx': idx})
+        self._maybe_compact(hotkeys)
+
+    def _maybe_compact(self, hotkeys):
+        with self._lock:
+            if self._deferred is None and self.pending >= self.compact_every:
+                self.compact(hotkeys)
+
+    def compact(self, hotkeys):
+        """把完整列表写成新快照，旧日志随之作废
+
+        后台压缩进行中时什么也不做：它写出的快照加上缓存的变更就是当前列表。
+        """
+        with self._lock:
+            if self._deferred is not None:
+                return
+            self._write_snapshot(hotkeys)
+            self._reset_journal()
+
+    def begin_compact(self):
+        """开始后台压缩（调用方在修改列表用的锁内调用，此刻的列表就是要写出的快照）
+
+        之后的变更先缓存在内存里，finish_compact() 写完快照后再落盘。
+        """
+        with self._lock:
+            self._deferred = []
+
+    def finish_compact(self, hotkeys):
+        """不持有锁地把 begin_compact() 时的列表 hotkeys（副本）写成快照，再写入期间缓存的变更"""
+        try:
+            self._write_snapshot(hotkeys)
+        except BaseException:
+            with self._lock:
+                # 缓存的变更基于新列表，不能接在旧日志后面；下一次变更时整体压缩当前列表
+                self._deferred = None
+                self.pending = self.compact_every
+            raise
+        with self._lock:
+            deferred, self._deferred = self._deferred, None
+            self._reset_journal()
+            for record in deferred:
+                self._write(record)
+
+    def _write_snapshot(self, hotkeys):
+        if self.binary:
+            write_atomic(self.path, lambda f: snapshot.dump(hotkeys, f), binary=True)
+        else:
+            # 分批写出，不把整个列表先转成 dict
+            write_atomic(self.path, lambda f: write_json(hotkeys, f))
+
+    def _reset_journal(self):
+        """快照已替换，旧日志作废"""
+        self.close()
+        try:
+            os.remove(self.journal_path)
+        except OSError:
+            pass
+        self.pending = 0
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
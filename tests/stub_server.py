@@ -0,0 +1,76 @@
+"""
+测试用的本地 HTTP 服务器，代替 GitHub API
+
+handle(request) 返回 (状态码, 响应体) 或 (状态码, 响应体, 响应头)，响应体为 dict/list 时按 JSON 发送；
+收到的请求按顺序记录在 requests 里。
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class Request:
+    __slots__ = ('method', 'path', 'query', 'headers', 'body')
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+    def __repr__(self):
+        return f"Request({self.method} {self.path})"
+
+
+class StubServer:
+    """在后台线程运行的服务器，用作 with 语句时自动启动和关闭"""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                request = Request(self.command, url.path, parse_qs(url.query),
+                                  dict(self.headers), self.rfile.read(length))
+                stub.requests.append(request)
+                status, body, *rest = stub.handle(request)
+                headers = rest[0] if rest else {}
+                data = b'' if body is None else json.dumps(body).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+
+    def calls(self, method, path=None):
+        return [r for r in self.requests if r.method == method and (path is None or r.path == path)]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
@@ -0,0 +1,261 @@
+"""
+目录同步：本地 HTTP 服务器模拟 GitHub 的 Git Data API 和 contents API
+
+    python3 -m pytest tests/test_catalog_sync.py
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catalog_sync import CatalogSync, SyncConflict, blob_sha, dumps  # noqa: E402
+from github_client import GitHubClient  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+from transfer import parse_entries  # noqa: E402
+
+PREFIX = '/repos/me/hotkeys'
+# 等待同步线程的上限（秒）
+TIMEOUT = 5.0
+
+
+def _sha(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+class FakeRepo:
+    """内存里的单分支仓库，只有顶层文件"""
+
+    def __init__(self):
+        self.blobs = {}
+        self.trees = {}       # sha -> {文件名: blob sha}
+        self.commits = {}     # sha -> (tree sha, 父提交)
+        self.head = self.commit({}, None)
+        self.before_patch = None  # PATCH 分支前调用一次，模拟别处同时推送
+
+    def tree(self, files):
+        sha = _sha('tree', sorted(files.items()))
+        self.trees[sha] = dict(files)
+        return sha
+
+    def commit(self, files, parent):
+        tree = self.tree(files)
+        sha = _sha('commit', tree, parent, len(self.commits))
+        self.commits[sha] = (tree, parent)
+        return sha
+
+    def files(self):
+        return self.trees[self.commits[self.head][0]]
+
+    def write(self, name, text):
+        """别处推送了一次修改"""
+        data = text.encode('utf-8')
+        files = dict(self.files())
+        files[name] = blob_sha(data)
+        self.blobs[files[name]] = data
+        self.head = self.commit(files, self.head)
+
+    def read(self, name):
+        return self.blobs[self.files()[name]].decode('utf-8')
+
+    def handle(self, request):
+        path = request.path[len(PREFIX):]
+        etag = request.headers.get('If-None-Match')
+        if request.method == 'GET' and path == '/git/ref/heads/main':
+            tag = f'"{self.head}"'
+            if etag == tag:
+                return 304, None
+            return 200, {'object': {'sha': self.head}}, {'ETag': tag}
+        if request.method == 'GET' and path.startswith('/git/commits/'):
+            return 200, {'tree': {'sha': self.commits[path.rsplit('/', 1)[1]][0]}}
+        if request.method == 'GET' and path.startswith('/git/trees/'):
+            files = self.trees[path.rsplit('/', 1)[1]]
+            return 200, {'tree': [{'path': name, 'type': 'blob', 'sha': sha}
+                                  for name, sha in files.items()]}
+        if request.method == 'POST' and path == '/git/trees':
+            body = request.json()
+            files = dict(self.trees[body['base_tree']])
+            for item in body['tree']:
+                data = item['content'].encode('utf-8')
+                files[item['path']] = blob_sha(data)
+                self.blobs[files[item['path']]] = data
+            return 201, {'sha': self.tree(files)}
+        if request.method == 'POST' and path == '/git/commits':
+            body = request.json()
+            sha = _sha('commit', body['tree'], body['parents'][0], len(self.commits))
+            self.commits[sha] = (body['tree'], body['parents'][0])
+            return 201, {'sha': sha}
+        if request.method == 'PATCH' and path == '/git/refs/heads/main':
+            if self.before_patch:
+                hook, self.before_patch = self.before_patch, None
+                hook()
+            sha = request.json()['sha']
+            if self.commits[sha][1] != self.head:
+                return 422, {'message': 'Update is not a fast forward'}
+            self.head = sha
+            return 200, {'object': {'sha': sha}}
+        if request.method == 'GET' and path == '/contents/hotkeys.json':
+            sha = self.files().get('hotkeys.json')
+            if sha is None:
+                return 404, {'message': 'Not Found'}
+            tag = f'"{sha}"'
+            if etag == tag:
+                return 304, None
+            return 200, {'sha': sha, 'content': base64.b64encode(self.blobs[sha]).decode()}, {'ETag': tag}
+        return 404, {'message': 'Not Found'}
+
+
+def entries(*names):
+    return [{'window': '', 'hotkey': f'ctrl+{name}', 'description': name, 'action': '', 'created': ''}
+            for name in names]
+
+
+class CatalogSyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = FakeRepo()
+        self.server = StubServer(self.repo.handle).__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        self.client = GitHubClient('token', self.server.url)
+        self.addCleanup(self.client.close)
+        self.current = entries('a')
+        self.reports = []
+        self.reported = threading.Event()
+        self.synced = []
+
+    def make_sync(self, **kwargs):
+        sync = CatalogSync(self.client, 'me/hotkeys', lambda: list(self.current), self.report,
+                           on_synced=self.synced.append, **kwargs)
+        self.addCleanup(sync.close)
+        return sync
+
+    def report(self, message):
+        self.reports.append(message)
+        self.reported.set()
+
+    def patches(self):
+        return self.server.calls('PATCH')
+
+    def test_edits_coalesce_into_one_commit(self):
+        sync = self.make_sync(delay=0.2, max_delay=TIMEOUT)
+        for name in 'bcdef':
+            self.current = self.current + entries(name)
+            sync.changed()
+        self.assertTrue(self.reported.wait(TIMEOUT))
+        self.assertEqual(self.reports, ["已同步到 me/hotkeys"])
+        self.assertEqual(len(self.patches()), 1)
+        self.assertEqual(json.loads(self.repo.read('hotkeys.json')), entries('a', 'b', 'c', 'd', 'e', 'f'))
+        self.assertEqual(self.synced, [blob_sha(dumps(self.current).encode('utf-8'))])
+
+    def test_unchanged_branch_uses_304(self):
+        # 远端已经是同样的内容：不提交，记下分支头的 ETag
+        self.repo.write('hotkeys.json', dumps(self.current))
+        sync = self.make_sync()
+        self.assertIsNone(sync.push(self.current))
+        self.assertEqual(self.synced, [self.repo.files()['hotkeys.json']])
+        self.current = entries('a', 'b')
+        self.assertIsNotNone(sync.push(self.current))
+        ref_calls = self.server.calls('GET', f'{PREFIX}/git/ref/heads/main')
+        self.assertEqual(len(ref_calls), 2)
+        self.assertIn('If-None-Match', ref_calls[1].headers)
+        # 304：分支头、tree 和远端文件 sha 都来自缓存，只在第一次读取
+        gets = [r.path.split('/')[5] for r in self.server.calls('GET')]
+        self.assertEqual(gets.count('commits'), 1)
+        self.assertEqual(gets.count('trees'), 1)
+        self.assertEqual(len(self.patches()), 1)
+        # 内容没有变化时不发请求
+        count = len(self.server.requests)
+        self.assertIsNone(sync.push(self.current))
+        self.assertEqual(len(self.server.requests), count)
+
+    def test_pull_not_modified(self):
+        sync = self.make_sync()
+        sync.push(self.current)
+        self.assertIsNone(sync.pull())
+        self.assertIsNone(sync.pull())
+        contents = self.server.calls('GET', f'{PREFIX}/contents/hotkeys.json')
+        self.assertEqual(len(contents), 2)
+        self.assertIn('If-None-Match', contents[1].headers)
+
+    def test_retry_when_branch_moves(self):
+        sync = self.make_sync()
+        sync.push(self.current)
+        # 别处在提交和移动分支之间推送了另一个文件
+        self.repo.before_patch = lambda: self.repo.write('README.md', 'hello')
+        self.current = entries('a', 'b')
+        self.assertIsNotNone(sync.push(self.current))
+        self.assertEqual(len(self.patches()), 3)
+        self.assertEqual(json.loads(self.repo.read('hotkeys.json')), entries('a', 'b'))
+        self.assertEqual(self.repo.read('README.md'), 'hello')
+
+    def test_conflict_when_branch_moves_with_catalog_change(self):
+        sync = self.make_sync()
+        sync.push(self.current)
+        self.repo.before_patch = lambda: self.repo.write('hotkeys.json', dumps(entries('x')))
+        with self.assertRaises(SyncConflict):
+            sync.push(entries('a', 'b'))
+        self.assertEqual(json.loads(self.repo.read('hotkeys.json')), entries('x'))
+
+    def test_conflict_when_remote_changed(self):
+        sync = self.make_sync()
+        sync.push(self.current)
+        self.repo.write('hotkeys.json', dumps(entries('x')))
+        with self.assertRaises(SyncConflict):
+            sync.push(entries('a', 'b'))
+        self.assertEqual(len(self.patches()), 1)
+
+        # 拉取并采用远端内容后可以继续推送
+        sha, pulled = sync.pull()
+        self.assertEqual(pulled, entries('x'))
+        sync.accept(sha)
+        self.assertIsNotNone(sync.push(entries('x', 'y')))
+        self.assertEqual(json.loads(self.repo.read('hotkeys.json')), entries('x', 'y'))
+
+    def test_declined_pull_keeps_conflict(self):
+        sync = self.make_sync()
+        sync.push(self.current)
+        self.repo.write('hotkeys.json', dumps(entries('x')))
+        self.assertIsNotNone(sync.pull())
+        # 没有调用 accept：再次拉取仍然返回远端内容，推送仍然冲突
+        self.assertIsNotNone(sync.pull())
+        with self.assertRaises(SyncConflict):
+            sync.push(entries('a', 'b'))
+
+    def test_pulled_records_are_checked(self):
+        sync = self.make_sync()
+        sync.push(self.current)
+        remote = entries('x') + [{'hotkey': 1}, 'text', {'description': 'no hotkey'}] + entries('x')
+        self.repo.write('hotkeys.json', json.dumps(remote))
+        sha, pulled = sync.pull()
+        result = parse_entries(pulled)
+        # 无效记录跳过并说明位置，重复条目原样保留
+        self.assertEqual([hk.description for hk in result.entries], ['x', 'x'])
+        self.assertEqual(result.skipped, 3)
+        self.assertEqual(result.errors, ["第 2 条: hotkey 不是字符串", "第 3 条: 不是对象", "第 4 条: 缺少 hotkey"])
+        with self.assertRaises(ValueError):
+            parse_entries({'hotkey': 'ctrl+x'})
+
+    def test_first_sync_does_not_overwrite_existing_file(self):
+        self.repo.write('hotkeys.json', dumps(entries('x')))
+        with self.assertRaises(SyncConflict):
+            self.make_sync().push(self.current)
+        # 重启后用保存的 sha 继续
+        self.assertIsNotNone(self.make_sync(remote_sha=self.repo.files()['hotkeys.json']).push(self.current))
+
+    def test_conflict_is_reported(self):
+        self.repo.write('hotkeys.json', dumps(entries('x')))
+        sync = self.make_sync(delay=0.01)
+        sync.changed()
+        self.assertTrue(self.reported.wait(TIMEOUT))
+        self.assertTrue(self.reports[0].startswith("同步暂停"))
+        self.assertEqual(json.loads(self.repo.read('hotkeys.json')), entries('x'))
+
+
+if __name__ == '__main__':
+    unittest.main()
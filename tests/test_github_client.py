@@ -0,0 +1,146 @@
+"""
+GitHub 客户端：本地 HTTP 服务器模拟 API，git init --bare 的目录充当远端仓库
+
+    python3 -m pytest tests/test_github_client.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import github_client  # noqa: E402
+from github_client import GitHubClient, GitHubError, commit_all, create_and_push, run_git  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+def git(*args, cwd):
+    return run_git(list(args), cwd=cwd).stdout.strip()
+
+
+def init_repo(path):
+    """带提交身份的空工作目录"""
+    git('init', '-q', cwd=path)
+    git('config', 'user.name', 'Test', cwd=path)
+    git('config', 'user.email', 'test@example.com', cwd=path)
+    git('config', 'commit.gpgsign', 'false', cwd=path)
+
+
+class RetryTest(unittest.TestCase):
+
+    def setUp(self):
+        # 退避时间缩短到毫秒级
+        patcher = mock.patch.object(github_client, 'BACKOFF', 0.001)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_retries_on_503(self):
+        def handle(request):
+            if len(server.requests) < 3:
+                return 503, {'message': 'unavailable'}
+            return 200, {'login': 'me'}
+
+        with StubServer(handle) as server:
+            client = GitHubClient('token', server.url)
+            self.assertEqual(client.user(), {'login': 'me'})
+            client.close()
+        self.assertEqual(len(server.calls('GET', '/user')), 3)
+        self.assertEqual(server.requests[0].headers['Authorization'], 'token token')
+
+    def test_get_gives_up_after_retries(self):
+        with StubServer(lambda request: (503, {'message': 'unavailable'})) as server:
+            client = GitHubClient('token', server.url, retries=2)
+            with self.assertRaises(GitHubError) as caught:
+                client.user()
+            client.close()
+        self.assertEqual(caught.exception.status, 503)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_post_is_sent_once(self):
+        with StubServer(lambda request: (503, {'message': 'unavailable'})) as server:
+            client = GitHubClient('token', server.url)
+            with self.assertRaises(GitHubError) as caught:
+                client.create_repo('demo')
+            client.close()
+        self.assertEqual(caught.exception.status, 503)
+        self.assertEqual(len(server.calls('POST', '/user/repos')), 1)
+        self.assertEqual(server.requests[0].json(), {'name': 'demo', 'auto_init': True})
+
+
+class GitTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.work = os.path.join(tmp.name, 'work')
+        self.remote = os.path.join(tmp.name, 'remote.git')
+        os.mkdir(self.work)
+        init_repo(self.work)
+        git('init', '-q', '--bare', self.remote, cwd=tmp.name)
+
+    def write(self, name, text):
+        with open(os.path.join(self.work, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_commit_all_without_changes(self):
+        self.write('a.txt', 'a')
+        self.assertTrue(commit_all('first', cwd=self.work))
+        self.assertFalse(commit_all('again', cwd=self.work))
+        self.assertEqual(git('rev-list', '--count', 'HEAD', cwd=self.work), '1')
+
+    def test_commit_failure_is_raised(self):
+        hook = os.path.join(self.work, '.git', 'hooks', 'pre-commit')
+        with open(hook, 'w') as f:
+            f.write('#!/bin/sh\necho rejected by hook >&2\nexit 1\n')
+        os.chmod(hook, 0o755)
+        self.write('a.txt', 'a')
+        with self.assertRaisesRegex(RuntimeError, 'rejected by hook'):
+            commit_all('first', cwd=self.work)
+
+    def test_create_and_push(self):
+        def handle(request):
+            if request.method == 'GET' and request.path == '/user':
+                return 200, {'login': 'me'}
+            if request.method == 'POST' and request.path == '/user/repos':
+                return 201, {'html_url': 'https://example.com/me/demo', 'clone_url': self.remote}
+            return 404, {'message': 'Not Found'}
+
+        self.write('a.txt', 'a')
+        reports = []
+        with StubServer(handle) as server:
+            client = GitHubClient('token', server.url)
+            url = create_and_push(client, 'demo', self.work, reports.append)
+            client.close()
+        self.assertEqual(url, 'https://example.com/me/demo')
+        self.assertEqual(reports[-1], "正在推送...")
+        branch = git('rev-parse', '--abbrev-ref', 'HEAD', cwd=self.work)
+        self.assertEqual(git('rev-parse', branch, cwd=self.remote),
+                         git('rev-parse', 'HEAD', cwd=self.work))
+
+        # 没有新更改时再次发布：不新建提交，推送已有提交
+        with StubServer(handle) as server:
+            client = GitHubClient('token', server.url)
+            create_and_push(client, 'demo', self.work)
+            client.close()
+        self.assertEqual(git('rev-list', '--count', 'HEAD', cwd=self.work), '1')
+
+    def test_push_failure_is_raised(self):
+        def handle(request):
+            if request.path == '/user':
+                return 200, {'login': 'me'}
+            return 201, {'clone_url': os.path.join(self.work, 'missing.git')}
+
+        self.write('a.txt', 'a')
+        with StubServer(handle) as server:
+            client = GitHubClient('token', server.url)
+            with self.assertRaises(RuntimeError):
+                create_and_push(client, 'demo', self.work)
+            client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+快照 + 日志存储：后台压缩期间的变更、损坏的二进制快照
+
+    python3 -m pytest tests/test_storage.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from entry import HotkeyEntry  # noqa: E402
+from storage import HotkeyStore  # noqa: E402
+
+
+def make(*names):
+    return [HotkeyEntry('', f'ctrl+{name}', name) for name in names]
+
+
+def descriptions(hotkeys):
+    return [hk.description for hk in hotkeys]
+
+
+class BackgroundCompactTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def store(self, name='hotkeys.json'):
+        store = HotkeyStore(os.path.join(self.dir, name), legacy_path=os.path.join(self.dir, 'hotkeys.json'))
+        self.addCleanup(store.close)
+        return store
+
+    def edit_during_compact(self, store, hotkeys):
+        """整体替换后、快照写完前的增删改（与主程序一样先改列表再写存储）"""
+        hotkeys.append(make('d')[0])
+        store.append(hotkeys[-1], hotkeys)
+        hotkeys[0] = make('x')[0]
+        store.update(0, hotkeys[0], hotkeys)
+        hotkeys.pop(1)
+        store.remove(1, hotkeys)
+
+    def test_changes_during_compact_are_kept(self):
+        for name in ('hotkeys.json', 'hotkeys.bin'):
+            with self.subTest(name):
+                store = self.store(name)
+                store.compact(make('old'))
+                hotkeys = make('a', 'b', 'c')
+                store.begin_compact()
+                frozen = list(hotkeys)
+                self.edit_during_compact(store, hotkeys)
+                # 缓存期间不会触发普通压缩
+                store.compact(hotkeys)
+                store.finish_compact(frozen)
+                self.assertEqual(store.pending, 3)
+                self.assertEqual(descriptions(self.store(name).load()), ['x', 'c', 'd'])
+
+    def test_failed_compact_forces_full_compact(self):
+        store = self.store()
+        store.compact(make('old'))
+        hotkeys = make('a', 'b', 'c')
+        store.begin_compact()
+        frozen = list(hotkeys)
+        self.edit_during_compact(store, hotkeys)
+        with mock.patch.object(store, '_write_snapshot', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                store.finish_compact(frozen)
+        # 缓存的变更基于新列表，下一次变更时整体压缩
+        hotkeys.append(make('e')[0])
+        store.append(hotkeys[-1], hotkeys)
+        self.assertEqual(store.pending, 0)
+        self.assertEqual(descriptions(self.store().load()), ['x', 'c', 'd', 'e'])
+
+    def test_corrupt_binary_snapshot_falls_back_to_json(self):
+        legacy = self.store()
+        legacy.compact(make('a', 'b'))
+        path = os.path.join(self.dir, 'hotkeys.bin')
+        with open(path, 'wb') as f:
+            f.write(b'HKS1\x01\x00\x00\x00')
+        with open(path + '.journal', 'w') as f:
+            f.write('{}\n')
+        with mock.patch('builtins.print'):
+            hotkeys = self.store('hotkeys.bin').load()
+        self.assertEqual(descriptions(hotkeys), ['a', 'b'])
+        self.assertTrue(os.path.exists(path + '.bad'))
+        self.assertTrue(os.path.exists(path + '.bad.journal'))
+        self.assertEqual(descriptions(self.store('hotkeys.bin').load()), ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
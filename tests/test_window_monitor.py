@@ -0,0 +1,170 @@
+"""
+活动窗口监控：在本地 Xvfb 上建两个窗口，切换根窗口的 _NET_ACTIVE_WINDOW 并修改标题，检查回调
+
+    python3 -m pytest tests/test_window_monitor.py
+
+没有安装 Xvfb 或 python-xlib 时跳过。
+"""
+
+import os
+import queue
+import select
+import shutil
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from window_monitor import ActiveWindowMonitor  # noqa: E402
+
+# 等待一次回调的上限（秒）
+TIMEOUT = 5.0
+# 断言"没有回调"时等待的时间（秒）
+QUIET = 0.3
+
+
+def start_xvfb():
+    """启动 Xvfb，由它自己选空闲的显示号，返回 (进程, ':N')"""
+    r, w = os.pipe()
+    try:
+        server = subprocess.Popen(['Xvfb', '-displayfd', str(w), '-nolisten', 'tcp',
+                                   '-screen', '0', '640x480x24'],
+                                  pass_fds=(w,), stdout=subprocess.DEVNULL,
+                                  stderr=subprocess.DEVNULL)
+    finally:
+        os.close(w)
+    data = b''
+    with os.fdopen(r, 'rb', buffering=0) as f:
+        while not data.endswith(b'\n'):
+            readable, _, _ = select.select([f], [], [], TIMEOUT)
+            chunk = f.read(16) if readable else b''
+            if not chunk:
+                server.kill()
+                server.wait()
+                raise RuntimeError("Xvfb 启动失败")
+            data += chunk
+    return server, f":{data.decode().strip()}"
+
+
+class ActiveWindowMonitorTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        if shutil.which('Xvfb') is None:
+            raise unittest.SkipTest("需要 Xvfb")
+        try:
+            import Xlib.display  # noqa: F401
+        except ImportError:
+            raise unittest.SkipTest("需要 python-xlib")
+        cls.server, cls.display_name = start_xvfb()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+
+    def setUp(self):
+        from Xlib import display
+
+        self.d = display.Display(self.display_name)
+        self.screen = self.d.screen()
+        self.root = self.screen.root
+        self.net_active_window = self.d.intern_atom('_NET_ACTIVE_WINDOW')
+        self.net_wm_name = self.d.intern_atom('_NET_WM_NAME')
+        self.utf8_string = self.d.intern_atom('UTF8_STRING')
+        self.activate(None)
+        self.changes = queue.Queue()
+        self.monitor = ActiveWindowMonitor(self.changes.put, self.display_name)
+        self.thread = None
+
+    def tearDown(self):
+        if self.thread is not None:
+            self.monitor.stop()
+            self.thread.join(TIMEOUT)
+        self.d.close()
+
+    def start(self):
+        self.thread = self.monitor.start()
+
+    def make_window(self, title):
+        window = self.root.create_window(0, 0, 10, 10, 0, self.screen.root_depth)
+        self.set_title(window, title)
+        return window
+
+    def set_title(self, window, title):
+        window.change_property(self.net_wm_name, self.utf8_string, 8, title.encode('utf-8'))
+        self.d.flush()
+
+    def activate(self, window):
+        from Xlib import Xatom
+
+        self.root.change_property(self.net_active_window, Xatom.WINDOW, 32,
+                                  [window.id if window is not None else 0])
+        self.d.flush()
+
+    def next_change(self):
+        return self.changes.get(timeout=TIMEOUT)
+
+    def assertQuiet(self):
+        with self.assertRaises(queue.Empty):
+            self.changes.get(timeout=QUIET)
+
+    def test_follows_active_window(self):
+        editor = self.make_window("Code - main.py")
+        terminal = self.make_window("Terminal ~/work")
+        self.activate(editor)
+        self.start()
+        self.assertEqual(self.next_change(), "Code")
+
+        self.activate(terminal)
+        self.assertEqual(self.next_change(), "Terminal")
+        self.activate(editor)
+        self.assertEqual(self.next_change(), "Code")
+        self.assertEqual(self.monitor.current, "Code")
+
+    def test_title_change_of_active_window(self):
+        browser = self.make_window("Firefox - start page")
+        self.activate(browser)
+        self.start()
+        self.assertEqual(self.next_change(), "Firefox")
+
+        self.set_title(browser, "Slack | general")
+        self.assertEqual(self.next_change(), "Slack")
+
+    def test_inactive_window_title_is_ignored(self):
+        editor = self.make_window("Code - main.py")
+        other = self.make_window("Terminal ~")
+        self.activate(editor)
+        self.start()
+        self.assertEqual(self.next_change(), "Code")
+
+        # 只订阅活动窗口的标题变化
+        self.set_title(other, "Firefox - docs")
+        self.assertQuiet()
+
+    def test_same_name_does_not_repeat(self):
+        first = self.make_window("Terminal ~/a")
+        second = self.make_window("Terminal ~/b")
+        self.activate(first)
+        self.start()
+        self.assertEqual(self.next_change(), "Terminal")
+
+        self.activate(second)
+        self.assertQuiet()
+
+    def test_falls_back_to_wm_name(self):
+        legacy = self.root.create_window(0, 0, 10, 10, 0, self.screen.root_depth)
+        legacy.set_wm_name("xterm - legacy")
+        self.activate(legacy)
+        self.start()
+        self.assertEqual(self.next_change(), "xterm")
+
+    def test_no_active_window(self):
+        self.start()
+        self.assertQuiet()
+        self.assertIsNone(self.monitor.current)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+延迟追踪
+按阶段把耗时记录到环形缓冲，统计 p50/p95/p99，用于发现 Alt+R 弹出和搜索刷新的性能回退
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 每个阶段保留的最近样本数
+TRACE_CAPACITY = 512
+
+
+def percentile(sorted_samples, p):
+    """最近秩法取百分位"""
+    if not sorted_samples:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[k]
+
+
+class LatencyTracer:
+    """按阶段记录耗时（毫秒）的环形缓冲
+
+    未启用时所有记录方法直接返回，可以常驻在热路径上。
+    mark()/since() 用于跨回调的区间，例如 keyboard 线程触发到弹出框映射。
+    """
+
+    def __init__(self, capacity=TRACE_CAPACITY, enabled=False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self._samples = {}        # 阶段 -> deque[毫秒]
+        self._marks = {}          # 标记 -> perf_counter
+        self._lock = threading.Lock()
+
+    def record(self, stage, ms):
+        """记录一个样本"""
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.capacity)
+            samples.append(ms)
+
+    @contextmanager
+    def span(self, stage):
+        """记录 with 块的耗时"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def mark(self, key):
+        """记下一个区间的起点"""
+        if self.enabled:
+            self._marks[key] = time.perf_counter()
+
+    def since(self, key, stage, clear=False):
+        """记录从 mark(key) 到现在的耗时，clear 为真时该起点只用一次"""
+        if not self.enabled:
+            return
+        start = self._marks.pop(key, None) if clear else self._marks.get(key)
+        if start is not None:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def clear(self):
+        """清空所有样本"""
+        with self._lock:
+            self._samples.clear()
+            self._marks.clear()
+
+    def stats(self):
+        """各阶段的 (样本数, p50, p95, p99)，按阶段名排序"""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+        return {
+            stage: (len(samples), percentile(samples, 50), percentile(samples, 95), percentile(samples, 99))
+            for stage, samples in sorted(snapshot.items())
+        }
+
+    def report(self):
+        """文本格式的统计表"""
+        stats = self.stats()
+        if not stats:
+            return "（暂无样本）"
+        width = max(len(stage) for stage in stats)
+        lines = [f"{'stage':<{width}}  {'n':>5}  {'p50':>9}  {'p95':>9}  {'p99':>9}"]
+        for stage, (count, p50, p95, p99) in stats.items():
+            lines.append(f"{stage:<{width}}  {count:>5}  {p50:>7.1f}ms  {p95:>7.1f}ms  {p99:>7.1f}ms")
+        return "\n".join(lines)
+
+
+# 全局追踪器，由 --trace 或设置里的调试面板启用
+TRACER = LatencyTracer()
+
+
+class StartupTimer:
+    """启动阶段计时，每个阶段的耗时从上一阶段结束算起"""
+
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.phases = []          # [(阶段, 毫秒)]
+        self._last = self.started_at
+
+    def phase(self, name):
+        """结束当前阶段"""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000))
+        self._last = now
+
+    @property
+    def total(self):
+        return (self._last - self.started_at) * 1000
+
+    def record(self, tracer):
+        """把各阶段耗时写入追踪器（stage 为 startup.<阶段>）"""
+        for name, ms in self.phases:
+            tracer.record(f'startup.{name}', ms)
+
+    def report(self):
+        """单行文本：各阶段耗时和总计"""
+        parts = [f"{name} {ms:.0f}ms" for name, ms in self.phases]
+        return f"启动 {self.total:.0f}ms（{' | '.join(parts)}）"
@@ -0,0 +1,272 @@
+"""
+快捷键导入导出
+逐块读取、逐条解析 JSON 数组或 NDJSON，分批写出，不会把整个文件的文本读进内存；
+导入可按 (窗口, 快捷键) 合并去重，而不只是整体替换。
+
+内存上限：解析出的条目（去重后）全部保留在内存里，合并时再与现有列表一起生成新列表，
+因为主程序本身就把整个目录作为 HotkeyEntry 列表保存在内存中。
+导入时的峰值约为现有目录加导入条目的 HotkeyEntry 占用（每条几百字节），
+与文件文本的大小无关；百万条的导入需要数百 MB。
+"""
+
+import codecs
+import json
+from entry import FIELDS, HotkeyEntry
+
+# 每次读取的字节数
+CHUNK = 1 << 16
+# 单条记录的上限，超过视为格式错误（避免坏文件被整个读进缓冲区）
+MAX_RECORD = 1 << 24
+# 导出时每批写出的条数
+WRITE_BATCH = 1000
+# 最多保留的错误说明条数
+MAX_ERRORS = 10
+
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+def is_ndjson(path):
+    return path.lower().endswith(NDJSON_SUFFIXES)
+
+
+def entry_key(hk):
+    """合并去重用的键：(小写窗口, 组合键整数)，无法解析的组合键退回小写原文"""
+    return hk.search_keys[2], hk.chord if hk.chord is not None else hk.search_keys[0]
+
+
+def check_fields(record):
+    """检查记录结构（是对象、各字段是字符串或缺省），有问题时返回说明
+
+    通过检查的记录可以直接交给 HotkeyEntry.from_dict。
+    """
+    if not isinstance(record, dict):
+        return "不是对象"
+    for name in FIELDS:
+        value = record.get(name)
+        if value is not None and not isinstance(value, str):
+            return f"{name} 不是字符串"
+    return None
+
+
+def validate(record):
+    """检查一条导入记录，有问题时返回说明"""
+    reason = check_fields(record)
+    if reason:
+        return reason
+    if not (record.get('hotkey') or '').strip():
+        return "缺少 hotkey"
+    return None
+
+
+class ImportResult:
+    """解析结果：去重后的条目和跳过的无效记录"""
+
+    def __init__(self):
+        self.entries = []
+        self.skipped = 0
+        self.errors = []
+
+    def skip(self, where, reason):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"{where}: {reason}")
+
+
+class _Reader:
+    """按块读取并增量解码的文本缓冲区"""
+
+    def __init__(self, f, progress):
+        self.f = f
+        self.progress = progress
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buf = ''
+        self.pos = 0
+        self.done = 0
+        self.eof = False
+
+    def more(self):
+        """再读一块，返回是否读到了数据"""
+        if self.eof:
+            return False
+        data = self.f.read(CHUNK)
+        self.done += len(data)
+        self.eof = not data
+        self.buf = self.buf[self.pos:] + self.decoder.decode(data, final=self.eof)
+        self.pos = 0
+        if len(self.buf) > MAX_RECORD:
+            raise ValueError("记录过大或文件格式错误")
+        if self.progress:
+            self.progress(self.done)
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符（文件结束时返回 ''）"""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self.more():
+                return ''
+
+
+def _iter_array(reader):
+    decode = json.JSONDecoder().raw_decode
+    if reader.peek() != '[':
+        raise ValueError("不是 JSON 数组")
+    reader.pos += 1
+    if reader.peek() == ']':
+        return
+    while True:
+        reader.peek()
+        while True:
+            try:
+                value, end = decode(reader.buf, reader.pos)
+            except json.JSONDecodeError:
+                if not reader.more():
+                    raise
+                continue
+            # 数字可能被块边界截断，读到后面的分隔符才算完整
+            if end == len(reader.buf) and not reader.eof:
+                reader.more()
+                continue
+            break
+        reader.pos = end
+        yield value
+        ch = reader.peek()
+        if ch == ',':
+            reader.pos += 1
+        elif ch == ']':
+            return
+        else:
+            raise ValueError(f"数组中出现意外的字符 {ch!r}")
+
+
+def _iter_lines(f, progress):
+    done = 0
+    for lineno, line in enumerate(f, 1):
+        done += len(line)
+        if progress and lineno % 1000 == 0:
+            progress(done)
+        line = line.strip()
+        if line:
+            yield lineno, line
+    if progress:
+        progress(done)
+
+
+def iter_records(f, ndjson=False, progress=None):
+    """逐条产出 (位置, 记录)；f 以二进制打开，progress(已读字节数)
+
+    NDJSON 中单行无法解析时产出 (行号, ValueError)，由调用方计入无效记录。
+    """
+    if ndjson:
+        for lineno, line in _iter_lines(f, progress):
+            try:
+                yield f"第 {lineno} 行", json.loads(line)
+            except ValueError as e:
+                yield f"第 {lineno} 行", e
+    else:
+        for i, record in enumerate(_iter_array(_Reader(f, progress)), 1):
+            yield f"第 {i} 条", record
+
+
+def read_entries(path, progress=None):
+    """解析导入文件，同一 (窗口, 快捷键) 只保留最后一条"""
+    result = ImportResult()
+    positions = {}
+    entries = result.entries
+    with open(path, 'rb') as f:
+        for where, record in iter_records(f, is_ndjson(path), progress):
+            if isinstance(record, ValueError):
+                result.skip(where, f"JSON 格式错误: {record}")
+                continue
+            reason = validate(record)
+            if reason:
+                result.skip(where, reason)
+                continue
+            hk = HotkeyEntry.from_dict(record)
+            key = entry_key(hk)
+            pos = positions.get(key)
+            if pos is None:
+                positions[key] = len(entries)
+                entries.append(hk)
+            else:
+                entries[pos] = hk
+    return result
+
+
+def parse_entries(records):
+    """检查已解析的记录列表（如从同步仓库拉取的内容），规则同 read_entries
+
+    拉取的是完整列表，重复的 (窗口, 快捷键) 原样保留，不去重。
+    """
+    if not isinstance(records, list):
+        raise ValueError("不是 JSON 数组")
+    result = ImportResult()
+    for i, record in enumerate(records, 1):
+        reason = validate(record)
+        if reason:
+            result.skip(f"第 {i} 条", reason)
+            continue
+        result.entries.append(HotkeyEntry.from_dict(record))
+    return result
+
+
+def _same(a, b):
+    return (a.window == b.window and a.hotkey == b.hotkey and a.description == b.description
+            and a.action == b.action and a.created == b.created and a.extra == b.extra)
+
+
+def merge_entries(existing, incoming):
+    """按 (窗口, 快捷键) 合并：已有的被替换，其余追加；内容相同的保留原对象
+
+    返回 (新列表, 新增数, 更新数)。
+    """
+    result = list(existing)
+    positions = {entry_key(hk): i for i, hk in enumerate(result)}
+    added = updated = 0
+    for hk in incoming:
+        key = entry_key(hk)
+        pos = positions.get(key)
+        if pos is None:
+            positions[key] = len(result)
+            result.append(hk)
+            added += 1
+        elif not _same(result[pos], hk):
+            result[pos] = hk
+            updated += 1
+    return result, added, updated
+
+
+def write_json(entries, f, progress=None):
+    """分批写成与 hotkeys.json 相同格式（indent=2）的 JSON 数组，progress(已写条数)"""
+    total = len(entries)
+    f.write('[')
+    for start in range(0, total, WRITE_BATCH):
+        batch = entries[start:start + WRITE_BATCH]
+        f.write(''.join(
+            (',\n  ' if start or i else '\n  ')
+            + json.dumps(hk.to_dict(), ensure_ascii=False, indent=2).replace('\n', '\n  ')
+            for i, hk in enumerate(batch)))
+        if progress:
+            progress(start + len(batch))
+    f.write('\n]' if total else ']')
+
+
+def write_ndjson(entries, f, progress=None):
+    """分批写成每行一条的 NDJSON"""
+    for start in range(0, len(entries), WRITE_BATCH):
+        batch = entries[start:start + WRITE_BATCH]
+        f.write(''.join(json.dumps(hk.to_dict(), ensure_ascii=False) + '\n' for hk in batch))
+        if progress:
+            progress(start + len(batch))
+
+
+def write_entries(path, entries, progress=None):
+    """按扩展名选择格式写出：.ndjson/.jsonl 每行一条，否则为 JSON 数组"""
+    write = write_ndjson if is_ndjson(path) else write_json
+    with open(path, 'w', encoding='utf-8') as f:
+        write(entries, f, progress)
@@ -0,0 +1,249 @@
+"""
+虚拟化列表
+只物化可见窗口及上下 overscan 行，刷新时与现有行做差异更新而不是整表重建
+"""
+
+from difflib import SequenceMatcher
+
+# 可见窗口上下各多物化的行数，小幅滚动直接由控件原生完成
+OVERSCAN = 10
+# 控件尚未布局时假定的可见行数
+DEFAULT_VISIBLE = 30
+
+
+class VirtualList:
+    """虚拟化列表基类
+
+    items 为完整数据，控件里只有 [start, end) 这一段；
+    控件原生滚动接近窗口边缘时重新取窗口，外部滚动条按完整数据换算位置。
+    """
+
+    def __init__(self, widget, scrollbar=None, render=str):
+        self.widget = widget
+        self.scrollbar = scrollbar
+        self.render = render
+        self.items = []
+        self.selected = None      # 选中项在 items 中的下标
+        self._start = 0
+        self._top = 0
+        self._keys = []           # 已物化行对应的数据 id
+        self._values = []         # 已物化行的渲染结果
+        self._pending = None
+        self._line_height = None  # 行高，首次能取到可见行的 bbox 时缓存
+        widget.configure(yscrollcommand=self._on_widget_scroll)
+        if scrollbar is not None:
+            scrollbar.configure(command=self.yview)
+
+    # ---- 控件相关操作，由子类实现 ----
+
+    def _insert(self, row, values):
+        raise NotImplementedError
+
+    def _update(self, row, values):
+        raise NotImplementedError
+
+    def _delete(self, first, last):
+        """删除 [first, last) 行"""
+        raise NotImplementedError
+
+    def _select_row(self, row):
+        raise NotImplementedError
+
+    def _selected_row(self):
+        raise NotImplementedError
+
+    def _row_height(self, row):
+        """第 row 行（需可见）的像素高度"""
+        raise NotImplementedError
+
+    # ---- 公共接口 ----
+
+    def set_items(self, items, keep_position=False):
+        """替换数据并刷新可见窗口"""
+        self.items = items
+        self.selected = None
+        self._render(self._top if keep_position else 0)
+
+    def refresh(self):
+        """数据内容有变化（列表对象不变）时重新渲染当前窗口"""
+        self._render(self._top)
+
+    def visible_count(self):
+        """控件当前能显示的行数"""
+        height = self.widget.winfo_height()
+        if not self._line_height and self._keys:
+            self._line_height = self._row_height(min(self._top - self._start, len(self._keys) - 1))
+        if height <= 1 or not self._line_height:
+            return DEFAULT_VISIBLE
+        return max(1, height // self._line_height)
+
+    def select(self, index):
+        """选中 items[index] 并滚动到可见"""
+        if not 0 <= index < len(self.items):
+            return
+        self.selected = index
+        visible = self.visible_count()
+        if index < self._top:
+            self._render(index)
+        elif index >= self._top + visible:
+            self._render(index - visible + 1)
+        else:
+            self._select_row(index - self._start)
+
+    def selected_index(self):
+        """当前选中项在 items 中的下标，没有选中返回 None"""
+        row = self._selected_row()
+        if row is not None:
+            self.selected = self._start + row
+        return self.selected
+
+    def selected_item(self):
+        index = self.selected_index()
+        return self.items[index] if index is not None else None
+
+    def yview(self, *args):
+        """外部滚动条回调，参数与 Tk 的 yview 一致"""
+        total = len(self.items)
+        if not args or not total:
+            return
+        if args[0] == 'moveto':
+            top = int(float(args[1]) * total)
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= self.visible_count()
+            top = self._top + step
+        else:
+            return
+        self._render(top)
+
+    # ---- 内部实现 ----
+
+    def _render(self, top):
+        """以 top 为首个可见行重新取窗口，并与已物化的行做差异更新"""
+        total = len(self.items)
+        visible = self.visible_count()
+        top = max(0, min(top, total - visible))
+        start = max(0, top - OVERSCAN)
+        end = min(total, top + visible + OVERSCAN)
+        window = self.items[start:end]
+        keys = [id(item) for item in window]
+        values = [self.render(item) for item in window]
+
+        # 从后往前应用差异，前面的行号不受影响
+        opcodes = SequenceMatcher(None, self._keys, keys, autojunk=False).get_opcodes()
+        for tag, i1, i2, j1, j2 in reversed(opcodes):
+            if tag == 'equal':
+                for i, j in zip(range(i1, i2), range(j1, j2)):
+                    if self._values[i] != values[j]:
+                        self._update(i, values[j])
+                continue
+            if tag in ('replace', 'delete'):
+                self._delete(i1, i2)
+            for offset, j in enumerate(range(j1, j2)):
+                self._insert(i1 + offset, values[j])
+
+        self._keys = keys
+        self._values = values
+        self._start = start
+        self._top = top
+        if window:
+            self.widget.yview_moveto((top - start) / len(window))
+        if self.selected is not None and start <= self.selected < end:
+            self._select_row(self.selected - start)
+        self._update_scrollbar(visible)
+
+    def _update_scrollbar(self, visible):
+        if self.scrollbar is None:
+            return
+        total = len(self.items)
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.scrollbar.set(self._top / total, min(1.0, (self._top + visible) / total))
+
+    def _on_widget_scroll(self, first, last):
+        """控件原生滚动（滚轮、方向键、see）后换算全局位置，接近窗口边缘时重新取窗口"""
+        count = len(self._keys)
+        if not count:
+            self._update_scrollbar(self.visible_count())
+            return
+        top = self._start + round(float(first) * count)
+        bottom = self._start + round(float(last) * count)
+        self._top = top
+        self._update_scrollbar(bottom - top)
+        margin = OVERSCAN // 2
+        end = self._start + count
+        near_top = self._start > 0 and top - self._start < margin
+        near_bottom = end < len(self.items) and end - bottom < margin
+        if (near_top or near_bottom) and self._pending is None:
+            # 不在控件自身的滚动回调里改动行，留到空闲时处理
+            self._pending = self.widget.after_idle(self._rewindow)
+
+    def _rewindow(self):
+        self._pending = None
+        selected = self._selected_row()
+        if selected is not None:
+            self.selected = self._start + selected
+        self._render(self._top)
+
+
+class VirtualTreeview(VirtualList):
+    """ttk.Treeview 的虚拟化列表，render 返回 values 元组"""
+
+    def __init__(self, widget, scrollbar=None, render=tuple):
+        self._iids = []
+        super().__init__(widget, scrollbar, render)
+
+    def _insert(self, row, values):
+        self._iids.insert(row, self.widget.insert('', row, values=values))
+
+    def _update(self, row, values):
+        self.widget.item(self._iids[row], values=values)
+
+    def _delete(self, first, last):
+        self.widget.delete(*self._iids[first:last])
+        del self._iids[first:last]
+
+    def _select_row(self, row):
+        iid = self._iids[row]
+        self.widget.selection_set(iid)
+        self.widget.focus(iid)
+        self.widget.see(iid)
+
+    def _selected_row(self):
+        selection = self.widget.selection()
+        if not selection or selection[0] not in self._iids:
+            return None
+        return self._iids.index(selection[0])
+
+    def _row_height(self, row):
+        bbox = self.widget.bbox(self._iids[row])
+        return bbox[3] if bbox else None
+
+
+class VirtualListbox(VirtualList):
+    """tk.Listbox 的虚拟化列表，render 返回显示文本"""
+
+    def _insert(self, row, values):
+        self.widget.insert(row, values)
+
+    def _update(self, row, values):
+        self.widget.delete(row)
+        self.widget.insert(row, values)
+
+    def _delete(self, first, last):
+        self.widget.delete(first, last - 1)
+
+    def _select_row(self, row):
+        self.widget.selection_clear(0, 'end')
+        self.widget.selection_set(row)
+        self.widget.see(row)
+
+    def _selected_row(self):
+        selection = self.widget.curselection()
+        return selection[0] if selection else None
+
+    def _row_height(self, row):
+        bbox = self.widget.bbox(row)
+        return bbox[3] if bbox else None
@@ -0,0 +1,122 @@
+"""
+活动窗口监控
+订阅根窗口的 PropertyNotify 事件，只在活动窗口（或其标题）变化时回调，不再轮询
+"""
+
+import os
+import select
+import threading
+
+
+def short_name(title):
+    """窗口标题取第一个词作为窗口名（与快捷键的 window 字段前缀匹配）"""
+    parts = title.split()
+    return parts[0] if parts else title
+
+
+class ActiveWindowMonitor:
+    """事件驱动的活动窗口监控
+
+    on_change(name) 在监控线程中调用（包括启动时的第一次），调用方自行切回 Tk 线程；
+    回调可以阻塞（如等待后台建立的索引），start() 不会因此卡住调用方。
+    display_name 为空时使用 $DISPLAY，测试时可指向本地 Xvfb。
+    """
+
+    def __init__(self, on_change, display_name=None):
+        self.on_change = on_change
+        self.display_name = display_name
+        self.current = None
+        self._display = None
+        self._active = None       # 当前订阅了标题变化的活动窗口
+        self._thread = None
+        self._wake_r, self._wake_w = os.pipe()
+
+    def start(self):
+        """连接 X server 并启动监控线程"""
+        from Xlib import X, display
+
+        self._display = display.Display(self.display_name)
+        d = self._display
+        self._root = d.screen().root
+        # atom 只 intern 一次
+        self._net_active_window = d.intern_atom('_NET_ACTIVE_WINDOW')
+        self._net_wm_name = d.intern_atom('_NET_WM_NAME')
+        self._wm_name = d.intern_atom('WM_NAME')
+        self._root.change_attributes(event_mask=X.PropertyChangeMask)
+        d.flush()
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """停止监控线程"""
+        os.write(self._wake_w, b'x')
+
+    def _run(self):
+        from Xlib import X
+
+        d = self._display
+        watched = (self._net_active_window, self._net_wm_name, self._wm_name)
+        try:
+            # 启动时的活动窗口也在监控线程里读取和回调
+            self._refresh()
+            while True:
+                changed = False
+                while d.pending_events():
+                    event = d.next_event()
+                    if event.type == X.PropertyNotify and event.atom in watched:
+                        changed = True
+                if changed:
+                    # 查询过程中读到的事件会进入 Xlib 内部队列，回到循环开头先处理
+                    self._refresh()
+                    continue
+                readable, _, _ = select.select([d, self._wake_r], [], [])
+                if self._wake_r in readable:
+                    break
+        finally:
+            d.close()
+
+    def _refresh(self):
+        """读取活动窗口，名称有变化时回调"""
+        from Xlib import X, error
+
+        try:
+            prop = self._root.get_full_property(self._net_active_window, X.AnyPropertyType)
+            window_id = prop.value[0] if prop and len(prop.value) else 0
+            if window_id != (self._active.id if self._active else 0):
+                self._watch(window_id)
+            name = self._window_name(self._active) if self._active else None
+        except error.XError:
+            # 窗口在查询前已销毁，等待下一次活动窗口变化
+            return
+
+        if name and name != self.current:
+            self.current = name
+            self.on_change(name)
+
+    def _watch(self, window_id):
+        """改为订阅新活动窗口的标题变化"""
+        from Xlib import X, error
+
+        if self._active is not None:
+            self._active.change_attributes(event_mask=X.NoEventMask, onerror=error.CatchError())
+        self._active = None
+        if window_id:
+            self._active = self._display.create_resource_object('window', window_id)
+            self._active.change_attributes(event_mask=X.PropertyChangeMask,
+                                           onerror=error.CatchError())
+
+    def _window_name(self, window):
+        """优先读取 UTF-8 的 _NET_WM_NAME，其次 WM_NAME"""
+        from Xlib import X
+
+        prop = window.get_full_property(self._net_wm_name, X.AnyPropertyType)
+        if prop and prop.value:
+            value = prop.value
+            title = value.decode('utf-8', 'replace') if isinstance(value, bytes) else str(value)
+        else:
+            title = window.get_wm_name()
+            if isinstance(title, bytes):
+                title = title.decode('utf-8', 'replace')
+        return short_name(title) if title else None